@@ -7,6 +7,7 @@
 # Requirements:
 # - Python 3.x
 # - requests library (`pip install requests`)
+# - lm_client.py (shared pooled session) in the same directory
 # - A JSON file named `credentials.json` in the same directory
 #
 # Expected credentials.json format:
@@ -21,8 +22,8 @@
 # and API URL loaded from a JSON file. On success, it prints an auth token.
 # ---------------------------------------------
 
-import requests
 import json
+from lm_client import new_session
 
 # Function to load credentials and API URL from JSON
 def get_credentials():
@@ -42,8 +43,9 @@ auth_data = {
     'accessKey': accessKey
 }
 
-# Send POST request to authenticate
-response = requests.post(api_url, json=auth_data)
+# Send POST request to authenticate over the shared keep-alive session
+session = new_session()
+response = session.post(api_url, json=auth_data)
 
 # Handle response
 if response.status_code == 200:
@@ -1,10 +1,5 @@
-import requests
 import json
-import time
-import hmac
-import hashlib
-import base64
-from datetime import datetime, timedelta
+from lm_client import LMClient
 
 # Load credentials and account info from config file
 with open('config.json', 'r') as f:
@@ -14,31 +9,20 @@ ACCESS_ID = config['access_id']
 ACCESS_KEY = config['access_key']
 ACCOUNT = config['account']  # Your LogicMonitor subdomain
 
-def build_headers(http_verb, resource_path):
-    epoch = str(int(time.time() * 1000))
-    request_vars = http_verb + epoch + resource_path
-    digest = hmac.new(ACCESS_KEY.encode('utf-8'), msg=request_vars.encode('utf-8'), digestmod=hashlib.sha256).digest()
-    signature = base64.b64encode(digest).decode()
-    return {
-        'Authorization': f'LMv1 {ACCESS_ID}:{signature}:{epoch}',
-        'Content-Type': 'application/json'
-    }
+# Shared pooled client (keep-alive session, cached HMAC key, gzip)
+client = LMClient(ACCOUNT, ACCESS_ID, ACCESS_KEY)
 
 # Example API call to verify authentication
 def test_auth():
-    resource_path = '/santaba/rest/device/groups'
-    http_verb = 'GET'
-    url = f'https://{ACCOUNT}.logicmonitor.com{resource_path}'
-
-    headers = build_headers(http_verb, resource_path)
-    response = requests.get(url, headers=headers)
+    resource_path = '/device/groups'
+    response = client.get(resource_path, size=1)
 
     print("Status Code:", response.status_code)
     if response.status_code == 200:
         print("Authentication successful.")
-        print("Response preview:", response.json().get('data', {}).get('items', [])[:1])  # Preview one item
+        print("Response preview:", response.json().get('items', [])[:1])  # Preview one item
     else:
         print("Authentication failed.")
         print("Response:", response.text)
 
-test_auth()
\ No newline at end of file
+test_auth()
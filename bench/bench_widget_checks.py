@@ -0,0 +1,268 @@
+"""
+Module: bench_widget_checks.py
+Description:
+    Micro-benchmarks for the per-widget checks in the scanner's
+    widget_checks.py, on synthetic widget-data payloads from a single value
+    up to thousands of lines x thousands of points.
+
+        python bench_widget_checks.py
+        python bench_widget_checks.py --checks graphplot,bignumber --sizes tiny,large
+        python bench_widget_checks.py --threshold 0.15
+
+    Every check runs on an "ok" payload and on a "broken" one (the worst
+    case for most checks, since they scan everything before giving up).
+    Each case is timed with timeit: the best and median time per call over
+    --repeat rounds. Results, with the commit and Python version, are
+    appended to widget_checks_results.jsonl; each case is compared with its
+    last logged result and the script exits 1 if one got slower by more than
+    --threshold or returned a different result.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_ROOT, "py", "broken_dash project", "ver4.14"))
+from widget_checks import (check_graphplot_widget, check_graphplot_stream, check_bignumber_widget,
+                           extract_numeric_from_big_number, check_piechart_widget, check_gauge_widget,
+                           check_sla_widget, extract_error_message, has_no_data, NO_DATA, STREAM_CHUNK_SIZE)
+
+RESULTS_FILE = "widget_checks_results.jsonl"
+DEFAULT_THRESHOLD = 0.25
+# Cases faster than this are too noisy to flag
+NOISE_FLOOR_US = 1.0
+
+# Size -> (lines, points per line)
+SIZES = {
+    "tiny": (1, 1),
+    "small": (3, 60),
+    "medium": (10, 1440),
+    "large": (100, 1440),
+    "huge": (2000, 2000),
+}
+
+# A shared pool of values keeps huge payloads from holding millions of float objects
+VALUE_POOL = [round(1 + (i * 7.31) % 99, 2) for i in range(997)]
+
+
+def values(count, offset=0):
+    return [VALUE_POOL[(offset + i) % len(VALUE_POOL)] for i in range(count)]
+
+
+# ------------------------------
+# Payloads (REST v3 widget data, camelCase)
+# ------------------------------
+
+def graph_payload(lines, points, broken):
+    # A broken graph has lines but no datapoints, so the check walks every line
+    return {
+        "type": "graph",
+        "title": "CPU Utilization",
+        "timestamps": [1700000000000 + i * 60000 for i in range(points)],
+        "lines": [{"label": f"dp{n}", "legend": f"dp{n}", "data": [] if broken else values(points, n)}
+                  for n in range(lines)],
+    }
+
+
+def graph_stream_payload(lines, points, broken):
+    body = json.dumps(graph_payload(lines, points, broken)).encode("utf-8")
+    return [body[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(body), STREAM_CHUNK_SIZE)]
+
+
+def bignumber_payload(lines, points, broken):
+    return {
+        "type": "bigNumber",
+        "title": "Uptime",
+        "data": [{"label": f"dp{n}", "values": [NO_DATA] * points if broken else values(points, n)}
+                 for n in range(lines)],
+    }
+
+
+def piechart_payload(lines, points, broken):
+    slices = lines * points
+    return {
+        "type": "pieChart",
+        "title": "Alerts by Severity",
+        "data": [{"label": f"slice{i}", "value": 0 if broken else VALUE_POOL[i % len(VALUE_POOL)]}
+                 for i in range(slices)],
+    }
+
+
+def gauge_payload(lines, points, broken):
+    history = lines * points
+    return {
+        "type": "gauge",
+        "title": "Queue Depth",
+        "currentValue": 42.5,
+        "historyValues": [0] * history if broken else values(history),
+    }
+
+
+def sla_payload(lines, points, broken):
+    return {
+        "type": "deviceSLA",
+        "title": "Availability",
+        "resultList": [{"value": "Group not found" if broken else "99.950", "label": f"group{n}"}
+                       for n in range(lines)],
+    }
+
+
+def error_payload(lines, points, broken):
+    # An ApiException string; a broken one has a truncated JSON body
+    body = json.dumps({"errorMessage": "Widget datasource not found", "errorCode": 1404,
+                       "errorDetail": [f"dataPoint dp{n} has no data" for n in range(lines * points)]})
+    if broken:
+        body = body[:-2]
+    message = ("(400)\nReason: Bad Request\nHTTP response headers: HTTPHeaderDict({'content-type': "
+               f"'application/json'}})\nHTTP response body: {body}")
+    return True, message
+
+
+# Check name -> (function, payload builder)
+CHECKS = {
+    "graphplot": (check_graphplot_widget, graph_payload),
+    "graphplot_stream": (check_graphplot_stream, graph_stream_payload),
+    "bignumber": (check_bignumber_widget, bignumber_payload),
+    "extract_numeric": (extract_numeric_from_big_number, lambda *a: bignumber_payload(*a)["data"]),
+    "piechart": (check_piechart_widget, piechart_payload),
+    "gauge": (check_gauge_widget, gauge_payload),
+    "sla": (check_sla_widget, sla_payload),
+    "error_message": (extract_error_message, error_payload),
+    "has_no_data": (has_no_data, graph_payload),
+}
+VARIANTS = ("ok", "broken")
+
+
+def summarize(result):
+    """
+    A short JSON-safe form of a check's return value, compared across runs.
+    """
+    if isinstance(result, list):
+        return f"list[{len(result)}]"
+    if isinstance(result, tuple) and result and isinstance(result[0], tuple):
+        result = result[0]  # check_graphplot_stream: ((broken, message), no_data)
+    if isinstance(result, tuple):
+        return result[0]
+    if isinstance(result, str):
+        return result[:40]
+    return result
+
+
+def time_case(function, payload, repeat):
+    timer = timeit.Timer(lambda: function(payload))
+    number, _ = timer.autorange()
+    rounds = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return number, min(rounds), statistics.median(rounds)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_results(path):
+    """
+    The latest earlier record of each case in the results log, so a run of
+    a few checks does not hide the others from the next comparison.
+    """
+    latest = {}
+    if not os.path.exists(path):
+        return latest
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            latest[record["case"]] = record
+    return latest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark the widget check functions.")
+    parser.add_argument("--checks", default=",".join(CHECKS),
+                        help=f"Comma-separated checks (default: all): {', '.join(CHECKS)}")
+    parser.add_argument("--sizes", default=",".join(SIZES),
+                        help=f"Comma-separated payload sizes (default: all): {', '.join(SIZES)}")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing rounds per case (default: 5)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Slowdown vs. the last logged result that counts as a regression (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--results", default=RESULTS_FILE, help=f"Results log, JSON lines (default: {RESULTS_FILE})")
+    parser.add_argument("--no-save", action="store_true", help="Compare with the logged results but do not log this run")
+    args = parser.parse_args()
+
+    checks = [c.strip() for c in args.checks.split(",") if c.strip()]
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    for name in checks:
+        if name not in CHECKS:
+            parser.error(f"unknown check: {name}")
+    for name in sizes:
+        if name not in SIZES:
+            parser.error(f"unknown size: {name}")
+
+    previous = previous_results(args.results)
+    run = {
+        "run": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+    }
+    print(f"{'case':<36}{'calls':>9}{'best us':>14}{'median us':>14}{'vs prev':>10}")
+
+    records = []
+    regressions = []
+    for size in sizes:
+        lines, points = SIZES[size]
+        for check in checks:
+            function, build = CHECKS[check]
+            for variant in VARIANTS:
+                # Built per case and dropped after, so huge payloads are not all held at once
+                payload = build(lines, points, variant == "broken")
+                number, best, median = time_case(function, payload, args.repeat)
+                result = summarize(function(payload))
+                del payload
+
+                case = f"{check}/{variant}/{size}"
+                record = dict(run, case=case, check=check, variant=variant, size=size, lines=lines,
+                              points=points, calls=number, best_us=round(best * 1e6, 3),
+                              median_us=round(median * 1e6, 3), result=result)
+                records.append(record)
+
+                change = ""
+                before = previous.get(case)
+                if before:
+                    ratio = record["best_us"] / before["best_us"] if before["best_us"] else 1.0
+                    change = f"{(ratio - 1) * 100:+.0f}%"
+                    if before.get("result") != result:
+                        regressions.append(f"{case}: result changed from {before.get('result')!r} to {result!r}")
+                    elif ratio > 1 + args.threshold and record["best_us"] > NOISE_FLOOR_US:
+                        regressions.append(f"{case}: {before['best_us']} -> {record['best_us']} us ({change}, "
+                                           f"logged {before['run']} at {before.get('commit')})")
+                print(f"{case:<36}{number:>9}{record['best_us']:>14.3f}{record['median_us']:>14.3f}{change:>10}",
+                      flush=True)
+
+    if not args.no_save:
+        with open(args.results, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        print(f"\nResults appended to {args.results}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) vs. the last logged results:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
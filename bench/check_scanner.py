@@ -0,0 +1,310 @@
+"""
+Module: check_scanner.py
+Description:
+    End-to-end checks of the dashboard scanner against the mock LogicMonitor
+    API (mock_lm_server.py), for the behaviour a speed-up must not change
+    and the savings it must actually deliver.
+
+        python check_scanner.py
+        python check_scanner.py --checks widget_listing --dashboards 100 --widgets 1500
+
+    Every check runs the scanner as its own process (run_bench.run_tool)
+    against one generated account and compares the reports and the API
+    calls the mock counted. Failures are listed and the script exits 1.
+
+    Checks:
+        widget_listing  --widget-listing dashboard and account make fewer
+                        API calls than per-widget calls (none), with the
+                        same report rows
+        validate_refs   --validate-refs loads the inventory, flags only
+                        widgets whose config is broken, and leaves every
+                        other row as the data check writes it
+        incremental     a second --incremental run reuses the healthy
+                        dashboards with the same rows, every one of them
+                        where few widgets are broken, and a widget edit
+                        gets its dashboard rescanned
+        concurrent      --concurrency 8 writes the serial scan's rows in
+                        the same order
+        sampling        --sample estimates breakage per widget type with
+                        fewer widget-data calls than a full scan where
+                        few widgets are broken, and refuses to run
+                        without the widget listing
+        cache           --cache writes the same rows with fewer
+                        widget-data calls
+"""
+
+import argparse
+import csv
+import glob
+import os
+import re
+import sys
+import tempfile
+from types import SimpleNamespace
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+from run_bench import run_tool, ACCESS_KEYS
+from mock_lm_server import MockLMServer
+from synthetic_account import generate_account
+
+# Columns that must match between two scans of the same account
+REPORT_COLUMNS = ("dashboard_id", "widget_id", "widget_name", "widget_type", "broken_widget", "widget_error")
+# Error text of a widget flagged by the inventory check (inventory.py)
+REFERENCE_ERROR = "Referenced "
+# Broken share of the account where most groups and dashboards are healthy
+SPARSE_BROKEN = 0.01
+
+
+def start_server(account, args):
+    return MockLMServer(account, latency=args.latency_ms / 1000.0, jitter=0.0, rate_limit=1000000,
+                        access_keys=ACCESS_KEYS).start()
+
+
+def sparse_account(args):
+    """
+    The generated account with only SPARSE_BROKEN of its widgets broken:
+    what sampling and incremental scans are meant to save calls on.
+    """
+    return generate_account(dashboards=args.dashboards, widgets=args.widgets, broken=SPARSE_BROKEN,
+                            groups=args.groups, seed=args.seed)
+
+
+def scan(server, account, scanner_args, timeout):
+    """
+    Run the scanner once; returns (result, report rows). result["output"]
+    is the scanner's log, result["report"] the report's path and
+    result["widget_data_calls"] the widget-data calls the mock served.
+    """
+    args = SimpleNamespace(scanner_args=scanner_args, timeout=timeout)
+    result = run_tool("scanner", server, account, args)
+    result["widget_data_calls"] = server.stats.get("widget_data", 0)
+    if result["exit_code"] != 0:
+        raise RuntimeError(f"scanner {scanner_args!r} failed: {result.get('error')} (log: {result['log']})")
+    reports = glob.glob(os.path.join(os.path.dirname(result["log"]), "report_*", "dashboards.csv"))
+    if not reports:
+        raise RuntimeError(f"scanner {scanner_args!r} wrote no report (log: {result['log']})")
+    with open(result["log"], "r", encoding="utf-8", errors="replace") as f:
+        result["output"] = f.read()
+    result["report"] = reports[0]
+    with open(reports[0], "r", encoding="utf-8", newline="") as f:
+        rows = [tuple(row[column] for column in REPORT_COLUMNS) for row in csv.DictReader(f)]
+    return result, rows
+
+
+def compare_rows(label, expected, actual):
+    """
+    Failure messages for rows that differ between two reports, in any order.
+    """
+    missing = set(expected) - set(actual)
+    extra = set(actual) - set(expected)
+    if not missing and not extra:
+        return []
+    sample = sorted(missing)[:1] + sorted(extra)[:1]
+    return [f"{label}: {len(missing)} rows missing, {len(extra)} unexpected, e.g. {sample}"]
+
+
+def check_widget_listing(server, account, args):
+    baseline, baseline_rows = scan(server, account, "--widget-listing none", args.timeout)
+    failures = []
+    for mode in ("dashboard", "account"):
+        result, rows = scan(server, account, f"--widget-listing {mode}", args.timeout)
+        print(f"  --widget-listing {mode}: {result['api_calls']} calls, none: {baseline['api_calls']}")
+        if result["api_calls"] >= baseline["api_calls"]:
+            failures.append(f"--widget-listing {mode} made {result['api_calls']} API calls, "
+                            f"not fewer than the {baseline['api_calls']} of per-widget calls")
+        failures += compare_rows(f"--widget-listing {mode}", baseline_rows, rows)
+    return failures
+
+
+def check_validate_refs(server, account, args):
+    _, baseline_rows = scan(server, account, "", args.timeout)
+    result, rows = scan(server, account, "--validate-refs", args.timeout)
+    if "Error loading device inventory" in result["output"]:
+        return [f"the inventory did not load (log: {result['log']})"]
+    if "Reference check failed" in result["output"]:
+        return [f"reference checks raised errors (log: {result['log']})"]
+    broken = {str(widget_id) for widget_id in account["broken"]}
+    flagged = {row[1] for row in rows if row[5].startswith(REFERENCE_ERROR)}
+    print(f"  {len(flagged)} widgets flagged by reference, {len(broken)} broken in the account")
+    failures = []
+    if not flagged:
+        failures.append("no widget was flagged by reference")
+    if flagged - broken:
+        failures.append(f"{len(flagged - broken)} widgets with a valid config were flagged, e.g. {sorted(flagged - broken)[:3]}")
+    if any(row[4] != "True" for row in rows if row[1] in flagged):
+        failures.append("a widget flagged by reference was not reported broken")
+    # Everything the inventory did not flag is left to the data check, as without --validate-refs
+    return failures + compare_rows("--validate-refs", [row for row in baseline_rows if row[1] not in flagged],
+                                   [row for row in rows if row[1] not in flagged])
+
+
+def incremental_counts(result):
+    """
+    (reused, rescanned) from the scanner's incremental summary line.
+    """
+    match = re.search(r"Incremental scan: (\d+) dashboards reused, (\d+) rescanned", result["output"])
+    if match is None:
+        raise RuntimeError(f"no incremental summary in the scanner output (log: {result['log']})")
+    return int(match.group(1)), int(match.group(2))
+
+
+def check_incremental(server, account, args):
+    state = os.path.join(tempfile.mkdtemp(prefix="check_incremental_"), "scan_state.json")
+    scanner_args = f"--incremental --state-file {state}"
+    _, first_rows = scan(server, account, scanner_args, args.timeout)
+    second, second_rows = scan(server, account, scanner_args, args.timeout)
+    reused, rescanned = incremental_counts(second)
+    print(f"  second run: {reused} reused, {rescanned} rescanned")
+    failures = compare_rows("second --incremental run", first_rows, second_rows)
+    if reused == 0:
+        return failures + ["the second --incremental run reused no dashboards"]
+
+    # Edit one widget of a dashboard the second run reused
+    broken = {str(row[0]) for row in second_rows if row[4] == "True"}
+    widget = next(w for w in account["widgets"] if str(w["dashboardId"]) not in broken)
+    widget["lastUpdatedOn"] += 1
+    try:
+        third, _ = scan(server, account, scanner_args, args.timeout)
+    finally:
+        widget["lastUpdatedOn"] -= 1
+    reused_after, rescanned_after = incremental_counts(third)
+    print(f"  after a widget edit: {reused_after} reused, {rescanned_after} rescanned")
+    if reused_after != reused - 1:
+        failures.append(f"a widget edit on dashboard {widget['dashboardId']} did not get it rescanned "
+                        f"({reused} then {reused_after} dashboards reused)")
+    return failures + check_incremental_sparse(args)
+
+
+def check_incremental_sparse(args):
+    """
+    On an account with few broken widgets, no dashboard with a valid
+    widget config is reported broken, whatever widget types (SLA
+    included) it holds, and every dashboard without a broken row is reused.
+    """
+    sparse = sparse_account(args)
+    state = os.path.join(tempfile.mkdtemp(prefix="check_incremental_"), "scan_state.json")
+    scanner_args = f"--incremental --state-file {state}"
+    sparse_server = start_server(sparse, args)
+    try:
+        _, first_rows = scan(sparse_server, sparse, scanner_args, args.timeout)
+        second, _ = scan(sparse_server, sparse, scanner_args, args.timeout)
+    finally:
+        sparse_server.stop()
+    reused, rescanned = incremental_counts(second)
+    broken_ids = set(sparse["broken"])
+    broken_configs = {str(w["dashboardId"]) for w in sparse["widgets"] if w["id"] in broken_ids}
+    dashboards = {row[0] for row in first_rows}
+    flagged = {row[0] for row in first_rows if row[4] == "True"}
+    print(f"  {SPARSE_BROKEN:.0%} broken, second run: {reused} reused, {rescanned} rescanned, "
+          f"{len(dashboards - flagged)} of {len(dashboards)} dashboards without a broken row")
+    failures = []
+    if flagged - broken_configs:
+        failures.append(f"with {SPARSE_BROKEN:.0%} broken, {len(flagged - broken_configs)} dashboards with valid "
+                        f"widget configs were reported broken, e.g. {sorted(flagged - broken_configs)[:3]}")
+    if reused != len(dashboards - flagged):
+        failures.append(f"with {SPARSE_BROKEN:.0%} broken, the second --incremental run reused {reused} dashboards, "
+                        f"not the {len(dashboards - flagged)} without a broken row")
+    return failures
+
+
+def check_concurrent(server, account, args):
+    _, serial_rows = scan(server, account, "", args.timeout)
+    _, rows = scan(server, account, "--concurrency 8 --check-workers 8", args.timeout)
+    failures = compare_rows("--concurrency 8", serial_rows, rows)
+    if not failures and rows != serial_rows:
+        position = next(n for n, (a, b) in enumerate(zip(serial_rows, rows)) if a != b)
+        failures.append(f"--concurrency 8 wrote the serial rows in a different order, first at row {position + 1}")
+    return failures
+
+
+def check_sampling(server, account, args):
+    sparse = sparse_account(args)
+    sparse_server = start_server(sparse, args)
+    try:
+        baseline, _ = scan(sparse_server, sparse, "", args.timeout)
+        result, _ = scan(sparse_server, sparse, "--sample 0.3 --sample-seed 1", args.timeout)
+    finally:
+        sparse_server.stop()
+    with open(os.path.join(os.path.dirname(result["report"]), "sample_estimate.csv"), "r", encoding="utf-8") as f:
+        strata = [row["widget_type"] for row in csv.DictReader(f) if row["widget_type"] != "ALL"]
+    before, after = baseline["widget_data_calls"], result["widget_data_calls"]
+    print(f"  strata: {', '.join(strata)}")
+    print(f"  widget-data calls with {SPARSE_BROKEN:.0%} broken: {before} -> {after}")
+    failures = []
+    if "UNKNOWN" in strata or len(strata) < 2:
+        failures.append(f"the sample was not stratified by widget type: {strata}")
+    if after >= before:
+        failures.append(f"--sample 0.3 made {after} widget-data calls, not fewer than the full scan's {before}")
+    refused = run_tool("scanner", server, account,
+                       SimpleNamespace(scanner_args="--sample 0.3 --widget-listing none", timeout=args.timeout))
+    if refused["exit_code"] == 0:
+        failures.append("--sample ran with --widget-listing none, where no widget types are known")
+    return failures
+
+
+def check_cache(server, account, args):
+    baseline, baseline_rows = scan(server, account, "", args.timeout)
+    result, rows = scan(server, account, "--cache", args.timeout)
+    before, after = baseline["widget_data_calls"], result["widget_data_calls"]
+    print(f"  widget-data calls: {before} -> {after}")
+    failures = compare_rows("--cache", baseline_rows, rows)
+    if after >= before:
+        failures.append(f"--cache made {after} widget-data calls, not fewer than {before}")
+    return failures
+
+
+CHECKS = {
+    "widget_listing": check_widget_listing,
+    "validate_refs": check_validate_refs,
+    "incremental": check_incremental,
+    "concurrent": check_concurrent,
+    "sampling": check_sampling,
+    "cache": check_cache,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the scanner end to end against the mock LogicMonitor API.")
+    parser.add_argument("--checks", default=",".join(CHECKS),
+                        help=f"Comma-separated checks (default: all): {', '.join(CHECKS)}")
+    parser.add_argument("--dashboards", type=int, default=40, help="Generated account: dashboards (default: 40)")
+    parser.add_argument("--widgets", type=int, default=500, help="Generated account: widgets (default: 500)")
+    parser.add_argument("--groups", type=int, default=4, help="Generated account: dashboard groups (default: 4)")
+    parser.add_argument("--broken", type=float, default=0.2, help="Generated account: broken share (default: 0.2)")
+    parser.add_argument("--seed", type=int, default=1, help="Generated account: random seed (default: 1)")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Mock latency per request (default: 2)")
+    parser.add_argument("--timeout", type=float, default=600, help="Kill a scan after this many seconds (default: 600)")
+    args = parser.parse_args()
+
+    checks = [c.strip() for c in args.checks.split(",") if c.strip()]
+    for name in checks:
+        if name not in CHECKS:
+            parser.error(f"unknown check: {name}")
+
+    account = generate_account(dashboards=args.dashboards, widgets=args.widgets, broken=args.broken,
+                               groups=args.groups, seed=args.seed)
+    server = start_server(account, args)
+    failures = []
+    try:
+        for name in checks:
+            print(f"{name}...", flush=True)
+            try:
+                failed = CHECKS[name](server, account, args)
+            except RuntimeError as e:
+                failed = [str(e)]
+            failures += [f"{name}: {failure}" for failure in failed]
+            print(f"  {'FAIL' if failed else 'ok'}")
+    finally:
+        server.stop()
+
+    if failures:
+        print(f"\n{len(failures)} failure(s):")
+        for line in failures:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\nAll checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+"""
+Module: mock_lm_server.py
+Description:
+    Local stand-in for the LogicMonitor REST API (v3), for benchmarking the
+    scripts in this repository without a live portal.
+
+    Serves, under /santaba/rest:
+
+        GET  /dashboard/groups                  dashboard groups
+        GET  /dashboard/dashboards[/{id}]       dashboards (list / detail)
+        GET  /dashboard/widgets[/{id}]          widgets (list / detail)
+        GET  /dashboard/widgets/{id}/data       widget data, broken or healthy
+        GET  /device/devices                    devices
+        GET  /device/groups                     device groups
+        GET  /device/devices/{id}/instances     device instances
+        GET  /sdt/sdts, POST /sdt/sdts          SDTs
+
+    Listings honour offset, size, fields and simple key:value filters.
+    Every request must carry an LMv1 Authorization header; with access
+    keys configured the signature is checked too. Responses carry the
+    x-rate-limit-* headers of a fixed window per access ID, and requests
+    over the limit (or a random share of them, --error-rate) get HTTP 429.
+    Latency is configurable, and large responses are gzipped when the
+    client accepts it.
+
+        python mock_lm_server.py --account account.json --port 8080 --latency-ms 40
+
+    Point the scripts at it with LM_BASE_URL (see lm_client.py):
+
+        LM_BASE_URL=http://127.0.0.1:8080/santaba/rest python dashboard_backup.py
+"""
+
+import argparse
+import base64
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from metrics import endpoint_name
+from synthetic_account import generate_account, load_account, account_references, is_broken
+
+REST_PREFIX = "/santaba/rest"
+DEFAULT_RATE_LIMIT = 500
+DEFAULT_WINDOW = 60
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+GZIP_MIN_BYTES = 1024
+
+ROUTES = [
+    ("GET", re.compile(r"/dashboard/groups"), "list_dashboard_groups"),
+    ("GET", re.compile(r"/dashboard/dashboards"), "list_dashboards"),
+    ("GET", re.compile(r"/dashboard/dashboards/(\d+)"), "get_dashboard"),
+    ("GET", re.compile(r"/dashboard/widgets"), "list_widgets"),
+    ("GET", re.compile(r"/dashboard/widgets/(\d+)"), "get_widget"),
+    ("GET", re.compile(r"/dashboard/widgets/(\d+)/data"), "get_widget_data"),
+    ("GET", re.compile(r"/device/devices"), "list_devices"),
+    ("GET", re.compile(r"/device/groups"), "list_device_groups"),
+    ("GET", re.compile(r"/device/devices/(\d+)/instances"), "list_instances"),
+    ("GET", re.compile(r"/sdt/sdts"), "list_sdts"),
+    ("POST", re.compile(r"/sdt/sdts"), "add_sdt"),
+]
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def parse_filter(text):
+    """
+    'groupId:5,displayName:"host-00001"' -> {"groupId": "5", "displayName": "host-00001"}
+    """
+    conditions = {}
+    for part in re.findall(r'(\w+):("[^"]*"|[^,]*)', text or ""):
+        conditions[part[0]] = part[1].strip('"')
+    return conditions
+
+
+def widget_data(widget, broken, points, start=None, end=None):
+    """
+    REST v3 widget-data payload for a widget, with data or (when broken)
+    the empty / "No Data" / zero values LM returns for a broken widget.
+    """
+    rng = random.Random(widget["id"])
+    end = end or int(time.time())
+    start = start or end - 86400
+    widget_type = widget["type"]
+
+    if widget_type == "cgraph":
+        step = max(1, (end - start) // max(1, points))
+        lines = []
+        for datapoint in widget.get("graphInfo", {}).get("dataPoints", [{"name": "dp0"}]):
+            values = [] if broken else [round(rng.uniform(0, 100), 2) for _ in range(points)]
+            lines.append({"label": datapoint["name"], "data": values, "legend": datapoint["name"]})
+        return {"type": "graph", "title": widget["name"], "startTime": start * 1000, "endTime": end * 1000,
+                "timestamps": [(start + i * step) * 1000 for i in range(points)], "lines": lines}
+    if widget_type == "bignumber":
+        value = "No Data" if broken else round(rng.uniform(0, 100), 2)
+        return {"type": "bigNumber", "title": widget["name"], "data": [{"value": value, "label": "dp0"}]}
+    if widget_type == "piechart":
+        return {"type": "pieChart", "title": widget["name"],
+                "data": [{"label": f"slice{i}", "value": 0 if broken else rng.randint(1, 50)} for i in range(4)]}
+    if widget_type == "gauge":
+        return {"type": "gauge", "title": widget["name"],
+                "currentValue": None if broken else round(rng.uniform(1, 100), 2),
+                "historyValues": [] if broken else [round(rng.uniform(1, 100), 2) for _ in range(points)]}
+    if widget_type == "devicesla":
+        value = "Group not found" if broken else f"{rng.uniform(95, 100):.3f}"
+        return {"type": "deviceSLA", "title": widget["name"], "resultList": [{"value": value}]}
+    if widget_type == "table":
+        rows = [] if broken else [{"deviceDisplayName": f"host-{i}", "values": [rng.randint(0, 100)]} for i in range(5)]
+        return {"type": "table", "title": widget["name"], "rows": rows}
+    return {"type": widget_type, "title": widget["name"], "items": []}
+
+
+class MockLMServer:
+    """
+    The mock API over a synthetic account, served from a background thread.
+    """
+
+    def __init__(self, account, host="127.0.0.1", port=0, latency=0.0, jitter=0.0,
+                 rate_limit=DEFAULT_RATE_LIMIT, window=DEFAULT_WINDOW, error_rate=0.0,
+                 retry_after=None, access_keys=None, seed=1):
+        self.account = account
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.window = window
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.access_keys = access_keys or {}
+        self.stats = Counter()  # endpoint -> requests; "status:429" etc.
+        self.sdts = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._windows = {}  # access ID -> (window start, requests in it)
+
+        self.dashboards = {d["id"]: d for d in account["dashboards"]}
+        self.widgets = {w["id"]: w for w in account["widgets"]}
+        # Broken or not follows from each widget's config, so edits to it count
+        self.references = account_references(account)
+        self.instances = {}
+        for instance in account["instances"]:
+            self.instances.setdefault(instance["deviceId"], []).append(instance)
+
+        self.httpd = ThreadingHTTPServer((host, port), MockHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{REST_PREFIX}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats.clear()
+            self._windows.clear()
+
+    def calls(self):
+        with self._lock:
+            return sum(count for key, count in self.stats.items() if not key.startswith("status:"))
+
+    # --- auth and rate limit ------------------------------------------
+
+    def authenticate(self, method, path, body, authorization):
+        match = re.fullmatch(r"LMv1 ([^:]+):([^:]+):(\d+)", authorization or "")
+        if not match:
+            raise ApiError(401, "Authentication failed: missing or malformed LMv1 header")
+        access_id, signature, epoch = match.groups()
+        if self.access_keys:
+            key = self.access_keys.get(access_id)
+            if key is None:
+                raise ApiError(401, f"Authentication failed: unknown access ID {access_id}")
+            digest = hmac.new(key.encode("utf-8"), (method + epoch + body + path).encode("utf-8"),
+                              hashlib.sha256).hexdigest()
+            expected = base64.b64encode(digest.encode("utf-8")).decode()
+            if not hmac.compare_digest(expected, signature):
+                raise ApiError(401, "Authentication failed: bad signature")
+        return access_id
+
+    def take_slot(self, access_id):
+        """
+        Count a request against its access ID's window. Returns the
+        x-rate-limit-* headers and whether the request is over the limit.
+        """
+        with self._lock:
+            now = time.monotonic()
+            started, used = self._windows.get(access_id, (now, 0))
+            if now - started >= self.window:
+                started, used = now, 0
+            used += 1
+            self._windows[access_id] = (started, used)
+            limited = used > self.rate_limit or self._random.random() < self.error_rate
+        headers = {
+            "x-rate-limit-limit": str(self.rate_limit),
+            "x-rate-limit-remaining": str(max(0, self.rate_limit - used)),
+            "x-rate-limit-window": str(self.window),
+        }
+        return headers, limited
+
+    def delay(self):
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter)))
+
+    # --- endpoints ------------------------------------------------------
+
+    def page(self, items, query):
+        conditions = parse_filter(query.get("filter"))
+        if conditions:
+            items = [item for item in items
+                     if all(str(item.get(key)) == value for key, value in conditions.items())]
+        offset = int(query.get("offset") or 0)
+        size = min(MAX_PAGE_SIZE, int(query.get("size") or DEFAULT_PAGE_SIZE))
+        fields = query.get("fields")
+        page = items[offset:offset + size]
+        if fields:
+            keep = fields.split(",")
+            page = [{key: item[key] for key in keep if key in item} for item in page]
+        return {"total": len(items), "searchId": None, "items": page}
+
+    def lookup(self, table, item_id, kind):
+        item = table.get(int(item_id))
+        if item is None:
+            raise ApiError(404, f"No such {kind}: {item_id}")
+        return item
+
+    def list_dashboard_groups(self, query):
+        return self.page(self.account["groups"], query)
+
+    def list_dashboards(self, query):
+        # Layouts come with the detail, or when asked for by name
+        dashboards = self.account["dashboards"]
+        if "widgetsConfig" not in (query.get("fields") or ""):
+            dashboards = [{k: v for k, v in d.items() if k != "widgetsConfig"} for d in dashboards]
+        return self.page(dashboards, query)
+
+    def get_dashboard(self, query, dashboard_id):
+        return self.lookup(self.dashboards, dashboard_id, "dashboard")
+
+    def list_widgets(self, query):
+        return self.page(self.account["widgets"], query)
+
+    def get_widget(self, query, widget_id):
+        return self.lookup(self.widgets, widget_id, "widget")
+
+    def get_widget_data(self, query, widget_id):
+        widget = self.lookup(self.widgets, widget_id, "widget")
+        start = int(query["start"]) if query.get("start") else None
+        end = int(query["end"]) if query.get("end") else None
+        return widget_data(widget, is_broken(widget, self.references), self.account.get("points", 60), start, end)
+
+    def list_devices(self, query):
+        return self.page(self.account["devices"], query)
+
+    def list_device_groups(self, query):
+        return self.page(self.account["device_groups"], query)
+
+    def list_instances(self, query, device_id):
+        return self.page(self.instances.get(int(device_id), []), query)
+
+    def list_sdts(self, query):
+        with self._lock:
+            return self.page(list(self.sdts), query)
+
+    def add_sdt(self, query, body):
+        sdt = json.loads(body or "{}")
+        with self._lock:
+            sdt["id"] = f"R_{len(self.sdts) + 1}"
+            self.sdts.append(sdt)
+        return sdt
+
+    def handle(self, method, path, query, body, authorization):
+        """
+        Returns (status, headers, payload).
+        """
+        headers = {}
+        try:
+            access_id = self.authenticate(method, path, body, authorization)
+            headers, limited = self.take_slot(access_id)
+            self.delay()
+            if limited:
+                if self.retry_after is not None:
+                    headers["Retry-After"] = str(self.retry_after)
+                raise ApiError(429, "Too Many Requests")
+            for route_method, pattern, handler in ROUTES:
+                match = pattern.fullmatch(path)
+                if match and route_method == method:
+                    args = match.groups() + ((body,) if method == "POST" else ())
+                    return 200, headers, getattr(self, handler)(query, *args)
+            raise ApiError(404, f"No such resource: {method} {path}")
+        except ApiError as e:
+            return e.status, headers, {"errorMessage": e.message, "errorCode": e.status}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as the portal does
+
+    def _serve(self, method):
+        mock = self.server.mock
+        url = urlparse(self.path)
+        path = url.path[len(REST_PREFIX):] if url.path.startswith(REST_PREFIX) else url.path
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8") if length else ""
+
+        status, headers, payload = mock.handle(method, path, query, body, self.headers.get("Authorization"))
+        with mock._lock:
+            mock.stats[endpoint_name(path)] += 1
+            mock.stats[f"status:{status}"] += 1
+
+        data = json.dumps(payload).encode("utf-8")
+        if len(data) >= GZIP_MIN_BYTES and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            data = gzip.compress(data, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._serve("GET")
+
+    def do_POST(self):
+        self._serve("POST")
+
+    def log_message(self, format, *args):
+        pass  # one line per request would dominate a benchmark
+
+
+def parse_access_keys(values):
+    keys = {}
+    for value in values or []:
+        access_id, _, access_key = value.partition(":")
+        keys[access_id] = access_key
+    return keys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock LogicMonitor REST API over a synthetic account.")
+    parser.add_argument("--account", help="Account file from synthetic_account.py (default: generate one)")
+    parser.add_argument("--dashboards", type=int, default=500, help="Generated account: dashboards (default: 500)")
+    parser.add_argument("--widgets", type=int, default=8000, help="Generated account: widgets (default: 8000)")
+    parser.add_argument("--broken", type=float, default=0.1, help="Generated account: broken share (default: 0.1)")
+    parser.add_argument("--host", default="127.0.0.1", help="Listen address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Listen port (default: 8080)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per request (default: 0)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random +/- latency per request (default: 0)")
+    parser.add_argument("--rate-limit", type=int, default=DEFAULT_RATE_LIMIT,
+                        help=f"Requests per window per access ID before HTTP 429 (default: {DEFAULT_RATE_LIMIT})")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW,
+                        help=f"Rate-limit window in seconds (default: {DEFAULT_WINDOW})")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Share of requests answered with HTTP 429 regardless of the limit (default: 0)")
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--access-key", action="append", metavar="ID:KEY",
+                        help="Check LMv1 signatures for this access ID and key (repeatable); "
+                             "without it any well-formed LMv1 header is accepted")
+    args = parser.parse_args()
+
+    if args.account:
+        account = load_account(args.account)
+    else:
+        account = generate_account(dashboards=args.dashboards, widgets=args.widgets, broken=args.broken)
+    server = MockLMServer(account, host=args.host, port=args.port,
+                          latency=args.latency_ms / 1000.0, jitter=args.jitter_ms / 1000.0,
+                          rate_limit=args.rate_limit, window=args.window, error_rate=args.error_rate,
+                          retry_after=args.retry_after, access_keys=parse_access_keys(args.access_key))
+    print(f"Mock LogicMonitor API on {server.base_url}: {len(account['dashboards'])} dashboards, "
+          f"{len(account['widgets'])} widgets ({len(account['broken'])} broken)")
+    print(f"Run the scripts with LM_BASE_URL={server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nServed {server.calls()} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Module: run_bench.py
+Description:
+    Benchmark the repository's scripts against the mock LogicMonitor API
+    (mock_lm_server.py) over a synthetic account (synthetic_account.py).
+
+        python run_bench.py --dashboards 5000 --widgets 80000 --broken 0.1 --latency-ms 20
+        python run_bench.py --tools scanner --scanner-args "--concurrency 16 --probe"
+
+    Each tool runs as its own process in a scratch folder, with LM_BASE_URL
+    pointing at the mock, and is measured for wall time, API calls (counted
+    by the server), calls per second and peak RSS. Results are printed and
+    appended to bench_results.jsonl, so runs can be compared over time.
+
+    Tools:
+        scanner   py/broken_dash project/ver4.14/test4.14.py
+        backup    dashboard_backup.py
+        sdt       modernsdt_updated.py, on a devices.csv of --sdt-rows devices
+"""
+
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+from lm_client import BASE_URL_ENV
+from mock_lm_server import MockLMServer
+from synthetic_account import generate_account, load_account
+
+SCANNER = os.path.join(REPO_ROOT, "py", "broken_dash project", "ver4.14", "test4.14.py")
+BACKUP = os.path.join(REPO_ROOT, "dashboard_backup.py")
+SDT_LOADER = os.path.join(REPO_ROOT, "modernsdt_updated.py")
+
+BENCH_ACCOUNT = "bench"
+BENCH_ACCESS_ID = "bench-id"
+BENCH_ACCESS_KEY = "bench-key"
+# dashboard_backup.py signs with its placeholder credentials
+ACCESS_KEYS = {BENCH_ACCESS_ID: BENCH_ACCESS_KEY, "your-access-id": "your-access-key"}
+RESULTS_FILE = "bench_results.jsonl"
+
+
+def scanner_run(workdir, args, account):
+    credentials = os.path.join(workdir, "credentials.json")
+    with open(credentials, "w", encoding="utf-8") as f:
+        json.dump({"account": BENCH_ACCOUNT, "access_id": BENCH_ACCESS_ID, "access_key": BENCH_ACCESS_KEY}, f)
+    return [sys.executable, SCANNER, "--credentials", credentials] + shlex.split(args.scanner_args), None
+
+
+def backup_run(workdir, args, account):
+    return [sys.executable, BACKUP] + shlex.split(args.backup_args), None
+
+
+def sdt_run(workdir, args, account):
+    names = [device["displayName"] for device in account["devices"][:args.sdt_rows]]
+    with open(os.path.join(workdir, "devices.csv"), "w", encoding="utf-8") as f:
+        f.write("Name,Start,End\n")
+        for name in names + ["host-missing"]:
+            f.write(f"{name},2030-01-01 01:00,2030-01-01 03:00\n")
+    # Company, access ID and access key prompts
+    return [sys.executable, SDT_LOADER], f"{BENCH_ACCOUNT}\n{BENCH_ACCESS_ID}\n{BENCH_ACCESS_KEY}\n"
+
+
+TOOLS = {"scanner": scanner_run, "backup": backup_run, "sdt": sdt_run}
+
+
+def wait_with_rusage(proc):
+    """
+    Wait for a child and return its peak RSS in bytes (None where the
+    platform has no wait4).
+    """
+    if not hasattr(os, "wait4"):
+        proc.wait()
+        return None
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    return usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def run_tool(name, server, account, args):
+    workdir = tempfile.mkdtemp(prefix=f"bench_{name}_")
+    argv, stdin = TOOLS[name](workdir, args, account)
+    env = dict(os.environ, **{BASE_URL_ENV: server.base_url, "PYTHONPATH": REPO_ROOT})
+    log_path = os.path.join(workdir, f"{name}.log")
+
+    server.reset_stats()
+    with open(log_path, "w", encoding="utf-8") as log:
+        start = time.perf_counter()
+        # A new session has no controlling terminal, so getpass() reads stdin
+        proc = subprocess.Popen(argv, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT,
+                                stdin=subprocess.PIPE if stdin else subprocess.DEVNULL,
+                                start_new_session=True)
+        timer = threading.Timer(args.timeout, proc.kill)
+        timer.start()
+        if stdin:
+            proc.stdin.write(stdin.encode("utf-8"))
+            proc.stdin.close()
+        peak_rss = wait_with_rusage(proc)
+        timer.cancel()
+        wall = time.perf_counter() - start
+
+    calls = server.calls()
+    result = {
+        "tool": name,
+        "exit_code": proc.returncode,
+        "wall_seconds": round(wall, 3),
+        "api_calls": calls,
+        "calls_per_second": round(calls / wall, 1) if wall else None,
+        "peak_rss_mb": round(peak_rss / 2 ** 20, 1) if peak_rss else None,
+        "http_429": server.stats.get("status:429", 0),
+        "log": log_path,
+    }
+    if proc.returncode != 0:
+        with open(log_path, "r", encoding="utf-8", errors="replace") as f:
+            lines = [line.strip() for line in f if line.strip()]
+        result["error"] = lines[-1] if lines else "no output"
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scripts against the mock LogicMonitor API.")
+    parser.add_argument("--account", help="Account file from synthetic_account.py (default: generate one)")
+    parser.add_argument("--dashboards", type=int, default=500, help="Generated account: dashboards (default: 500)")
+    parser.add_argument("--widgets", type=int, default=8000, help="Generated account: widgets (default: 8000)")
+    parser.add_argument("--broken", type=float, default=0.1, help="Generated account: broken share (default: 0.1)")
+    parser.add_argument("--seed", type=int, default=1, help="Generated account: random seed (default: 1)")
+    parser.add_argument("--tools", default="scanner,backup,sdt",
+                        help="Comma-separated tools to run: scanner, backup, sdt (default: all)")
+    parser.add_argument("--scanner-args", default="", help="Extra arguments for the scanner, e.g. \"--concurrency 8\"")
+    parser.add_argument("--backup-args", default="", help="Extra arguments for dashboard_backup.py, e.g. \"--workers 16\"")
+    parser.add_argument("--sdt-rows", type=int, default=200, help="Devices in the SDT loader's CSV (default: 200)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Mock latency per request (default: 20)")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="Mock latency jitter (default: 5)")
+    parser.add_argument("--rate-limit", type=int, default=100000,
+                        help="Mock requests per window before HTTP 429; the portal's is 500 (default: 100000)")
+    parser.add_argument("--window", type=int, default=60, help="Mock rate-limit window in seconds (default: 60)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock share of random HTTP 429s (default: 0)")
+    parser.add_argument("--retry-after", type=float, default=None,
+                        help="Mock Retry-After seconds sent with HTTP 429s (default: none)")
+    parser.add_argument("--timeout", type=float, default=3600, help="Kill a tool after this many seconds (default: 3600)")
+    parser.add_argument("--results", default=RESULTS_FILE, help=f"Results log, JSON lines (default: {RESULTS_FILE})")
+    args = parser.parse_args()
+
+    if args.account:
+        account = load_account(args.account)
+    else:
+        account = generate_account(dashboards=args.dashboards, widgets=args.widgets, broken=args.broken, seed=args.seed)
+    server = MockLMServer(account, latency=args.latency_ms / 1000.0, jitter=args.jitter_ms / 1000.0,
+                          rate_limit=args.rate_limit, window=args.window, error_rate=args.error_rate,
+                          retry_after=args.retry_after, access_keys=ACCESS_KEYS).start()
+    print(f"Mock API on {server.base_url}: {len(account['dashboards'])} dashboards, "
+          f"{len(account['widgets'])} widgets ({len(account['broken'])} broken)")
+
+    results = []
+    try:
+        for name in args.tools.split(","):
+            name = name.strip()
+            if name not in TOOLS:
+                print(f"Unknown tool: {name}")
+                continue
+            print(f"Running {name}...", flush=True)
+            results.append(run_tool(name, server, account, args))
+    finally:
+        server.stop()
+
+    print(f"\n{'tool':<10}{'exit':>6}{'wall s':>10}{'calls':>9}{'calls/s':>10}{'peak MB':>10}{'429s':>7}")
+    for r in results:
+        print(f"{r['tool']:<10}{r['exit_code']:>6}{r['wall_seconds']:>10}{r['api_calls']:>9}"
+              f"{str(r['calls_per_second']):>10}{str(r['peak_rss_mb']):>10}{r['http_429']:>7}")
+        if "error" in r:
+            print(f"  {r['tool']} failed: {r['error']} (log: {r['log']})")
+
+    run = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "dashboards": len(account["dashboards"]),
+        "widgets": len(account["widgets"]),
+        "latency_ms": args.latency_ms,
+        "scanner_args": args.scanner_args,
+        "backup_args": args.backup_args,
+    }
+    with open(args.results, "a", encoding="utf-8") as f:
+        for r in results:
+            f.write(json.dumps(dict(run, **r)) + "\n")
+    print(f"\nResults appended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
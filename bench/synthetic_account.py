@@ -0,0 +1,288 @@
+"""
+Module: synthetic_account.py
+Description:
+    Generate a synthetic LogicMonitor account for the mock API server
+    (mock_lm_server.py): dashboard groups, dashboards with widget tokens
+    and layouts, widgets of the common types with a share of them broken,
+    devices, device groups and instances.
+
+        python synthetic_account.py --dashboards 5000 --widgets 80000 --broken 0.1 -o account.json
+
+    A broken widget is broken by its config, as on a real portal: it
+    points at a device, instance or device group that does not exist, or
+    at a datapoint its datasource does not have. is_broken() derives the
+    verdict from the config alone, so widgets with the same query always
+    get the same verdict, and "broken" in the account lists the widgets it
+    flags.
+
+    Widget data is not stored; the server builds it per request from the
+    widget's type, is_broken() and `points`, so even large accounts stay
+    small on disk. The same seed always gives the same account.
+"""
+
+import argparse
+import json
+import random
+
+# Widget type (REST "type", SDK discriminator) -> share of widgets
+WIDGET_MIX = {
+    "cgraph": 0.35,
+    "bignumber": 0.20,
+    "table": 0.10,
+    "piechart": 0.08,
+    "gauge": 0.07,
+    "devicesla": 0.05,
+    "html": 0.05,
+    "alert": 0.05,
+    "text": 0.05,
+}
+
+GROUP_NAMES = ["Network", "Servers", "Storage", "Cloud", "Applications", "Databases", "Security", "NOC"]
+# References a broken widget's config points at; none of them exist in any account
+MISSING_DEVICE_ID = 9999999
+MISSING_DEVICE_NAME = "host-decommissioned"
+MISSING_INSTANCE_ID = 9999999
+MISSING_GROUP_PATH = "Decommissioned/Retired"
+BAD_DATAPOINT = "NoSuchDatapoint"
+
+# Widget type -> ways its config can be broken
+FAULTS = {
+    "cgraph": ("device", "datapoint"),
+    "bignumber": ("device", "datapoint"),
+    "piechart": ("device", "datapoint"),
+    "gauge": ("device", "datapoint"),
+    "table": ("device", "instance"),
+    "devicesla": ("group",),
+}
+
+WIDGET_NAMES = ["CPU Utilization", "Memory Usage", "Disk Latency", "Interface Throughput", "Ping Loss",
+                "Alert Count", "Uptime", "Queue Depth", "Response Time", "Connections"]
+
+
+def widget_detail(widget_id, widget_type, dashboard_id, name, device, instance_id=None, fault=None):
+    """
+    Widget definition in REST v3 form, with the fields the SDK models require.
+    `fault` (see FAULTS) breaks the config.
+    """
+    widget = {
+        "id": widget_id,
+        "name": name,
+        "type": widget_type,
+        "dashboardId": dashboard_id,
+        "description": "",
+        "interval": 5,
+        "theme": "newBorderBlue",
+        "lastUpdatedOn": 1700000000 + widget_id,
+        "lastUpdatedBy": "bench",
+        "userPermission": "write",
+        "timescale": "1day",
+    }
+    device_name = MISSING_DEVICE_NAME if fault == "device" else device["name"]
+    datapoint = {
+        "deviceGroupFullPath": device["group"],
+        "deviceDisplayName": device_name,
+        "dataSourceFullName": "CPU (WinCPU)",
+        "instanceName": "*",
+        "dataPointName": BAD_DATAPOINT if fault == "datapoint" else "CPUBusyPercent",
+    }
+    if widget_type == "cgraph":
+        # Custom graph datapoints match devices, groups and instances by glob
+        widget["graphInfo"] = {"dataPoints": [
+            dict(datapoint, name=f"dp{i}",
+                 deviceGroupFullPath={"value": device["group"], "isGlob": False},
+                 deviceDisplayName={"value": device_name, "isGlob": False},
+                 instanceName={"value": "*", "isGlob": True},
+                 display={"type": "line", "legend": f"dp{i}", "color": "blue"})
+            for i in range(3)
+        ]}
+    elif widget_type == "bignumber":
+        widget["bigNumberInfo"] = {"dataPoints": [dict(datapoint, name="dp0")],
+                                   "bigNumberItems": [{"dataPointName": "dp0", "useCommaSeparators": True}]}
+    elif widget_type == "piechart":
+        widget["pieChartInfo"] = {"dataPoints": [dict(datapoint, name="dp0")],
+                                  "pieChartItems": [{"dataPointName": "dp0", "legend": "CPU", "color": "blue"}]}
+    elif widget_type == "gauge":
+        widget["dataPoint"] = dict(datapoint, name="dp0")
+    elif widget_type == "table":
+        widget["columns"] = [{"columnName": "Value",
+                              "dataPoint": {"dataSourceId": 1, "dataPointId": 1, "dataPointName": "CPUBusyPercent"}}]
+        widget["rows"] = [{"deviceId": MISSING_DEVICE_ID if fault == "device" else device["id"],
+                           "deviceDisplayName": device_name,
+                           "instanceId": MISSING_INSTANCE_ID if fault == "instance" else instance_id,
+                           "groupFullPath": device["group"]}]
+    elif widget_type == "devicesla":
+        widget["metrics"] = [{"groupName": MISSING_GROUP_PATH if fault == "group" else device["group"]}]
+    elif widget_type == "html":
+        widget["resources"] = []
+        widget["content"] = "<p>Runbook</p>"
+    elif widget_type == "text":
+        widget["content"] = "Notes"
+    return widget
+
+
+def account_references(account):
+    """
+    What exists in an account, for is_broken().
+    """
+    return {
+        "device_ids": {device["id"] for device in account["devices"]},
+        "device_names": {device["displayName"] for device in account["devices"]},
+        "instances": {(instance["deviceId"], instance["id"]) for instance in account["instances"]},
+        "group_paths": {group["fullPath"] for group in account["device_groups"]},
+    }
+
+
+def reference_value(value):
+    # Custom graphs wrap references as {"value": ..., "isGlob": ...}
+    return value.get("value") if isinstance(value, dict) else value
+
+
+def is_broken(widget, references):
+    """
+    Whether a widget's config points at something missing from the account
+    (`references`, from account_references()) or at an unknown datapoint.
+    """
+    datapoints = list(widget.get("graphInfo", {}).get("dataPoints", []))
+    datapoints += widget.get("bigNumberInfo", {}).get("dataPoints", [])
+    datapoints += widget.get("pieChartInfo", {}).get("dataPoints", [])
+    if "dataPoint" in widget:
+        datapoints.append(widget["dataPoint"])
+    for datapoint in datapoints:
+        if datapoint.get("dataPointName") == BAD_DATAPOINT:
+            return True
+        if reference_value(datapoint.get("deviceDisplayName")) not in references["device_names"]:
+            return True
+    for row in widget.get("rows", []):
+        if row["deviceId"] not in references["device_ids"]:
+            return True
+        if row.get("instanceId") is not None and (row["deviceId"], row["instanceId"]) not in references["instances"]:
+            return True
+    for metric in widget.get("metrics", []):
+        if metric["groupName"] not in references["group_paths"]:
+            return True
+    return False
+
+
+def generate_account(dashboards=500, widgets=8000, broken=0.1, groups=None, devices=None,
+                     instances_per_device=2, points=60, seed=1):
+    """
+    Build an account dict: {"groups", "dashboards", "widgets", "broken",
+    "devices", "device_groups", "instances", "points"}. About `broken` of
+    the data widgets get a broken config.
+    """
+    rng = random.Random(seed)
+    groups = groups or max(1, dashboards // 50)
+    devices = devices or max(10, dashboards // 5)
+
+    device_groups = [{"id": i + 1, "name": f"{GROUP_NAMES[i % len(GROUP_NAMES)]}-{i + 1}",
+                      "fullPath": f"{GROUP_NAMES[i % len(GROUP_NAMES)]}/{GROUP_NAMES[i % len(GROUP_NAMES)]}-{i + 1}",
+                      "parentId": 1}
+                     for i in range(max(1, devices // 25))]
+    device_list = []
+    for i in range(devices):
+        group = device_groups[i % len(device_groups)]
+        device_list.append({
+            "id": i + 1,
+            "name": f"host-{i + 1:05d}",
+            "displayName": f"host-{i + 1:05d}",
+            "hostGroupIds": str(group["id"]),
+            "group": group["fullPath"],
+        })
+    instances = []
+    device_instances = {}
+    for device in device_list:
+        for n in range(instances_per_device):
+            instances.append({"id": len(instances) + 1, "deviceId": device["id"],
+                              "displayName": f"cpu{n}", "name": f"cpu{n}"})
+            device_instances.setdefault(device["id"], []).append(len(instances))
+
+    dashboard_groups = [{"id": i + 1, "name": f"{GROUP_NAMES[i % len(GROUP_NAMES)]} {i + 1}",
+                         "fullPath": f"{GROUP_NAMES[i % len(GROUP_NAMES)]} {i + 1}", "parentId": 1}
+                        for i in range(groups)]
+
+    # Spread widgets over dashboards: every dashboard gets at least one
+    counts = [1] * dashboards
+    for _ in range(max(0, widgets - dashboards)):
+        counts[rng.randrange(dashboards)] += 1
+
+    types, weights = zip(*WIDGET_MIX.items())
+    dashboard_list = []
+    widget_list = []
+    widget_id = 1000
+    for i in range(dashboards):
+        group = dashboard_groups[i % groups]
+        dashboard_id = i + 1
+        device = device_list[rng.randrange(devices)]
+        tokens = [{"name": "defaultDeviceGroup", "value": device["group"], "type": "owned"},
+                  {"name": "defaultResourceName", "value": device["name"], "type": "owned"}]
+        layout = {}
+        for n in range(counts[i]):
+            widget_id += 1
+            widget_type = rng.choices(types, weights)[0]
+            name = f"{WIDGET_NAMES[rng.randrange(len(WIDGET_NAMES))]} {n + 1}"
+            widget_device = device_list[rng.randrange(devices)]
+            instance_ids = device_instances.get(widget_device["id"])
+            instance_id = instance_ids[rng.randrange(len(instance_ids))] if instance_ids else None
+            fault = None
+            if widget_type in FAULTS and rng.random() < broken:
+                fault = rng.choice(FAULTS[widget_type])
+            widget_list.append(widget_detail(widget_id, widget_type, dashboard_id, name, widget_device,
+                                             instance_id, fault))
+            layout[str(widget_id)] = {"col": 1 + (n % 3) * 4, "row": 1 + n // 3 * 4, "sizex": 4, "sizey": 4}
+        dashboard_list.append({
+            "id": dashboard_id,
+            "name": f"Dashboard {dashboard_id}",
+            "fullName": f"{group['fullPath']}/Dashboard {dashboard_id}",
+            "groupId": group["id"],
+            "groupName": group["name"],
+            "groupFullPath": group["fullPath"],
+            "description": "",
+            "sharable": True,
+            "owner": "bench",
+            "template": None,
+            "widgetTokens": tokens,
+            "widgetsConfig": layout,
+        })
+
+    account = {
+        "seed": seed,
+        "points": points,
+        "groups": dashboard_groups,
+        "dashboards": dashboard_list,
+        "widgets": widget_list,
+        "devices": device_list,
+        "device_groups": device_groups,
+        "instances": instances,
+    }
+    references = account_references(account)
+    account["broken"] = [widget["id"] for widget in widget_list if is_broken(widget, references)]
+    return account
+
+
+def load_account(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic LogicMonitor account for the mock API server.")
+    parser.add_argument("--dashboards", type=int, default=500, help="Dashboards (default: 500)")
+    parser.add_argument("--widgets", type=int, default=8000, help="Widgets across all dashboards (default: 8000)")
+    parser.add_argument("--broken", type=float, default=0.1, help="Share of data widgets that are broken (default: 0.1)")
+    parser.add_argument("--groups", type=int, default=None, help="Dashboard groups (default: dashboards / 50)")
+    parser.add_argument("--devices", type=int, default=None, help="Devices (default: dashboards / 5)")
+    parser.add_argument("--points", type=int, default=60, help="Datapoints per graph line (default: 60)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    parser.add_argument("-o", "--output", default="account.json", help="Output file (default: account.json)")
+    args = parser.parse_args()
+
+    account = generate_account(dashboards=args.dashboards, widgets=args.widgets, broken=args.broken,
+                               groups=args.groups, devices=args.devices, points=args.points, seed=args.seed)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(account, f)
+    print(f"Wrote {args.output}: {len(account['groups'])} groups, {len(account['dashboards'])} dashboards, "
+          f"{len(account['widgets'])} widgets ({len(account['broken'])} broken), {len(account['devices'])} devices")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 from logicmonitor_sdk import configuration, ApiClient
 from logicmonitor_sdk.api import lm_api
 import json
+from paginate import paginate
 
 # -------------------------------
 # CONFIGURE YOUR LM CREDENTIALS
@@ -47,47 +48,40 @@ def main():
 
         print("Scanning dashboards for broken widgets...")
 
-        offset = 0
-        limit = 100
         broken = []
 
-        while True:
+        def fetch_page(offset, size):
             # GET dashboards list
             dashboards_resp = api.call_api(
                 resource_path='/dashboard/dashboards',
                 method='GET',
-                query_params={'offset': offset, 'size': limit},
+                query_params={'offset': offset, 'size': size},
                 response_type='object'
             )
-            dashboards = dashboards_resp.get('items', [])
-
-            if not dashboards:
-                break
-
-            for dash in dashboards:
-                dash_id = dash.get("id")
-                dash_name = dash.get("name", "Unnamed Dashboard")
-
-                # GET dashboard details
-                dash_detail = api.call_api(
-                    resource_path=f'/dashboard/dashboards/{dash_id}',
-                    method='GET',
-                    response_type='object'
-                )
-                widgets = dash_detail.get("widgets", [])
-
-                for w in widgets:
-                    if is_widget_broken(w):
-                        broken.append({
-                            "dashboard_name": dash_name,
-                            "dashboard_id": dash_id,
-                            "widget_name": w.get("name", "Unnamed Widget"),
-                            "widget_id": w.get("id"),
-                            "widget_type": w.get("type"),
-                            "raw_widget": w,
-                        })
-
-            offset += limit
+            return dashboards_resp.get('items', []), dashboards_resp.get('total')
+
+        for dash in paginate(fetch_page):
+            dash_id = dash.get("id")
+            dash_name = dash.get("name", "Unnamed Dashboard")
+
+            # GET dashboard details
+            dash_detail = api.call_api(
+                resource_path=f'/dashboard/dashboards/{dash_id}',
+                method='GET',
+                response_type='object'
+            )
+            widgets = dash_detail.get("widgets", [])
+
+            for w in widgets:
+                if is_widget_broken(w):
+                    broken.append({
+                        "dashboard_name": dash_name,
+                        "dashboard_id": dash_id,
+                        "widget_name": w.get("name", "Unnamed Widget"),
+                        "widget_id": w.get("id"),
+                        "widget_type": w.get("type"),
+                        "raw_widget": w,
+                    })
 
         # --------------------------
         # Output results
@@ -0,0 +1,11 @@
+"""
+Module: csv_loader.py
+Description:
+    load_csv_columns(), under the module name modernsdt_updated.py and the
+    example in import_csv.py import it from. The loader itself lives in
+    import_csv.py.
+"""
+
+from import_csv import load_csv_columns
+
+__all__ = ["load_csv_columns"]
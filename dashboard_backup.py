@@ -5,78 +5,305 @@
 
 """
 This script backs up all dashboards from a LogicMonitor account by retrieving
-dashboard groups and their associated dashboards using the LogicMonitor SDK v3.
+dashboard groups and their associated dashboards through the shared pooled
+LogicMonitor REST client (lm_client.py).
 Each dashboard's configuration is saved as a JSON file in a timestamped folder
 for versioned backups and auditing.
 
+Dashboards are fetched by a pool of --workers threads that share one client
+and one rate limiter, and handed over a bounded queue to a single writer
+thread that saves the files, so disk writes never hold up the API calls.
+A dashboard that fails to fetch or save is logged and the run goes on.
+
+With --format store, dashboards go into a content-addressed snapshot store
+(snapshot_store.py) instead: one compressed blob per distinct config and a
+small manifest per run, so dashboards unchanged since the last run are not
+written again. With --format archive, each run writes one compressed archive
+(snapshot_archive.py) with an index for listing and extracting single
+dashboards.
+
 Requirements:
-- logicmonitor_sdk v3
+- requests
+- lm_client.py in the same directory
 - Valid LogicMonitor API credentials
 
 Outputs:
 - JSON files for each dashboard, saved in a uniquely named folder with the current date and time.
+- With --format store: blobs/ and manifests/ under the output folder instead.
+- With --format archive: one dashboards_<date_time>.zip per run instead.
+- With --metrics FILE: per-endpoint API metrics (metrics.py), written at the end of the
+  run and on SIGUSR1 (kill -USR1 <pid>) while it runs.
+- With --trace FILE: Chrome trace events with a span per dashboard and per API call
+  (tracing.py); open the file in chrome://tracing or ui.perfetto.dev.
 """
 
+import argparse
 import os
 import json
-from logicmonitor_sdk import LMApi
-from logicmonitor_sdk.configuration import Configuration
-from logicmonitor_sdk.api.dashboard_group_api import DashboardGroupApi
-from logicmonitor_sdk.api.dashboard_api import DashboardApi
-from logicmonitor_sdk.exceptions import ApiException
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests import HTTPError, RequestException
+from lm_client import LMClient, DEFAULT_POOL_SIZE
+from rate_limit import shared_limiter
+from paginate import iter_client
+from metrics import Metrics, start_export
+from tracing import Tracer
+from snapshot_store import SnapshotStore
+from snapshot_archive import SnapshotArchive
 
 # Set your API credentials
 LM_ACCOUNT = "your-account-name"  # e.g. 'company123'
 LM_ACCESS_ID = "your-access-id"
 LM_ACCESS_KEY = "your-access-key"
 
-# Setup configuration
-config = Configuration(
-    access_id=LM_ACCESS_ID,
-    access_key=LM_ACCESS_KEY,
-    account=LM_ACCOUNT
-)
-
-# Create API clients
-lm = LMApi(configuration=config)
-dashboard_api = DashboardApi(lm)
-dashboard_group_api = DashboardGroupApi(lm)
-
-# Output folder for backups
-backup_folder = "dashboard_backups"
-os.makedirs(backup_folder, exist_ok=True)
-
-# Get all dashboard groups
-try:
-    dashboard_groups = dashboard_group_api.get_dashboard_group_list(size=1000).items
-except ApiException as e:
-    print(f"Error fetching dashboard groups: {e}")
-    exit(1)
-
-# Loop through all groups and their dashboards
-for group in dashboard_groups:
-    group_id = group.id
-    group_name = group.name.replace("/", "_")
-    
+BACKUP_FOLDER = "dashboard_backups"
+DEFAULT_WORKERS = 8
+# Fetched dashboards waiting for the writer; fetchers block when it is full
+QUEUE_SIZE = 100
+PROGRESS_EVERY = 100
+BACKUP_FORMATS = ("files", "store", "archive")
+
+
+class FileSink:
+    """
+    Saves each dashboard as <Group>__<Dashboard>_<id>.json in one folder.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+
+    def add(self, dashboard_id, group_name, dashboard_name, detail):
+        file_path = os.path.join(self.folder, f"{group_name}__{dashboard_name}_{dashboard_id}.json")
+        # Written under a temporary name so a failed write leaves no partial file
+        tmp_path = file_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(detail, f, indent=2)
+            os.replace(tmp_path, file_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def fail(self, dashboard_id, dashboard_name, error):
+        pass
+
+    def close(self):
+        return self.folder
+
+    def summary(self):
+        return None
+
+
+class BackupStats:
+    """
+    Thread-safe counts of saved and failed dashboards, with a progress line
+    every PROGRESS_EVERY dashboards (or every one with --verbose), and the
+    groups whose dashboards could not be listed. Failures are also recorded
+    in the sink (a snapshot's manifest lists them).
+    """
+
+    def __init__(self, total, sink, verbose=False):
+        self.total = total
+        self.sink = sink
+        self.verbose = verbose
+        self.saved = 0
+        self.failed = []
+        self.failed_groups = []
+        self._lock = threading.Lock()
+
+    def done(self, dashboard_name, group_name):
+        with self._lock:
+            self.saved += 1
+            count = self.saved + len(self.failed)
+            failed = len(self.failed)
+        if self.verbose:
+            print(f"✔️ Backed up: {dashboard_name} (Group: {group_name})")
+        elif count % PROGRESS_EVERY == 0 or count == self.total:
+            print(f"{count}/{self.total} dashboards done ({failed} failed)")
+
+    def fail(self, dashboard_name, dashboard_id, error):
+        with self._lock:
+            self.failed.append((dashboard_name, dashboard_id, str(error)))
+        self.sink.fail(dashboard_id, dashboard_name, error)
+        print(f"❌ Failed to fetch or save dashboard {dashboard_name}: {error}")
+
+    def fail_group(self, group_name, group_id, error):
+        # Not counted in total: the group's dashboards are unknown
+        with self._lock:
+            self.failed_groups.append((group_name, group_id, str(error)))
+        self.sink.fail(group_id, f"group {group_name}", error)
+
+
+def list_dashboards(client, group):
+    """
+    The dashboards in one group, as ((group_name, dashboard) pairs, None),
+    or ([], error) if they could not be listed.
+    """
+    group_name = group["name"].replace("/", "_")
     try:
-        dashboards = dashboard_api.get_dashboards_by_group_id(group_id=group_id).items
-    except ApiException as e:
+        dashboards = list(iter_client(client, "/dashboard/dashboards", filter=f"groupId:{group['id']}"))
+    except (HTTPError, RequestException, ValueError) as e:
         print(f"Error fetching dashboards for group '{group_name}': {e}")
-        continue
+        return [], e
+    return [(group_name, dashboard) for dashboard in dashboards], None
+
 
-    for dashboard in dashboards:
-        dashboard_id = dashboard.id
-        dashboard_name = dashboard.name.replace("/", "_")
-        
+def fetch_dashboard(client, tracer, stats, write_queue, group_name, dashboard):
+    """
+    Fetch one dashboard's full config and queue it for the writer.
+    """
+    dashboard_id = dashboard["id"]
+    dashboard_name = dashboard["name"].replace("/", "_")
+
+    with tracer.span(dashboard_name, "dashboard", dashboard_id=dashboard_id, group=group_name) as span:
         try:
             # Get full dashboard config
-            dashboard_detail = dashboard_api.get_dashboard_by_id(dashboard_id)
-            file_path = os.path.join(
-                backup_folder,
-                f"{group_name}__{dashboard_name}_{dashboard_id}.json"
-            )
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(dashboard_detail.to_dict(), f, indent=2)
-            print(f"✔️ Backed up: {dashboard_name} (Group: {group_name})")
-        except ApiException as e:
-            print(f"❌ Failed to fetch or save dashboard {dashboard_name}: {e}")
+            dashboard_detail = client.get_json(f"/dashboard/dashboards/{dashboard_id}")
+        except (HTTPError, RequestException, ValueError) as e:
+            stats.fail(dashboard_name, dashboard_id, e)
+            span.args["error"] = str(e)
+            return
+    write_queue.put((dashboard_id, group_name, dashboard_name, dashboard_detail))
+
+
+def write_dashboards(write_queue, sink, tracer, stats):
+    """
+    Writer stage: hand queued dashboards to the sink until a None arrives.
+    """
+    while True:
+        item = write_queue.get()
+        if item is None:
+            return
+        dashboard_id, group_name, dashboard_name, dashboard_detail = item
+        with tracer.span("write", "writer", dashboard_id=dashboard_id) as span:
+            try:
+                sink.add(dashboard_id, group_name, dashboard_name, dashboard_detail)
+            except Exception as e:
+                # A dead writer would block the fetchers, so any error only skips this dashboard
+                stats.fail(dashboard_name, dashboard_id, e)
+                span.args["error"] = str(e)
+                continue
+        stats.done(dashboard_name, group_name)
+
+
+def run_backup(client, tracer, sink, workers, verbose=False):
+    """
+    Back up every dashboard into `sink` with `workers` fetch threads and
+    one writer. Returns the BackupStats, or None if the groups could not
+    be listed. A group whose dashboards could not be listed is recorded as
+    failed, so the snapshot does not look complete.
+    """
+    # Get all dashboard groups
+    try:
+        dashboard_groups = list(iter_client(client, "/dashboard/groups"))
+    except (HTTPError, RequestException, ValueError) as e:
+        print(f"Error fetching dashboard groups: {e}")
+        return None
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch") as executor:
+        dashboards = []
+        failed_groups = []
+        listings = executor.map(lambda group: list_dashboards(client, group), dashboard_groups)
+        for group, (listing, error) in zip(dashboard_groups, listings):
+            if error is not None:
+                failed_groups.append((group, error))
+            dashboards.extend(listing)
+        print(f"Backing up {len(dashboards)} dashboards from {len(dashboard_groups)} groups "
+              f"with {workers} workers")
+
+        stats = BackupStats(len(dashboards), sink, verbose)
+        for group, error in failed_groups:
+            stats.fail_group(group["name"].replace("/", "_"), group["id"], error)
+        write_queue = queue.Queue(maxsize=QUEUE_SIZE)
+        writer = threading.Thread(target=write_dashboards, args=(write_queue, sink, tracer, stats), name="writer")
+        writer.start()
+        try:
+            futures = {executor.submit(fetch_dashboard, client, tracer, stats, write_queue,
+                                       group_name, dashboard): dashboard
+                       for group_name, dashboard in dashboards}
+            for future in as_completed(futures):
+                # Anything unexpected is still only this dashboard's failure
+                if future.exception() is not None:
+                    dashboard = futures[future]
+                    stats.fail(dashboard.get("name"), dashboard.get("id"), future.exception())
+        finally:
+            write_queue.put(None)
+            writer.join()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Back up all LogicMonitor dashboards as JSON files.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Dashboards fetched in parallel (default: {DEFAULT_WORKERS}; 1 = one at a time)")
+    parser.add_argument("--output", default=BACKUP_FOLDER, help=f"Output folder (default: {BACKUP_FOLDER})")
+    parser.add_argument("--format", choices=BACKUP_FORMATS, default="files",
+                        help="files: a JSON file per dashboard; store: deduplicated snapshot store; "
+                             "archive: one indexed archive per run (default: files)")
+    parser.add_argument("--verbose", action="store_true", help="Print a line per dashboard instead of progress")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="Record per-endpoint API metrics (requests, errors, latency histogram, bytes, "
+                             "429 retries, rate-limit waits) and write them to FILE at the end of the run: "
+                             "Prometheus text, or JSON if FILE ends in .json. Send SIGUSR1 to write it now")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Write dashboard, API-call and rate-limit-wait spans to FILE in "
+                             "Chrome trace-event JSON, for chrome://tracing or ui.perfetto.dev")
+    args = parser.parse_args()
+    workers = max(1, args.workers)
+
+    # Create the shared API client (one keep-alive session for the whole run),
+    # with a connection per worker. The rate-limit budget is shared by the
+    # workers and with other tools using the same access ID.
+    metrics = None
+    exporter = None
+    if args.metrics:
+        metrics = Metrics("dashboard_backup")
+        exporter = start_export(metrics, args.metrics)
+    # Without a file the tracer records nothing
+    tracer = Tracer(args.trace, "dashboard_backup")
+    client = LMClient(LM_ACCOUNT, LM_ACCESS_ID, LM_ACCESS_KEY,
+                      pool_size=max(DEFAULT_POOL_SIZE, workers),
+                      limiter=shared_limiter(LM_ACCOUNT, LM_ACCESS_ID),
+                      metrics=metrics, tracer=tracer)
+
+    # Output folder for backups
+    os.makedirs(args.output, exist_ok=True)
+    if args.format == "store":
+        sink = SnapshotStore(args.output).snapshot()
+    elif args.format == "archive":
+        sink = SnapshotArchive(args.output)
+    else:
+        sink = FileSink(args.output)
+
+    try:
+        stats = run_backup(client, tracer, sink, workers, args.verbose)
+    finally:
+        if exporter is not None:
+            exporter.stop()
+        tracer.close()
+        client.close()
+    if stats is None:
+        exit(1)
+
+    # A snapshot's manifest or an archive's index is only written for a run that listed the dashboards
+    saved_to = sink.close()
+    print(f"Backed up {stats.saved} of {stats.total} dashboards to {saved_to}")
+    if sink.summary():
+        print(sink.summary())
+    if stats.failed:
+        print(f"{len(stats.failed)} failed:")
+        for dashboard_name, dashboard_id, error in stats.failed:
+            print(f"  {dashboard_name} ({dashboard_id}): {error}")
+    if stats.failed_groups:
+        print(f"{len(stats.failed_groups)} group(s) could not be listed, so their dashboards were not backed up:")
+        for group_name, group_id, error in stats.failed_groups:
+            print(f"  {group_name} ({group_id}): {error}")
+    if args.metrics:
+        print(f"API metrics written to {args.metrics}")
+    if args.trace:
+        print(f"Trace written to {args.trace}")
+
+
+if __name__ == "__main__":
+    main()
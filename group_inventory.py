@@ -8,8 +8,9 @@ Description:
 """
 
 import json
-import logicmonitor_sdk
-from logicmonitor_sdk.rest import ApiException
+from requests import HTTPError
+from lm_client import LMClient
+from paginate import iter_client
 
 # --- Load config ---
 with open('config.json') as f:
@@ -21,38 +22,30 @@ COMPANY = config['company']
 TARGET_GROUP_NAME = config['group_name']
 
 # --- Configure API client ---
-configuration = logicmonitor_sdk.Configuration()
-configuration.access_id = ACCESS_ID
-configuration.access_key = ACCESS_KEY
-configuration.company = COMPANY
-
-api_client = logicmonitor_sdk.ApiClient(configuration)
-device_api = logicmonitor_sdk.DeviceApi(api_client)
-device_group_api = logicmonitor_sdk.DeviceGroupApi(api_client)
+client = LMClient(COMPANY, ACCESS_ID, ACCESS_KEY)
 
 try:
     # Step 1: Get all device groups and match by name
-    groups_response = device_group_api.get_device_groups()
-    matching_groups = [g for g in groups_response.data.items if g.name == TARGET_GROUP_NAME]
+    groups = iter_client(client, '/device/groups', fields='id,name')
+    matching_groups = [g for g in groups if g.get('name') == TARGET_GROUP_NAME]
 
     if not matching_groups:
         print(f"No group found with name: {TARGET_GROUP_NAME}")
         exit(1)
 
     group = matching_groups[0]
-    group_id = group.id
-    print(f"\nFound group '{group.name}' (ID: {group_id})\n")
+    group_id = group['id']
+    print(f"\nFound group '{group['name']}' (ID: {group_id})\n")
 
     # Step 2: Get devices in the group
-    device_response = device_api.get_devices(filter=f"groupId:{group_id}")
-    devices = device_response.data.items
+    devices = list(iter_client(client, f'/device/groups/{group_id}/devices'))
 
     print(f"Devices in group '{TARGET_GROUP_NAME}':")
     if devices:
         for device in devices:
-            print(f"  - {device.display_name} (hostname: {device.name})")
+            print(f"  - {device.get('displayName')} (hostname: {device.get('name')})")
     else:
         print("  [No devices found]")
 
-except ApiException as e:
+except HTTPError as e:
     print("API Exception:", e)
@@ -0,0 +1,266 @@
+"""
+Module: lm_client.py
+Description:
+    Shared LogicMonitor REST client used by the scripts in this repository.
+
+    - One keep-alive requests.Session per client, with a connection pool
+      sized by `pool_size`, so calls reuse TCP+TLS connections instead of
+      opening a new one per request.
+    - LMv1 request signing with the HMAC key object built once and copied
+      per request.
+    - gzip-compressed responses (Accept-Encoding: gzip).
+    - Optional shared RateLimiter (rate_limit.py): each request waits for
+      its slot, feeds the x-rate-limit-* headers back, and HTTP 429
+      responses are retried with backoff.
+    - Optional Metrics registry (metrics.py): latency, status, response
+      bytes, 429 retries and rate-limit waits are recorded per endpoint.
+    - Optional Tracer (tracing.py): each attempt and rate-limit wait is a
+      span in the run's Chrome trace.
+    - `sdk_api()` builds a logicmonitor_sdk LMApi whose urllib3 pool is sized
+      the same way, for scripts that still use SDK models.
+    - The LM_BASE_URL environment variable points both at another API base
+      URL, e.g. the local mock server in bench/.
+
+Expected config file format (either key style is accepted):
+    {
+        "account": "your-account-subdomain",    # or "company"
+        "access_id": "your-access-id",          # or "accessId"
+        "access_key": "your-access-key"         # or "accessKey"
+    }
+
+Example usage:
+
+    from lm_client import LMClient
+
+    client = LMClient.from_config("config.json")
+    groups = client.get_json("/device/groups", size=50)
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import endpoint_name, instrument_sdk
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 60
+DEFAULT_MAX_RETRIES = 5
+API_VERSION = "3"
+BASE_URL_ENV = "LM_BASE_URL"
+
+
+def load_config(file_path):
+    """
+    Load account and API credentials from a JSON file.
+
+    Returns:
+        tuple: (account, access_id, access_key)
+    """
+    with open(file_path, "r") as f:
+        config = json.load(f)
+
+    account = config.get("account") or config.get("company")
+    access_id = config.get("access_id") or config.get("accessId")
+    access_key = config.get("access_key") or config.get("accessKey")
+
+    missing = [name for name, value in
+               (("account", account), ("access_id", access_id), ("access_key", access_key))
+               if not value]
+    if missing:
+        raise ValueError(f"Missing keys in {file_path}: {missing}")
+
+    return account, access_id, access_key
+
+
+def base_url(account):
+    """
+    REST base URL for an account, unless LM_BASE_URL overrides it.
+    """
+    return os.environ.get(BASE_URL_ENV) or f"https://{account}.logicmonitor.com/santaba/rest"
+
+
+def retry_delay(response, window, attempt):
+    """
+    Seconds to back off after a 429: Retry-After when the server sends it,
+    otherwise a doubling fraction of the rate-limit window.
+    """
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, TypeError, ValueError):
+        return min(window, window / 10.0 * 2 ** (attempt - 1))
+
+
+def new_session(pool_size=DEFAULT_POOL_SIZE, gzip=True):
+    """
+    Create a keep-alive requests.Session with a connection pool of `pool_size`.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if gzip:
+        session.headers["Accept-Encoding"] = "gzip"
+    return session
+
+
+class LMClient:
+    """
+    Pooled, LMv1-signed client for the LogicMonitor REST API (v3).
+
+    Resource paths are relative to /santaba/rest, e.g. "/dashboard/dashboards".
+    The client is safe to share between threads; requests.Session pools
+    connections per host up to `pool_size`.
+    """
+
+    def __init__(self, account, access_id, access_key,
+                 pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, gzip=True,
+                 limiter=None, max_retries=DEFAULT_MAX_RETRIES, metrics=None, tracer=None):
+        self.account = account
+        self.access_id = access_id
+        self.base_url = base_url(account)
+        self.timeout = timeout
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.metrics = metrics
+        self.tracer = tracer
+
+        # Keyed HMAC is built once; each request signs a copy of it
+        self._hmac = hmac.new(access_key.encode("utf-8"), digestmod=hashlib.sha256)
+
+        self.session = new_session(pool_size=pool_size, gzip=gzip)
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "X-Version": API_VERSION,
+        })
+
+    @classmethod
+    def from_config(cls, file_path, **kwargs):
+        account, access_id, access_key = load_config(file_path)
+        return cls(account, access_id, access_key, **kwargs)
+
+    def sign(self, http_verb, resource_path, body=""):
+        """
+        Build the LMv1 Authorization header value for one request.
+        """
+        epoch = str(int(time.time() * 1000))
+        mac = self._hmac.copy()
+        mac.update((http_verb + epoch + body + resource_path).encode("utf-8"))
+        signature = base64.b64encode(mac.hexdigest().encode("utf-8")).decode()
+        return f"LMv1 {self.access_id}:{signature}:{epoch}"
+
+    def request(self, http_verb, resource_path, params=None, body=None, **kwargs):
+        """
+        Send a signed request and return the requests.Response.
+        With a limiter attached, HTTP 429 responses are retried up to
+        `max_retries` times before being returned to the caller.
+        """
+        http_verb = http_verb.upper()
+        data = json.dumps(body) if body is not None else ""
+        timeout = kwargs.pop("timeout", self.timeout)
+        endpoint = endpoint_name(resource_path) if self.metrics or self.tracer else None
+
+        attempt = 0
+        while True:
+            if self.limiter:
+                waited = self.limiter.acquire()
+                if self.metrics:
+                    self.metrics.wait(endpoint, waited)
+                if self.tracer and waited > 0:
+                    self.tracer.complete("rate_limit_wait", "limiter", self.tracer.now() - waited * 1e6,
+                                         waited * 1e6, endpoint=endpoint)
+
+            # Sign per attempt: the LMv1 epoch must be fresh
+            headers = {"Authorization": self.sign(http_verb, resource_path, data)}
+            start = time.monotonic()
+            if self.tracer:
+                trace_start = self.tracer.now()
+            try:
+                response = self.session.request(
+                    http_verb,
+                    self.base_url + resource_path,
+                    params=params,
+                    data=data or None,
+                    headers=headers,
+                    timeout=timeout,
+                    **kwargs
+                )
+            except requests.RequestException:
+                if self.metrics:
+                    self.metrics.observe(endpoint, time.monotonic() - start)
+                raise
+            if self.tracer:
+                self.tracer.complete(endpoint, "api", trace_start, self.tracer.now() - trace_start,
+                                     path=resource_path, status=response.status_code)
+            if self.metrics:
+                # Streamed bodies are not read here, so their size is not known
+                nbytes = 0 if kwargs.get("stream") else len(response.content)
+                self.metrics.observe(endpoint, time.monotonic() - start, nbytes, response.status_code)
+
+            if not self.limiter:
+                return response
+            self.limiter.update(response.headers)
+            if response.status_code != 429 or attempt >= self.max_retries:
+                return response
+
+            attempt += 1
+            if self.metrics:
+                self.metrics.retry(endpoint)
+            self.limiter.penalize(retry_delay(response, self.limiter.window, attempt))
+
+    def get(self, resource_path, **params):
+        return self.request("GET", resource_path, params=params or None)
+
+    def post(self, resource_path, body):
+        return self.request("POST", resource_path, body=body)
+
+    def get_json(self, resource_path, **params):
+        """
+        GET a resource and return the decoded JSON body.
+        Raises requests.HTTPError on a non-2xx status.
+        """
+        response = self.get(resource_path, **params)
+        response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def sdk_api(file_path, pool_size=DEFAULT_POOL_SIZE, gzip=True, metrics=None):
+    """
+    Build a logicmonitor_sdk LMApi from a config file, with its urllib3
+    connection pool sized to `pool_size`. With `metrics`, every HTTP
+    request it sends is recorded (see metrics.instrument_sdk).
+    """
+    import logicmonitor_sdk
+
+    account, access_id, access_key = load_config(file_path)
+
+    configuration = logicmonitor_sdk.Configuration()
+    configuration.company = account
+    configuration.access_id = access_id
+    configuration.access_key = access_key
+    configuration.connection_pool_maxsize = pool_size
+    if os.environ.get(BASE_URL_ENV):
+        # Configuration.host has no setter; company sets it from the account
+        configuration._host = os.environ[BASE_URL_ENV]
+
+    api_client = logicmonitor_sdk.ApiClient(configuration)
+    if gzip:
+        api_client.set_default_header("Accept-Encoding", "gzip")
+    api = logicmonitor_sdk.LMApi(api_client)
+    if metrics:
+        instrument_sdk(api, metrics)
+    return api
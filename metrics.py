@@ -0,0 +1,303 @@
+"""
+Module: metrics.py
+Description:
+    Per-endpoint API metrics for the scripts in this repository.
+
+    For every endpoint (dashboard list, dashboard detail, widget, widget
+    data, ...) a Metrics registry counts requests and errors, keeps a
+    latency histogram, and sums response bytes, 429 retries and the time
+    spent waiting for the rate limiter.
+
+    The registry is exported as a Prometheus text file (node_exporter
+    textfile format) or as JSON, chosen by the file extension:
+
+        metrics = Metrics("dashboard_scanner")
+        client = LMClient(..., metrics=metrics)       # REST client
+        instrument_sdk(api_instance, metrics)         # or an SDK LMApi
+        exporter = start_export(metrics, "scan.prom", interval=60)
+        ...
+        exporter.stop()                               # final write
+
+    While running, the file is rewritten every `interval` seconds and on
+    SIGUSR1 (where the platform has it): kill -USR1 <pid>.
+"""
+
+import json
+import os
+import re
+import signal
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+REST_PREFIX = "/santaba/rest"
+
+# SDK method names and REST paths (IDs replaced by {id}) -> endpoint label
+ENDPOINTS = {
+    "get_dashboard_group_list": "dashboard_group_list",
+    "/dashboard/groups": "dashboard_group_list",
+    "get_dashboard_list": "dashboard_list",
+    "/dashboard/dashboards": "dashboard_list",
+    "get_dashboard_by_id": "dashboard_detail",
+    "/dashboard/dashboards/{id}": "dashboard_detail",
+    "get_widget_list": "widget_list",
+    "/dashboard/widgets": "widget_list",
+    "get_widget_by_id": "widget",
+    "/dashboard/widgets/{id}": "widget",
+    "get_widget_data_by_id": "widget_data",
+    "/dashboard/widgets/{id}/data": "widget_data",
+    "get_device_list": "device_list",
+    "/device/devices": "device_list",
+    "get_device_group_list": "device_group_list",
+    "/device/groups": "device_group_list",
+    "get_device_instance_list": "device_instance_list",
+    "/device/devices/{id}/instances": "device_instance_list",
+    "/device/groups/{id}/devices": "device_group_devices",
+    "/sdt/sdts": "sdt",
+}
+
+
+def endpoint_name(name):
+    """
+    Endpoint label for an SDK method name, REST path or full URL.
+    """
+    if "://" in name:
+        name = urlparse(name).path
+    if name.startswith(REST_PREFIX):
+        name = name[len(REST_PREFIX):]
+    if name.endswith("_with_http_info"):
+        name = name[:-len("_with_http_info")]
+    name = re.sub(r"/\d+(?=/|$)", "/{id}", name)
+    return ENDPOINTS.get(name, name)
+
+
+def new_stats():
+    return {
+        "requests": 0,
+        "errors": 0,
+        "latency_sum": 0.0,
+        "latency_buckets": [0] * len(LATENCY_BUCKETS),
+        "bytes": 0,
+        "retries": 0,
+        "rate_limit_wait": 0.0,
+    }
+
+
+class Metrics:
+    """
+    Thread-safe registry of per-endpoint counters and latency histograms.
+    """
+
+    def __init__(self, tool):
+        self.tool = tool
+        self.started = time.time()
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, endpoint):
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = self._endpoints[endpoint] = new_stats()
+        return stats
+
+    def observe(self, endpoint, seconds, nbytes=0, status=None):
+        """
+        Record one HTTP request: its latency, response size and status.
+        """
+        with self._lock:
+            stats = self._stats(endpoint)
+            stats["requests"] += 1
+            if status is None or status >= 400:
+                stats["errors"] += 1
+            stats["latency_sum"] += seconds
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats["latency_buckets"][i] += 1
+                    break
+            stats["bytes"] += nbytes
+
+    def add_bytes(self, endpoint, nbytes):
+        """
+        Response bytes read after the request was recorded (streamed bodies).
+        """
+        with self._lock:
+            self._stats(endpoint)["bytes"] += nbytes
+
+    def retry(self, endpoint):
+        with self._lock:
+            self._stats(endpoint)["retries"] += 1
+
+    def wait(self, endpoint, seconds):
+        """
+        Time spent waiting for a rate-limit slot before a request.
+        """
+        if seconds > 0:
+            with self._lock:
+                self._stats(endpoint)["rate_limit_wait"] += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                endpoint: dict(stats, latency_buckets=list(stats["latency_buckets"]))
+                for endpoint, stats in sorted(self._endpoints.items())
+            }
+
+    def to_json(self):
+        endpoints = {}
+        for endpoint, stats in self.snapshot().items():
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(LATENCY_BUCKETS, stats["latency_buckets"]):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            buckets["+Inf"] = stats["requests"]
+            endpoints[endpoint] = {
+                "requests": stats["requests"],
+                "errors": stats["errors"],
+                "latency_seconds": {
+                    "sum": round(stats["latency_sum"], 6),
+                    "avg": round(stats["latency_sum"] / stats["requests"], 6) if stats["requests"] else None,
+                    "buckets": buckets,
+                },
+                "response_bytes": stats["bytes"],
+                "retries": stats["retries"],
+                "rate_limit_wait_seconds": round(stats["rate_limit_wait"], 6),
+            }
+        return {
+            "tool": self.tool,
+            "generated": datetime.now().isoformat(timespec="seconds"),
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "endpoints": endpoints,
+        }
+
+    def to_prometheus(self):
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name, kind, help_text, values):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for endpoint, value in values:
+                lines.append(f'{name}{{tool="{self.tool}",endpoint="{endpoint}"}} {value}')
+
+        metric("lm_api_requests_total", "counter", "API requests sent.",
+               [(e, s["requests"]) for e, s in snapshot.items()])
+        metric("lm_api_request_errors_total", "counter", "API requests that failed or returned HTTP >= 400.",
+               [(e, s["errors"]) for e, s in snapshot.items()])
+
+        name = "lm_api_request_duration_seconds"
+        lines.append(f"# HELP {name} API request latency, to response headers.")
+        lines.append(f"# TYPE {name} histogram")
+        for endpoint, stats in snapshot.items():
+            labels = f'tool="{self.tool}",endpoint="{endpoint}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats["latency_buckets"]):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {stats["requests"]}')
+            lines.append(f'{name}_sum{{{labels}}} {stats["latency_sum"]:.6f}')
+            lines.append(f'{name}_count{{{labels}}} {stats["requests"]}')
+
+        metric("lm_api_response_bytes_total", "counter", "Response body bytes received.",
+               [(e, s["bytes"]) for e, s in snapshot.items()])
+        metric("lm_api_retries_total", "counter", "Requests retried after HTTP 429.",
+               [(e, s["retries"]) for e, s in snapshot.items()])
+        metric("lm_api_rate_limit_wait_seconds_total", "counter", "Time spent waiting for a rate-limit slot.",
+               [(e, f"{s['rate_limit_wait']:.6f}") for e, s in snapshot.items()])
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Write Prometheus text, or JSON when `path` ends in .json.
+        """
+        if path.endswith(".json"):
+            text = json.dumps(self.to_json(), indent=2)
+        else:
+            text = self.to_prometheus()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+def instrument_sdk(api_instance, metrics):
+    """
+    Record every HTTP request a logicmonitor_sdk LMApi sends. Bodies of
+    responses requested with _preload_content=False are not read here;
+    callers add their size with metrics.add_bytes() as they read them.
+    """
+    from logicmonitor_sdk.rest import ApiException
+
+    rest_client = api_instance.api_client.rest_client
+    request = rest_client.request
+
+    def timed_request(method, url, *args, **kwargs):
+        start = time.monotonic()
+        status = None
+        nbytes = 0
+        try:
+            response = request(method, url, *args, **kwargs)
+            status = response.status
+            if kwargs.get("_preload_content", True):
+                nbytes = len(response.data or b"")
+            return response
+        except ApiException as e:
+            status = e.status
+            raise
+        finally:
+            metrics.observe(endpoint_name(url), time.monotonic() - start, nbytes, status)
+
+    rest_client.request = timed_request
+    return api_instance
+
+
+class Exporter:
+    """
+    Background writer of a metrics file: every `interval` seconds (if set),
+    on SIGUSR1, and once more on stop().
+    """
+
+    def __init__(self, metrics, path, interval=None):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _write(self):
+        try:
+            self.metrics.write(self.path)
+        except OSError as e:
+            print(f"\nCould not write metrics to {self.path}: {e}")
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopped:
+                return
+            self._write()
+
+    def request_write(self, *_):
+        # Signal-handler safe: only wakes the writer thread
+        self._wake.set()
+
+    def start(self):
+        self._thread.start()
+        if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR1, self.request_write)
+        return self
+
+    def stop(self):
+        # The final write waits for any interval or SIGUSR1 write in progress
+        self._stopped = True
+        self._wake.set()
+        self._thread.join()
+        self._write()
+
+
+def start_export(metrics, path, interval=None):
+    return Exporter(metrics, path, interval).start()
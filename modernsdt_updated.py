@@ -2,19 +2,20 @@ from __future__ import print_function
 import getpass
 from datetime import datetime
 import pytz
-import logicmonitor_sdk
-from logicmonitor_sdk.rest import ApiException
+from requests import HTTPError
+from lm_client import LMClient
+from rate_limit import shared_limiter
 from csv_loader import load_csv_columns  # 👈 import your module
 
 # --- Authentication ---
-configuration = logicmonitor_sdk.Configuration()
-configuration.company = input("Enter your company name (subdomain only): ")
-configuration.access_id = getpass.getpass("Enter your AccessId: ")
-configuration.access_key = getpass.getpass("Enter your AccessKey: ")
+company = input("Enter your company name (subdomain only): ")
+access_id = getpass.getpass("Enter your AccessId: ")
+access_key = getpass.getpass("Enter your AccessKey: ")
 
-api_client = logicmonitor_sdk.ApiClient(configuration)
-device_api = logicmonitor_sdk.DeviceApi(api_client)
-sdt_api = logicmonitor_sdk.SDTApi(api_client)
+# Shared pooled client: one keep-alive connection for the whole CSV.
+# Calls draw from the rate-limit budget shared with other tools on this key.
+client = LMClient(company, access_id, access_key,
+                  limiter=shared_limiter(company, access_id))
 
 # --- Time conversion helper ---
 def to_epoch_millis(dt_str):
@@ -43,25 +44,26 @@ for row in rows:
     try:
         # Search device
         filter_str = f"displayName:\"{device_name}\""
-        result = device_api.get_devices(filter=filter_str)
+        result = client.get_json("/device/devices", filter=filter_str, fields="id")
 
-        if not result.items:
+        if not result.get("items"):
             print(f"[NOT FOUND] Device: {device_name}")
             continue
 
-        device_id = result.items[0].id
+        device_id = result["items"][0]["id"]
 
         # Create and send SDT
-        sdt = logicmonitor_sdk.SDT(
-            type="DeviceSDT",
-            device_id=device_id,
-            start_time=start_time,
-            end_time=end_time,
-            comment="Scheduled via script"
-        )
-        sdt_api.add_sdt(sdt)
+        sdt = {
+            "type": "ResourceSDT",
+            "sdtType": "oneTime",
+            "deviceId": device_id,
+            "startDateTime": start_time,
+            "endDateTime": end_time,
+            "comment": "Scheduled via script"
+        }
+        client.post("/sdt/sdts", sdt).raise_for_status()
 
         print(f"[OK] SDT scheduled for '{device_name}' ({row['Start']} to {row['End']})")
 
-    except ApiException as e:
+    except HTTPError as e:
         print(f"[ERROR] {device_name}: {e}")
@@ -0,0 +1,107 @@
+"""
+Module: paginate.py
+Description:
+    Streaming paginator for LogicMonitor list endpoints.
+
+    Items are yielded lazily, one page at a time, and page N+1 is fetched in
+    a background thread while the caller is still working through page N.
+    Paging stops on a short or empty page, so accounts larger than one page
+    are no longer silently truncated.
+
+    The same generator drives both the pooled REST client and the SDK:
+
+        from paginate import iter_client, iter_sdk
+
+        for dashboard in iter_client(client, "/dashboard/dashboards", filter="groupId:12"):
+            print(dashboard["name"])
+
+        for group in iter_sdk(api_instance.get_dashboard_group_list):
+            print(group.name)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PAGE_SIZE = 1000  # LogicMonitor's maximum page size
+
+
+def paginate(fetch_page, page_size=DEFAULT_PAGE_SIZE, prefetch=True):
+    """
+    Yield every item of a paged listing.
+
+    Args:
+        fetch_page (callable): fetch_page(offset, size) -> (items, total).
+            `total` may be None or negative when the API does not know it.
+        page_size (int): Items requested per page.
+        prefetch (bool): Fetch the next page in the background while the
+            current one is being consumed.
+    """
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    offset = 0
+    pending = None
+    try:
+        items, total = fetch_page(offset, page_size)
+        while True:
+            offset += len(items)
+            last_page = (
+                len(items) < page_size
+                or (total is not None and total >= 0 and offset >= total)
+            )
+            if not last_page and executor:
+                pending = executor.submit(fetch_page, offset, page_size)
+
+            for item in items:
+                yield item
+
+            if last_page:
+                return
+            if pending:
+                items, total = pending.result()
+                pending = None
+            else:
+                items, total = fetch_page(offset, page_size)
+    finally:
+        if pending:
+            pending.cancel()
+        if executor:
+            executor.shutdown(wait=False)
+
+
+def iter_client(client, resource_path, page_size=DEFAULT_PAGE_SIZE, prefetch=True, **params):
+    """
+    Page through a REST listing with an LMClient (lm_client.py).
+    Items are the decoded JSON dicts.
+    """
+    def fetch_page(offset, size):
+        page = client.get_json(resource_path, offset=offset, size=size, **params)
+        return page.get("items") or [], page.get("total")
+
+    return paginate(fetch_page, page_size=page_size, prefetch=prefetch)
+
+
+def iter_sdk(call, page_size=DEFAULT_PAGE_SIZE, prefetch=True, **params):
+    """
+    Page through an SDK listing method, e.g. api_instance.get_dashboard_list.
+
+    `call` may return the page model or a *_with_http_info tuple
+    (model, status, headers); items are the SDK models.
+    """
+    def fetch_page(offset, size):
+        page = call(offset=offset, size=size, **params)
+        if isinstance(page, tuple):
+            page = page[0]
+        return page.items or [], page.total
+
+    return paginate(fetch_page, page_size=page_size, prefetch=prefetch)
+
+
+def iter_json(call, page_size=DEFAULT_PAGE_SIZE, prefetch=True, **params):
+    """
+    Page through a listing whose `call` returns the decoded JSON page
+    ({"items": [...], "total": n}); items are the JSON dicts. For raw SDK
+    calls that skip model conversion.
+    """
+    def fetch_page(offset, size):
+        page = call(offset=offset, size=size, **params)
+        return page.get("items") or [], page.get("total")
+
+    return paginate(fetch_page, page_size=page_size, prefetch=prefetch)
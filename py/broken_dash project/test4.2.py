@@ -39,7 +39,6 @@ WINDOW_SECONDS = 60
 #window_start = time.time()
 
 widgets_config = {}
-report = {"groups":{}}
 timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 report_folder = f"report_{timestamp}"
 
@@ -191,11 +190,24 @@ def main():
 
     #print(f"found {len(dashboard_groups)} dashboard groups\n")
 
+    # =============================
+    # CSV 1: dashboards.csv
+    # Rows are written as each widget is checked, nothing is kept per account
+    # =============================
+    csv_path = f"{report_folder}/dashboards.csv"
+
+    #write header only once
+    write_header = not os.path.exists(csv_path) or os.stat(csv_path).st_size == 0
+
+    csv_file = open(csv_path, "a", newline="")
+    writer = csv.writer(csv_file)
+    if write_header:
+        writer.writerow(["full_path","group_name", "group_id", "dashboard_name", "dashboard_id", "dashboard_tokens", "tokens_strings", "widget_name", "widget_id", "widget_type", "widget_status", "widget_error"])
+
     # Loop through all groups and their dashboards
     for group in dashboard_groups:
         group_id = group.id
         group_name = group.name
-        report["groups"].setdefault(group_id, {"group_name":group_name,"dashboards":{}})
 
         try:
 
@@ -229,15 +241,18 @@ def main():
                 widgets_config = dashboard_detail.to_dict().get("widgets_config",{})
                 #print(f"widget config:\n{widgets_config}")
                 widgets_ids = list(widgets_config.keys())
-                report["groups"][group_id]["dashboards"].setdefault(
-                    dashboard_id,
-                    {
-                        "dashboard_name": dashboard_name,
-                        "dashboard_full_path": dashboard_full_path,
-                        "widget_tokens": [dashboard.widget_tokens],
-                        "widgets": {}
-                    }
-                )
+
+                # Flatten list in case it containes inner lists
+                flat_tokens = []
+                for t in [dashboard.widget_tokens]:
+                    if isinstance(t, list):
+                            flat_tokens.extend(t)
+                    else:
+                            flat_tokens.append(t)
+
+                # Join flatted list to a string
+                token_str = ", ".join(str(x) for x in flat_tokens) if flat_tokens else "NONE"
+                token_status = "YES" if flat_tokens else "NO"
 
                 for w_id in widgets_ids:
                     #widget_detail = api_instance.get_widget_by_id(w_id)
@@ -275,12 +290,21 @@ def main():
                     
                     #message = extract_error_message(widget_status)
                     message = widget_status[1] # second element is the error string
-                    report["groups"][group_id]["dashboards"][dashboard_id]["widgets"][w_id] = {
-                        "widget_name": widget_detail.name,
-                        "broken_status": widget_status[0],
-                        "widget_type": widget_type_field,
-                        "widget_error": message,
-                    }
+                    writer.writerow([
+                        dashboard_full_path,
+                        group_name,
+                        group_id,
+                        dashboard_name,
+                        dashboard_id,
+                        token_status,
+                        token_str,
+                        widget_name,
+                        w_id,
+                        widget_type_field,
+                        widget_status[0],
+                        message
+                    ])
+                    csv_file.flush()
                     #print(f" Testing {group_name}/{dashboard_name}/{widget_name} : type {widget_type_field}")
                     #                   
                     # manual pause
@@ -293,60 +317,9 @@ def main():
 
             except ApiException as e:
                 print(f"❌ Failed to fetch or save dashboard {dashboard_name}: {e}")
-            
-        
-    # =============================
-    # CSV 1: dashboards.csv
-    # =============================
-    csv_path = f"{report_folder}/dashboards.csv"
-    
-    #write header only once
-    write_header = not os.path.exists(csv_path) or os.stat(csv_path).st_size == 0
 
-    with open(csv_path, "a", newline="") as f:
-        writer = csv.writer(f)
-        if write_header:
-            writer.writerow(["full_path","group_name", "group_id", "dashboard_name", "dashboard_id", "dashboard_tokens", "tokens_strings", "widget_name", "widget_id", "widget_type", "widget_status", "widget_error"])
 
-        for group_id, group_data in report.get("groups", {}).items():
-            group_name = group_data.get("group_name", "UNKNOWN")
-            
-            for dash_id, dash_info in group_data.get("dashboards", {}).items():
-                tokens = dash_info.get("widget_tokens") or []
-    
-                # Flatten list in case it containes inner lists
-                
-                flat_tokens = []
-                for t in tokens:
-                    if isinstance(t, list):
-                            flat_tokens.extend(t)
-                    else:
-                            flat_tokens.append(t)
-
-                # Join flatted list to a string
-                token_str = ", ".join(str(x) for x in flat_tokens) if flat_tokens else "NONE"
-                token_status = "YES" if flat_tokens else "NO"
-                
-                for widget_id, widget_data in dash_info.get("widgets", {}).items():
-                    widget_name = widget_data.get("widget_name", "UNKNOWN")
-                    widget_status = widget_data.get("broken_status", "UNKNOWN")
-                    widget_error = widget_data.get("widget_error", 'UNKNOWN')
-                    #print(f"cvs export: {group_name} - {widget_name} status: {widget_error}")
-                    
-                    writer.writerow([
-                        dash_info.get("dashboard_full_path", "UNKNOWN"),
-                        group_name,
-                        group_id,
-                        dash_info.get("dashboard_name", "UNKNOWN"),
-                        dash_id,
-                        token_status,
-                        token_str,
-                        widget_name,
-                        widget_id,
-                        widget_data.get("widget_type", "UNKNOWN"),
-                        widget_status,
-                        widget_error
-                    ])
+    csv_file.close()
 
 if __name__ == "__main__":
     main()
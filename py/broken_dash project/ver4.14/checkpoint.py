@@ -0,0 +1,107 @@
+"""
+Module: checkpoint.py
+Description:
+    Append-only JSONL journal of finished scan work, so a crashed or
+    interrupted dashboard scan can be resumed instead of restarted.
+
+    Three record kinds are written as work completes:
+
+        {"kind": "widget",    "dashboard_id": ..., "widget_id": ..., "entry": {...}}
+        {"kind": "dashboard", "group_id": ..., "dashboard_id": ..., "entry": {...}}
+        {"kind": "group",     "group_id": ..., "entry": {"group_name": ..., "dashboard_ids": [...]}}
+
+    Every record is flushed as it is written and the file is fsync'ed at
+    most every `sync_interval` seconds. On load, a truncated last line
+    (crash mid-write) is ignored.
+"""
+
+import json
+import os
+import threading
+import time
+
+CHECKPOINT_FILE = "checkpoint.jsonl"
+SYNC_INTERVAL = 5
+
+
+class Checkpoint:
+    """
+    Journal of finished groups, dashboards and widgets.
+
+    With `path=None` nothing is read or written and every lookup misses,
+    so callers can use it unconditionally.
+    """
+
+    def __init__(self, path=None, sync_interval=SYNC_INTERVAL):
+        self.path = path
+        self.sync_interval = sync_interval
+        self.groups = {}
+        self.dashboards = {}
+        self.widgets = {}
+        self._lock = threading.Lock()
+        self._file = None
+        self._last_sync = time.monotonic()
+
+        if path:
+            self._load()
+            self._file = open(path, "a", encoding="utf-8")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # partial line from an interrupted write
+                kind = record.get("kind")
+                if kind == "widget":
+                    self.widgets[(str(record["dashboard_id"]), str(record["widget_id"]))] = record["entry"]
+                elif kind == "dashboard":
+                    self.dashboards[str(record["dashboard_id"])] = record["entry"]
+                elif kind == "group":
+                    self.groups[str(record["group_id"])] = record["entry"]
+
+    def _write(self, record):
+        if self._file is None:
+            return
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            now = time.monotonic()
+            if now - self._last_sync >= self.sync_interval:
+                os.fsync(self._file.fileno())
+                self._last_sync = now
+
+    # --- lookups -------------------------------------------------------
+
+    def group(self, group_id):
+        return self.groups.get(str(group_id))
+
+    def dashboard(self, dashboard_id):
+        return self.dashboards.get(str(dashboard_id))
+
+    def widget(self, dashboard_id, widget_id):
+        return self.widgets.get((str(dashboard_id), str(widget_id)))
+
+    # --- records -------------------------------------------------------
+
+    def widget_done(self, dashboard_id, widget_id, entry):
+        self._write({"kind": "widget", "dashboard_id": dashboard_id, "widget_id": widget_id, "entry": entry})
+
+    def dashboard_done(self, group_id, dashboard_id, entry):
+        self._write({"kind": "dashboard", "group_id": group_id, "dashboard_id": dashboard_id, "entry": entry})
+
+    def group_done(self, group_id, entry):
+        self._write({"kind": "group", "group_id": group_id, "entry": entry})
+
+    def close(self):
+        if self._file is None:
+            return
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
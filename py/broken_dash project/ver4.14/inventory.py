@@ -0,0 +1,179 @@
+"""
+Module: inventory.py
+Description:
+    In-memory inventory of the account's devices, device groups and
+    instances, used by the dashboard scanner to validate the resources a
+    widget's config points at without calling the widget-data endpoint.
+
+    Devices and device groups are loaded once into sets of IDs and names.
+    Instances are loaded lazily, once per referenced device.
+
+    Only exact references are judged. Glob patterns and unresolved
+    ##tokens## are left for the widget-data check.
+"""
+
+import re
+import threading
+
+# Widget-config keys (SDK snake_case and raw JSON camelCase) that point at resources
+DEVICE_ID_KEYS = ("device_id", "deviceId")
+GROUP_ID_KEYS = ("device_group_id", "deviceGroupId")
+INSTANCE_ID_KEYS = ("instance_id", "instanceId")
+DEVICE_NAME_KEYS = ("device_display_name", "deviceDisplayName")
+GROUP_PATH_KEYS = ("device_group_full_path", "deviceGroupFullPath")
+
+TOKEN_PATTERN = re.compile(r"##(.+?)##")
+GLOB_CHARS = set("*?[,|")
+
+
+def normalize_name(value):
+    return value.strip().lower()
+
+
+def normalize_path(value):
+    return value.strip().strip("/").lower()
+
+
+def token_map(widget_tokens):
+    """
+    Turn a dashboard's widget tokens (SDK models or dicts) into {name: value}.
+    """
+    tokens = {}
+    for token in widget_tokens or []:
+        if isinstance(token, dict):
+            name, value = token.get("name"), token.get("value")
+        else:
+            name, value = getattr(token, "name", None), getattr(token, "value", None)
+        if name and value is not None:
+            tokens[name] = value
+    return tokens
+
+
+def resolve_reference(value, tokens):
+    """
+    Return the exact resource name a config value refers to, or None when
+    it cannot be judged locally (glob, unresolved token, empty).
+    """
+    # GlobMatchToggle: {"value": ..., "is_glob": ...}
+    if isinstance(value, dict):
+        if value.get("is_glob") or value.get("isGlob"):
+            return None
+        value = value.get("value")
+
+    if not isinstance(value, str) or not value.strip():
+        return None
+
+    value = TOKEN_PATTERN.sub(lambda m: tokens.get(m.group(1), m.group(0)), value)
+    if "##" in value or GLOB_CHARS & set(value):
+        return None
+    return value
+
+
+def first_value(node, keys):
+    for key in keys:
+        if node.get(key) is not None:
+            return node[key]
+    return None
+
+
+def field(item, *names):
+    for name in names:
+        value = item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+        if value is not None:
+            return value
+    return None
+
+
+def valid_id(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+class Inventory:
+    """
+    Sets of the account's device IDs/names and device-group IDs/paths.
+
+    Args:
+        devices (iterable): Device models or dicts with id and display name.
+        device_groups (iterable): Device-group models or dicts with id and full path.
+        list_instances (callable): list_instances(device_id) -> iterable of
+            instance IDs; called at most once per device.
+    """
+
+    def __init__(self, devices, device_groups, list_instances=None):
+        self.device_ids = set()
+        self.device_names = set()
+        for device in devices:
+            self.device_ids.add(field(device, "id"))
+            name = field(device, "display_name", "displayName")
+            if name:
+                self.device_names.add(normalize_name(name))
+
+        self.group_ids = set()
+        self.group_paths = set()
+        for group in device_groups:
+            self.group_ids.add(field(group, "id"))
+            path = field(group, "full_path", "fullPath")
+            if path is not None:
+                self.group_paths.add(normalize_path(path))
+
+        self._list_instances = list_instances
+        self._instances = {}
+        self._lock = threading.Lock()
+
+    def instances_for(self, device_id):
+        with self._lock:
+            instances = self._instances.get(device_id)
+        if instances is None:
+            # Loaded outside the lock so other devices are not held up
+            instances = set(self._list_instances(device_id))
+            with self._lock:
+                instances = self._instances.setdefault(device_id, instances)
+        return instances
+
+    def check_widget(self, widget_config, widget_tokens=None):
+        """
+        Walk a widget's config and return a message for the first reference
+        to a missing device, group or instance, or None if all known
+        references exist.
+        """
+        tokens = token_map(widget_tokens)
+        stack = [widget_config]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(node)
+                continue
+            if not isinstance(node, dict):
+                continue
+
+            message = self._check_node(node, tokens)
+            if message:
+                return message
+
+            stack.extend(v for v in node.values() if isinstance(v, (dict, list)))
+        return None
+
+    def _check_node(self, node, tokens):
+        device_id = first_value(node, DEVICE_ID_KEYS)
+        if valid_id(device_id):
+            if device_id not in self.device_ids:
+                return f"Referenced device ID {device_id} not found"
+
+            instance_id = first_value(node, INSTANCE_ID_KEYS)
+            if self._list_instances and valid_id(instance_id):
+                if instance_id not in self.instances_for(device_id):
+                    return f"Referenced instance ID {instance_id} not found on device {device_id}"
+
+        group_id = first_value(node, GROUP_ID_KEYS)
+        if valid_id(group_id) and group_id not in self.group_ids:
+            return f"Referenced device group ID {group_id} not found"
+
+        name = resolve_reference(first_value(node, DEVICE_NAME_KEYS), tokens)
+        if name and normalize_name(name) not in self.device_names:
+            return f"Referenced device '{name}' not found"
+
+        path = resolve_reference(first_value(node, GROUP_PATH_KEYS), tokens)
+        if path and normalize_path(path) not in self.group_paths:
+            return f"Referenced device group '{path}' not found"
+
+        return None
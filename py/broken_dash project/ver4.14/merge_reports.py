@@ -0,0 +1,114 @@
+"""
+Module: merge_reports.py
+Description:
+    Combine the partial reports of a sharded dashboard scan into one
+    dashboards.csv.
+
+        python merge_reports.py report_shard0 report_shard1 ... -o report_merged
+
+    Each input folder must hold a manifest.json (see shards.py) and the
+    dashboards.csv or dashboards.jsonl it names. Rows are ordered by the
+    group's position in the account's group listing, then by dashboard ID,
+    keeping each dashboard's widget order from its shard. Missing shards,
+    unfinished shards and groups reported by more than one shard are
+    warned about.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+from report_writer import REPORT_COLUMNS
+from shards import read_manifest
+
+
+def read_rows(folder, manifest):
+    path = os.path.join(folder, manifest["report"])
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        if manifest["format"] == "jsonl":
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield [record.get(column) for column in REPORT_COLUMNS]
+        else:
+            reader = csv.reader(f)
+            next(reader, None)  # header
+            yield from reader
+
+
+def check_manifests(manifests):
+    """
+    Warnings about a set of shard manifests: unfinished shards, missing
+    hash shards and groups covered twice.
+    """
+    warnings = []
+    for folder, manifest in manifests:
+        if not manifest.get("complete"):
+            warnings.append(f"{folder}: shard {manifest.get('shard')} did not finish")
+
+    counts = {manifest.get("shard_count") for _, manifest in manifests if manifest.get("shard_count")}
+    if len(counts) > 1:
+        warnings.append(f"Shards were split different ways: {sorted(counts)}")
+    elif counts:
+        seen = {manifest.get("shard_index") for _, manifest in manifests}
+        missing = sorted(set(range(counts.pop())) - seen)
+        if missing:
+            warnings.append(f"Missing shards: {missing}")
+
+    owners = {}
+    for folder, manifest in manifests:
+        for group in manifest["groups"]:
+            if group["id"] in owners:
+                warnings.append(f"Group {group['id']} is in both {owners[group['id']]} and {folder}")
+            owners.setdefault(group["id"], folder)
+    return warnings
+
+
+def sort_key(value):
+    try:
+        return (0, int(value))
+    except (TypeError, ValueError):
+        return (1, str(value))
+
+
+def merge(folders, output_folder):
+    manifests = [(folder, read_manifest(folder)) for folder in folders]
+    for warning in check_manifests(manifests):
+        print(f"Warning: {warning}")
+
+    positions = {}
+    for _, manifest in manifests:
+        for group in manifest["groups"]:
+            positions.setdefault(str(group["id"]), group["position"])
+
+    rows = []
+    for folder, manifest in manifests:
+        for row in read_rows(folder, manifest):
+            group_id, dashboard_id = str(row[2]), row[4]
+            rows.append(((positions.get(group_id, sys.maxsize), sort_key(dashboard_id), len(rows)), row))
+    rows.sort(key=lambda item: item[0])
+
+    os.makedirs(output_folder, exist_ok=True)
+    csv_path = os.path.join(output_folder, "dashboards.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(REPORT_COLUMNS)
+        for _, row in rows:
+            writer.writerow(row)
+    print(f"Merged {len(rows)} rows from {len(folders)} shards into {csv_path}")
+    return csv_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge sharded dashboard-scanner reports into one dashboards.csv.")
+    parser.add_argument("folders", nargs="+", help="Shard report folders, each with a manifest.json")
+    parser.add_argument("-o", "--output", default="report_merged",
+                        help="Folder for the merged dashboards.csv (default: report_merged)")
+    args = parser.parse_args()
+    merge(args.folders, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Module: report_writer.py
+Description:
+    Streaming sink for the dashboard scanner's results.
+
+    Each widget's row is written (and flushed) as soon as the widget is
+    checked, together with its group and dashboard context, instead of
+    collecting the whole account in a nested report dict first. Memory
+    stays flat with account size and the report can be read while the scan
+    is still running.
+
+    The concurrent scan finishes dashboards out of order; OrderedReport
+    holds each finished dashboard's rows until everything listed before it
+    is written, so its report matches the serial scan row for row.
+
+    Two formats:
+
+        csv    dashboards.csv, same columns as before
+        jsonl  dashboards.jsonl, one JSON object per widget with the same keys
+"""
+
+import csv
+import json
+import os
+
+REPORT_COLUMNS = [
+    "full_path", "group_name", "group_id", "dashboard_name", "dashboard_id",
+    "dashboard_tokens", "tokens_strings", "widget_name", "widget_id",
+    "widget_type", "broken_widget", "widget_error",
+]
+REPORT_FORMATS = ("csv", "jsonl")
+
+
+def flatten_tokens(tokens):
+    """
+    Flatten the widget_tokens list in case it contains inner lists.
+    """
+    flat_tokens = []
+    for t in tokens or []:
+        if isinstance(t, list):
+            flat_tokens.extend(t)
+        else:
+            flat_tokens.append(t)
+    return flat_tokens
+
+
+class ReportWriter:
+    """
+    Writes one report row per widget to {folder}/dashboards.{fmt}.
+
+    `dashboard` is the scanner's dashboard entry (dashboard_name,
+    dashboard_full_path, widget_tokens); `widget` is a widget entry
+    (widget_name, widget_type, broken_status, widget_error).
+    """
+
+    def __init__(self, folder, fmt="csv"):
+        if fmt not in REPORT_FORMATS:
+            raise ValueError(f"Unknown report format: {fmt}")
+        self.fmt = fmt
+        self.path = os.path.join(folder, f"dashboards.{fmt}")
+        self.rows = 0
+        self._file = open(self.path, "w", newline="", encoding="utf-8")
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(REPORT_COLUMNS)
+            self._file.flush()
+
+    def write_widget(self, group_id, group_name, dashboard_id, dashboard, widget_id, widget):
+        flat_tokens = flatten_tokens(dashboard.get("widget_tokens"))
+
+        # Join flatted list to a string
+        token_str = ", ".join(str(x) for x in flat_tokens) if flat_tokens else "NONE"
+        token_status = "YES" if flat_tokens else "NO"
+
+        row = [
+            dashboard.get("dashboard_full_path", "UNKNOWN"),
+            group_name,
+            group_id,
+            dashboard.get("dashboard_name", "UNKNOWN"),
+            dashboard_id,
+            token_status,
+            token_str,
+            widget.get("widget_name", "UNKNOWN"),
+            widget_id,
+            widget.get("widget_type", "UNKNOWN"),
+            widget.get("broken_status", "UNKNOWN"),
+            widget.get("widget_error", "UNKNOWN"),
+        ]
+        if self._csv is not None:
+            self._csv.writerow(row)
+        else:
+            self._file.write(json.dumps(dict(zip(REPORT_COLUMNS, row)), default=str) + "\n")
+        self._file.flush()
+        self.rows += 1
+
+    def write_dashboard(self, group_id, group_name, dashboard_id, dashboard):
+        """
+        Rows for a dashboard whose widgets are all known already
+        (restored from the checkpoint or reused by an incremental scan).
+        """
+        for widget_id, widget in dashboard.get("widgets", {}).items():
+            self.write_widget(group_id, group_name, dashboard_id, dashboard, widget_id, widget)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class OrderedReport:
+    """
+    Writes whole dashboards to a ReportWriter in listing order: group
+    position, then the dashboard's place in its group's listing.
+
+        slot = report.add(group_position)       # as each dashboard is listed
+        report.close_group(group_position)      # the group's listing is complete
+        report.done(slot, group_id, group_name, dashboard_id, entry)
+
+    A dashboard's rows are held until every slot before it is done, so one
+    slow dashboard holds back the rows listed after it. done(slot, ...) with
+    no entry releases a slot without rows (a dashboard that failed).
+    """
+
+    def __init__(self, writer, group_count):
+        self.writer = writer
+        # Per group position: [slots, listing complete]; a slot is None until done
+        self._groups = [[[], False] for _ in range(group_count)]
+        self._group = 0
+        self._slot = 0
+
+    def add(self, group_position):
+        slots = self._groups[group_position][0]
+        slots.append(None)
+        return group_position, len(slots) - 1
+
+    def close_group(self, group_position):
+        self._groups[group_position][1] = True
+        self._flush()
+
+    def done(self, slot, group_id=None, group_name=None, dashboard_id=None, entry=None):
+        group_position, index = slot
+        self._groups[group_position][0][index] = (group_id, group_name, dashboard_id, entry)
+        self._flush()
+
+    def _flush(self):
+        while self._group < len(self._groups):
+            slots, complete = self._groups[self._group]
+            while self._slot < len(slots) and slots[self._slot] is not None:
+                group_id, group_name, dashboard_id, entry = slots[self._slot]
+                if entry is not None:
+                    self.writer.write_dashboard(group_id, group_name, dashboard_id, entry)
+                slots[self._slot] = ()  # written; the entry is no longer held
+                self._slot += 1
+            if not complete or self._slot < len(slots):
+                return
+            self._group += 1
+            self._slot = 0
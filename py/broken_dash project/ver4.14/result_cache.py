@@ -0,0 +1,119 @@
+"""
+Module: result_cache.py
+Description:
+    Cache of widget health results keyed by the widget's data query, so
+    widgets that ask for the same data (cloned dashboards, the same
+    device / datasource / instance on many dashboards) are checked once.
+
+    The key is a hash of the widget definition with ##tokens## resolved
+    against the dashboard's tokens and identity / cosmetic fields (ID,
+    name, dashboard, last update, ...) removed. Two widgets share a key
+    only if everything that can change their data is the same.
+
+    Entries expire after a TTL and the least recently used entry is
+    evicted when the cache is full. A widget whose query is already being
+    checked waits for that result instead of making a second call.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from inventory import TOKEN_PATTERN, token_map
+
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_TTL_SECONDS = 3600
+
+# Widget fields that do not affect the data the widget shows
+IGNORED_FIELDS = {
+    "id", "name", "description", "dashboard_id", "dashboardId",
+    "last_updated_on", "lastUpdatedOn", "last_updated_by", "lastUpdatedBy",
+    "user_permission", "userPermission", "interval", "theme",
+}
+
+
+def normalize_query(node, tokens):
+    """
+    Copy of a widget config with tokens resolved and ignored fields dropped.
+    """
+    if isinstance(node, dict):
+        return {
+            key: normalize_query(value, tokens)
+            for key, value in node.items()
+            if key not in IGNORED_FIELDS
+        }
+    if isinstance(node, list):
+        return [normalize_query(value, tokens) for value in node]
+    if isinstance(node, str):
+        return TOKEN_PATTERN.sub(lambda m: tokens.get(m.group(1), m.group(0)), node)
+    return node
+
+
+def query_key(widget_type, widget_config, widget_tokens=None):
+    """
+    Cache key for a widget: its type plus its normalized config.
+    """
+    query = normalize_query(widget_config, token_map(widget_tokens))
+    data = json.dumps([widget_type, query], sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with a TTL per entry.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at, result)
+        self._pending = {}  # key -> Event, while the first caller computes it
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get_or_compute(self, key, compute, cacheable=None):
+        """
+        Return the cached result for `key`, or call `compute()` and cache
+        its result (unless `cacheable(result)` is False). Concurrent calls
+        for the same key wait for the first one.
+        """
+        while True:
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry[1]
+                event = self._pending.get(key)
+                if event is None:
+                    self._pending[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # Another worker is computing it; take its result or, if it was
+            # not cached, compute our own
+            event.wait()
+
+        result = None
+        try:
+            result = compute()
+            return result
+        finally:
+            with self._lock:
+                if result is not None and (cacheable is None or cacheable(result)):
+                    self._entries[key] = (time.monotonic() + self.ttl_seconds, result)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                self._pending.pop(key).set()
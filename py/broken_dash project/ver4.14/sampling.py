@@ -0,0 +1,116 @@
+"""
+Module: sampling.py
+Description:
+    Stratified widget sampling for a quick account health pulse.
+
+    Each dashboard's widgets are split by widget type and a random share of
+    every type is checked (at least `min_per_type`). The scanner escalates
+    to the rest of a dashboard, and of its group, once a broken widget
+    turns up; those extra checks are reported but, not being random, are
+    left out of the estimate.
+
+    The breakage-rate estimate is stratified by widget type:
+
+        p = sum(N_h / N * p_h)
+
+    with a Wilson score interval per type and a normal interval for the
+    total, its variance taken from Agresti-Coull adjusted rates with the
+    finite-population correction, so a sample with no broken widgets still
+    gets a non-zero upper bound.
+"""
+
+import csv
+import math
+import random
+from collections import Counter
+
+DEFAULT_SAMPLE_RATE = 0.1
+DEFAULT_MIN_PER_TYPE = 1
+Z_95 = 1.96
+
+ESTIMATE_COLUMNS = ["widget_type", "widgets", "sampled", "broken", "rate", "lower_95", "upper_95"]
+
+
+def wilson_interval(broken, sampled, z=Z_95):
+    if sampled == 0:
+        return 0.0, 1.0
+    p = broken / sampled
+    denominator = 1 + z * z / sampled
+    center = (p + z * z / (2 * sampled)) / denominator
+    half = z * math.sqrt(p * (1 - p) / sampled + z * z / (4 * sampled * sampled)) / denominator
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+class Sampler:
+    """
+    Picks the widgets to check per dashboard and keeps the per-type
+    counts for the breakage estimate.
+    """
+
+    def __init__(self, rate=DEFAULT_SAMPLE_RATE, min_per_type=DEFAULT_MIN_PER_TYPE, seed=None):
+        self.rate = rate
+        self.min_per_type = min_per_type
+        self._random = random.Random(seed)
+        self.population = Counter()  # widget type -> widgets seen
+        self.sampled = Counter()  # widget type -> widgets checked as part of the sample
+        self.broken = Counter()  # widget type -> sampled widgets found broken
+
+    def split(self, widget_types):
+        """
+        Split a dashboard's widgets ({widget ID: type}, in dashboard order)
+        into (sample, rest), both in dashboard order.
+        """
+        by_type = {}
+        for w_id, widget_type in widget_types.items():
+            by_type.setdefault(widget_type, []).append(w_id)
+
+        chosen = set()
+        for widget_type, ids in by_type.items():
+            self.population[widget_type] += len(ids)
+            size = min(len(ids), max(self.min_per_type, math.ceil(self.rate * len(ids))))
+            chosen.update(self._random.sample(ids, size))
+
+        sample = [w_id for w_id in widget_types if w_id in chosen]
+        rest = [w_id for w_id in widget_types if w_id not in chosen]
+        return sample, rest
+
+    def record(self, widget_type, broken_status):
+        self.sampled[widget_type] += 1
+        if broken_status is True:
+            self.broken[widget_type] += 1
+
+    def estimate(self, z=Z_95):
+        """
+        Rows of ESTIMATE_COLUMNS: one per widget type, then the total.
+        """
+        rows = []
+        total = sum(self.population.values())
+        rate = 0.0
+        variance = 0.0
+        for widget_type in sorted(self.population):
+            population = self.population[widget_type]
+            sampled, broken = self.sampled[widget_type], self.broken[widget_type]
+            type_rate = broken / sampled if sampled else 0.0
+            lower, upper = wilson_interval(broken, sampled, z)
+            rows.append([widget_type, population, sampled, broken, type_rate, lower, upper])
+
+            if sampled:
+                weight = population / total
+                adjusted = (broken + 2) / (sampled + 4)
+                fpc = 1 - sampled / population
+                rate += weight * type_rate
+                variance += weight * weight * adjusted * (1 - adjusted) / sampled * fpc
+
+        half = z * math.sqrt(variance)
+        rows.append([
+            "ALL", total, sum(self.sampled.values()), sum(self.broken.values()),
+            rate, max(0.0, rate - half), min(1.0, rate + half),
+        ])
+        return rows
+
+    def write_csv(self, path, z=Z_95):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(ESTIMATE_COLUMNS)
+            for row in self.estimate(z):
+                writer.writerow([f"{v:.4f}" if isinstance(v, float) else v for v in row])
@@ -0,0 +1,85 @@
+"""
+Module: scan_state.py
+Description:
+    Local state store for incremental dashboard scans.
+
+    For every dashboard it keeps the config fingerprint seen on the last
+    scan, that scan's report entry (widgets and their results) and when it
+    was taken. A later run can reuse the stored entry instead of
+    rescanning when the dashboard is unchanged, was healthy last time and
+    the entry is younger than the TTL.
+
+    The store is a single JSON file, loaded at start and written
+    atomically at the end of a run.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+STATE_FILE = "scan_state.json"
+DEFAULT_TTL_HOURS = 24 * 7
+
+
+def fingerprint(payload):
+    """
+    Stable hash of a JSON-able payload (dict keys sorted, models via str()).
+    """
+    data = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def has_broken_widget(entry):
+    return any(
+        (widget or {}).get("broken_status") is True
+        for widget in entry.get("widgets", {}).values()
+    )
+
+
+class ScanState:
+    """
+    Per-dashboard fingerprint, last report entry and scan time.
+    """
+
+    def __init__(self, path=STATE_FILE, ttl_hours=DEFAULT_TTL_HOURS):
+        self.path = path
+        self.ttl_seconds = ttl_hours * 3600
+        self.dashboards = {}
+        self.reused = 0
+        self.rescanned = 0
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.dashboards = json.load(f).get("dashboards", {})
+
+    def fresh_entry(self, dashboard_id, config_hash):
+        """
+        Last scan's entry if it can be reused, else None. A dashboard is
+        rescanned when its config changed, it had a broken widget last
+        time, or its entry is older than the TTL.
+        """
+        state = self.dashboards.get(str(dashboard_id))
+        if (
+            state is None
+            or state["config_hash"] != config_hash
+            or has_broken_widget(state["entry"])
+            or time.time() - state["scanned_at"] > self.ttl_seconds
+        ):
+            self.rescanned += 1
+            return None
+        self.reused += 1
+        return state["entry"]
+
+    def record(self, dashboard_id, config_hash, entry):
+        self.dashboards[str(dashboard_id)] = {
+            "config_hash": config_hash,
+            "widget_ids": list(entry.get("widgets", {})),
+            "scanned_at": time.time(),
+            "entry": entry,
+        }
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dashboards": self.dashboards}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,79 @@
+"""
+Module: shards.py
+Description:
+    Split a dashboard scan across processes or hosts by dashboard group.
+
+    A shard spec picks the groups one scanner run covers:
+
+        2/8             groups whose ID hashes to 2 mod 8 (shards 0/8 ... 7/8)
+        ids:1-100,250   explicit group IDs and ID ranges
+
+    Each shard writes its partial report with a manifest.json next to it,
+    recording the spec, the groups it covered (with their position in the
+    account's group listing, for ordering the merged report) and whether
+    it finished. merge_reports.py combines the shards' reports.
+"""
+
+import json
+import os
+import zlib
+from datetime import datetime
+
+MANIFEST_FILE = "manifest.json"
+
+
+class ShardSpec:
+    """
+    Parsed shard spec; `contains(group_id)` tells whether a group is in it.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.index = self.count = None
+        self.ranges = []
+        if spec.startswith("ids:"):
+            for part in spec[len("ids:"):].split(","):
+                low, _, high = part.strip().partition("-")
+                self.ranges.append((int(low), int(high or low)))
+            if not self.ranges:
+                raise ValueError(f"Shard spec has no group IDs: {spec}")
+        else:
+            index, _, count = spec.partition("/")
+            self.index, self.count = int(index), int(count)
+            if not 0 <= self.index < self.count:
+                raise ValueError(f"Shard index must be between 0 and {self.count - 1}: {spec}")
+
+    def contains(self, group_id):
+        if self.ranges:
+            return any(low <= group_id <= high for low, high in self.ranges)
+        # crc32 rather than hash(): stable across processes and hosts
+        return zlib.crc32(str(group_id).encode()) % self.count == self.index
+
+
+def write_manifest(folder, spec, groups, report_path, report_format, complete=False, rows=None, started=None):
+    """
+    Write {folder}/manifest.json. `groups` is [(position, group)] with the
+    group's position in the full group listing.
+    """
+    manifest = {
+        "shard": spec.spec if spec else None,
+        "shard_count": spec.count if spec else None,
+        "shard_index": spec.index if spec else None,
+        "report": os.path.basename(report_path),
+        "format": report_format,
+        "groups": [{"id": group.id, "name": group.name, "position": position} for position, group in groups],
+        "started": started or datetime.now().isoformat(timespec="seconds"),
+        "finished": datetime.now().isoformat(timespec="seconds") if complete else None,
+        "complete": complete,
+        "rows": rows,
+    }
+    tmp_path = os.path.join(folder, MANIFEST_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(folder, MANIFEST_FILE))
+    return manifest
+
+
+def read_manifest(folder):
+    with open(os.path.join(folder, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
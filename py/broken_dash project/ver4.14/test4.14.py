@@ -19,7 +19,9 @@ Key Features:
 - Detects broken or incomplete widgets based on type-specific checks.
 - Identifies dashboards without widget tokens.
 - Skips widgets like HTML or Alert widgets from broken-status checks.
-- Tracks API rate limits and throttles requests to avoid exceeding quotas.
+- Paces requests with a token-bucket limiter synced to the API rate-limit
+  headers, so calls are spread across the window instead of bursting.
+  The budget is shared with other tools using the same access ID.
 - Outputs a CSV report summarizing dashboards, widgets, and their statuses.
 
 Use Cases:
@@ -32,563 +34,998 @@ Requirements:
 -------------
 - Python 3.x
 - logicmonitor-sdk v3
+- lm_client.py (repository root)
 - Valid LogicMonitor API credentials (credentials.json)
 """
 
+import argparse
+import asyncio
 import json
-import re
 import os
-import csv
+import re
+import sys
 import logicmonitor_sdk
 import time
 from logicmonitor_sdk.rest import ApiException
-from auth_sdk import api_auth
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from datetime import datetime
 
+# Shared helpers (lm_client, ...) live in the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+from lm_client import sdk_api, load_config, retry_delay
+from metrics import Metrics, endpoint_name, start_export
+from tracing import Tracer
+from rate_limit import shared_limiter
+from paginate import iter_sdk, iter_json
+from inventory import Inventory
+from checkpoint import Checkpoint, CHECKPOINT_FILE
+from scan_state import ScanState, STATE_FILE, DEFAULT_TTL_HOURS, fingerprint
+from report_writer import ReportWriter, OrderedReport, REPORT_FORMATS, flatten_tokens
+from shards import ShardSpec, write_manifest
+from sampling import Sampler, DEFAULT_MIN_PER_TYPE
+from result_cache import ResultCache, query_key, DEFAULT_MAX_ENTRIES, DEFAULT_TTL_SECONDS
+from widget_checks import (evaluate_widget_data, check_graphplot_stream, has_no_data,
+                           NO_DATA, GRAPH_WIDGET_TYPES, TIME_SERIES_WIDGET_TYPES, STREAM_CHUNK_SIZE)
+
 REQUEST_LIMIT = 500
 WINDOW_SECONDS = 60
+POOL_SIZE = 10
+MAX_RETRIES = 5
+QUEUE_SIZE = 100
+DASHBOARD_LIST_FIELDS = "id,name,fullName,groupId,widgetTokens"
+WIDGET_LIST_FIELDS = "id,name,type,dashboardId,lastUpdatedOn"
+# REST widget type -> SDK model class name, e.g. "cgraph" -> "CustomGraphWidget"
+WIDGET_CLASSES = logicmonitor_sdk.Widget.discriminator_value_class_map
+# No data to check; TextWidget is also caught by its content field when listed in full
+SKIPPED_WIDGET_TYPES = ("HtmlWidget", "AlertWidget", "TextWidget")
+PROBE_WINDOWS = "60,1440"  # minutes, see --probe
 
-widgets_config = {}
-report = {"groups":{}}
 timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 report_folder = f"report_{timestamp}"
+limiter = None  # shared rate-limit budget, set up in main()
+dashboard_index = None  # groupId -> dashboards, when listing account-wide
+widget_listing = "dashboard"  # how widget definitions are fetched, see --widget-listing
+widget_index = None  # widget ID -> widget, when listing account-wide
+inventory = None  # device / group / instance inventory, with --validate-refs
+probe_windows = []  # widget-data probe windows in minutes, with --probe
+result_cache = None  # health results by widget query, with --cache
+sampler = None  # widget sample per dashboard and breakage estimate, with --sample
+checkpoint = Checkpoint()  # journal of finished work, opened in main()
+report_writer = None  # streaming CSV/JSONL sink, opened in main()
+scan_state = None  # last run's per-dashboard results, with --incremental
+widget_stamps = None  # dashboard ID -> [(widget ID, lastUpdatedOn)], with --incremental if the widget listing worked
+metrics = None  # per-endpoint API metrics, with --metrics
+tracer = Tracer()  # group / dashboard / widget spans, opened in main() with --trace
 
 def throttle(headerinfo):
-    lm_api_remaining = int(headerinfo.get('x-rate-limit-remaining'))
-    lm_api_limit = int(headerinfo.get('x-rate-limit-limit'))
-    lm_api_window = int(headerinfo.get('x-rate-limit-window'))
-    print(f"\rAPI Rate limit Remaining: {lm_api_remaining}/500\033[K", end="", flush=True) #\033[K clears the rest of the line
-    if lm_api_remaining <3:
-      print(f"\nRate limit is almost reached, sleeping for {lm_api_window/2} seconds")
-      time.sleep(lm_api_window/2)
-
-def throttle_tail(headerinfo, obj):
-    lm_api_remaining = int(headerinfo.get('x-rate-limit-remaining'))
-    lm_api_limit = int(headerinfo.get('x-rate-limit-limit'))
-    lm_api_window = int(headerinfo.get('x-rate-limit-window'))
-    print(f"\rAPI Rate limit Remaining: {lm_api_remaining}/500\033[K", end="", flush=True) #\033[K clears the rest of the line
-    if lm_api_remaining <20:
-      print(f"\nRate limit is below 20, sleeping for {lm_api_window/4} seconds before proceed with the next {obj}")
-      time.sleep(lm_api_window/4)
-
-def extract_error_message(error_tuple):
-    broken, message = error_tuple
-    if message is None:
-        return None
-    #try to extract LM JSON error
-    match = re.search(r'HTTP response body:\s*(\{.*\})', message, re.DOTALL)
-    if match:
-        try:
-            error_json = json.loads(match.group(1))
-            return error_json.get("errorMessage") or message
-        except json.JSONDecodeError:
-            return message
+    """
+    Feed the x-rate-limit-* headers back into the shared limiter and
+    show the remaining budget.
+    """
+    limiter.update(headerinfo)
+    print(limiter.status(), end="", flush=True) #\033[K clears the rest of the line
 
-    return message
+def api_call(method, *args, **kwargs):
+    """
+    Wait for a rate-limit slot, then call an SDK *_with_http_info method.
+    HTTP 429 responses are retried with backoff.
+    """
+    endpoint = endpoint_name(method.__name__)
+    attempt = 0
+    while True:
+        waited = limiter.acquire()
+        if metrics:
+            metrics.wait(endpoint, waited)
+        if waited > 0:
+            tracer.complete("rate_limit_wait", "limiter", tracer.now() - waited * 1e6, waited * 1e6, endpoint=endpoint)
+        try:
+            with tracer.span(endpoint, "api"):
+                response = method(*args, **kwargs)
+        except ApiException as e:
+            if e.status != 429 or attempt >= MAX_RETRIES:
+                raise
+            attempt += 1
+            if metrics:
+                metrics.retry(endpoint)
+            limiter.update(e.headers)
+            limiter.penalize(retry_delay(e, limiter.window, attempt))
+            continue
+        throttle(response[2])
+        return response
 
-def check_graphplot_widget(widget):
+def call_raw(api_instance, resource_path, path_params=None, **query):
     """
-    Handles GraphPlot widgets returned by logicmonitor_sdk.
-    The input is usually a GraphPlot object, not a dict.
+    GET a REST path through the SDK's ApiClient, returning (urllib3
+    response, status, headers) with the body still unread. The generated
+    *_with_http_info() methods override _preload_content and always build
+    SDK models, which fail validation on listings restricted with `fields`.
+    Query parameters that are None are left out.
     """
+    return api_instance.api_client.call_api(
+        resource_path, "GET",
+        path_params=path_params or {},
+        query_params=[(name, value) for name, value in query.items() if value is not None],
+        header_params={"Accept": "application/json"},
+        auth_settings=["LMv1"],
+        _preload_content=False)
 
-    # If it's an SDK model with to_dict(), convert it
-    if hasattr(widget, "to_dict"):
-        widget = widget.to_dict()
+# Raw counterparts of the SDK methods; named alike so metrics label them the same
 
-    # Now ensure it's a dict
-    if not isinstance(widget, dict):
-        return True, f"Invalid structure: expected dict after to_dict(), got {type(widget)}"
+def get_widget_data_by_id(api_instance, w_id, **window):
+    return call_raw(api_instance, "/dashboard/widgets/{id}/data", {"id": w_id}, **window)
 
-    # GraphPlot stores data inside 'lines' → each line contains 'data'
-    lines = widget.get("lines")
-    if not lines or not isinstance(lines, list):
-        return True, "Graph widget has no 'lines' or list is empty"
+def get_widget_list(api_instance, **query):
+    return call_raw(api_instance, "/dashboard/widgets", **query)
 
-    # Check if any line has meaningful data points
-    for line in lines:
-        data_points = line.get("data")
-        if isinstance(data_points, list) and len(data_points) > 0:
-            return False, "OK"
+def get_device_list(api_instance, **query):
+    return call_raw(api_instance, "/device/devices", **query)
 
-    return True, "Graph has no datapoints in any line"
+def get_device_group_list(api_instance, **query):
+    return call_raw(api_instance, "/device/groups", **query)
 
-def extract_numeric_from_big_number(raw_data):
+def get_device_instance_list(api_instance, device_id, **query):
+    return call_raw(api_instance, "/device/devices/{id}/instances", {"id": device_id}, **query)
+
+def fetch_json(method, *args, **kwargs):
     """
-    Recursively extract numeric values from LM BigNumber widget raw data.
-    Returns a list of numeric values (can be empty).
+    Call a raw GET method (see call_raw()) through api_call() and decode
+    the JSON body; no SDK model is built from the response.
     """
-    numeric_values = []
-
-    if raw_data is None:
-        return numeric_values
-
-    if isinstance(raw_data, (int, float)):
-        numeric_values.append(raw_data)
-    elif isinstance(raw_data, str):
-        try:
-            numeric_values.append(float(raw_data))
-        except ValueError:
-            pass
-    elif isinstance(raw_data, list):
-        for item in raw_data:
-            numeric_values.extend(extract_numeric_from_big_number(item))
-    elif isinstance(raw_data, dict):
-        for k, v in raw_data.items():
-            numeric_values.extend(extract_numeric_from_big_number(v))
-
-    return numeric_values
+    response = api_call(method, *args, **kwargs)[0]
+    try:
+        if metrics:
+            metrics.add_bytes(endpoint_name(method.__name__), len(response.data))
+        return json.loads(response.data)
+    finally:
+        response.release_conn()
 
-def check_bignumber_widget(data):
+def fetch_widget_data(api_instance, w_id, **window):
     """
-    Handles BigNumber widgets returned by logicmonitor_sdk.
-    The input is usually a BigNumber object, not a dict.
+    Widget data as decoded JSON. `window` is an optional start/end (epoch
+    seconds) overriding the widget's own time range.
     """
-    d = data.to_dict()
-
-    # First check top-level 'value'
-    if "value" in d and d["value"] is not None:
-        try:
-            float(d["value"])
-            return False, "OK"
-        except (ValueError, TypeError):
-            pass
-
-    raw_data = d.get("data")
-
-    numeric_values = extract_numeric_from_big_number(raw_data)
+    return fetch_json(get_widget_data_by_id, api_instance, w_id, **window)
 
-    if numeric_values:
-        return False, "OK"
-    else:
-        return True, "No numeric values found (may contain 'No Data')"
+def counted(chunks):
+    """
+    Pass streamed response chunks through, adding their size to the metrics.
+    """
+    for chunk in chunks:
+        metrics.add_bytes("widget_data", len(chunk))
+        yield chunk
 
-def check_piechart_widget(widget):
+def stream_graph_data(api_instance, w_id, **window):
     """
-    Handles PieChart widgets returned by logicmonitor_sdk.
-    The input is usually a PieChart object, not a dict.
+    Check a graph widget's data while it downloads, stopping at the first
+    line with datapoints. Returns (status, no_data_seen).
     """
-    # If SDK model → convert
-    if hasattr(widget, "to_dict"):
-        widget = widget.to_dict()
+    response = api_call(get_widget_data_by_id, api_instance, w_id, **window)[0]
+    try:
+        chunks = response.stream(STREAM_CHUNK_SIZE)
+        return check_graphplot_stream(counted(chunks) if metrics else chunks)
+    finally:
+        # Drop the connection rather than reading the rest of a large body
+        response.close()
+        response.release_conn()
+
+def check_widget_data(api_instance, w_id, widget_type_field, **window):
+    """
+    Returns (broken_status: bool, message: str)
+    Robust detection of broken widgets by type, on the raw widget data.
+    Graph data, which can run to megabytes, is checked as it streams in.
+    """
+    try:
+        if widget_type_field in GRAPH_WIDGET_TYPES:
+            status, no_data = stream_graph_data(api_instance, w_id, **window)
+        else:
+            widget_data = fetch_widget_data(api_instance, w_id, **window)
+            status = evaluate_widget_data(widget_type_field, widget_data)
+            no_data = status[0] is True and has_no_data(widget_data)
 
-    # If tuple → extract dict part
-    if isinstance(widget, tuple) and len(widget) >= 1:
-        widget = widget[0]
+    except ValueError as e:
+        return True, f"Widget data is not valid JSON: {e}"
 
-    # Must now be a dict
-    if not isinstance(widget, dict):
-        return True, f"Invalid widget structure: {type(widget)}"
+    except Exception as e:
+        return True, f"Widget detail unhandled: {e}"
 
-    data_list = widget.get("data")
+    # LM returns "No Data" in place of numbers it has no data for
+    if status[0] is True and no_data:
+        return "Skipped", NO_DATA
+    return status
 
-    # No data[] list at all
-    if not isinstance(data_list, list) or len(data_list) == 0:
-        return True, "PieChart has no data[] values"
+def is_widget_broken(api_instance, w_id, widget_type_field):
+    """
+    Returns (broken_status: bool, message: str)
+    With --probe, time-series widgets are first asked for the last few
+    minutes of data only, widening through the probe windows while the
+    answer is not OK. The verdict of a widget that has no data in any probe
+    window comes from its own time range, as without probing.
+    """
+    if widget_type_field in TIME_SERIES_WIDGET_TYPES:
+        end = int(time.time())
+        for minutes in probe_windows:
+            status = check_widget_data(api_instance, w_id, widget_type_field, start=end - minutes * 60, end=end)
+            if status[0] is False:
+                return status
+    return check_widget_data(api_instance, w_id, widget_type_field)
+
+def new_dashboard_entry(dashboard):
+    """
+    Report entry for one dashboard, before its widgets are checked.
+    """
+    return {
+        "dashboard_name": dashboard.name,
+        "dashboard_full_path": dashboard.full_name,
+        "widget_tokens": [dashboard.widget_tokens],
+        "widgets": {}
+    }
 
-    values = []
+def list_dashboard_groups(api_instance):
+    return list(iter_sdk(partial(api_call, api_instance.get_dashboard_group_list_with_http_info)))
 
-    for item in data_list:
-        if not isinstance(item, dict):
-            continue
-        val = item.get("value")
-        if isinstance(val, (int, float)):
-            values.append(val)
+def build_dashboard_index(api_instance):
+    """
+    List every dashboard in the account in a few large pages and index
+    them by group ID, instead of one listing call per group.
+    """
+    index = {}
+    # Incremental scans hash the layout config, so it is listed along with the rest
+    fields = DASHBOARD_LIST_FIELDS + (",widgetsConfig" if scan_state is not None else "")
+    dashboards = iter_sdk(partial(api_call, api_instance.get_dashboard_list_with_http_info), fields=fields)
+    for dashboard in dashboards:
+        index.setdefault(dashboard.group_id, []).append(dashboard)
+    return index
+
+def list_dashboards(api_instance, group_id):
+    if dashboard_index is not None:
+        return dashboard_index.get(group_id, [])
+    return list(iter_sdk(partial(api_call, api_instance.get_dashboard_list_with_http_info), filter=f"groupId:{group_id}"))
+
+class ListedWidget:
+    """
+    A widget definition from the raw widget listing, standing in for the
+    SDK model get_widget_by_id returns: fields read as snake_case
+    attributes, to_dict() is the listing's JSON, and type_name is the SDK
+    class name for the widget's REST type.
+    """
 
-    # No numeric values in the widget
-    if not values:
-        return True, "PieChart has no numeric values"
+    def __init__(self, data):
+        self.data = data
+        rest_type = data.get("type")
+        self.type_name = WIDGET_CLASSES.get(rest_type, rest_type or "UNKNOWN")
 
-    # All values are 0 → error
-    if all(v == 0 for v in values):
-        return True, "PieChart values are all zero"
+    def __getattr__(self, name):
+        key = re.sub(r"_([a-z])", lambda m: m.group(1).upper(), name)
+        try:
+            return self.__dict__["data"][key]
+        except KeyError:
+            raise AttributeError(name) from None
 
-    # Otherwise OK
-    return False, "OK"
+    def to_dict(self):
+        return self.data
 
-def check_gauge_widget(widget):
+def list_widgets(api_instance, **params):
     """
-    Validates a Gauge widget:
-      - current_value must be non-zero and not None
-      - history_values must contain at least one numeric non-zero value
+    Page through the widget listing and index the widget definitions by ID
+    (as a string, matching the widgets_config keys).
     """
+    # Reference validation and the result cache need the full widget config,
+    # not just the name and type
+    fields = None if inventory is not None or result_cache is not None else WIDGET_LIST_FIELDS
+    widgets = iter_json(partial(fetch_json, get_widget_list, api_instance), fields=fields, **params)
+    return {str(widget["id"]): ListedWidget(widget) for widget in widgets}
 
-    # Convert SDK object
-    if hasattr(widget, "to_dict"):
-        widget = widget.to_dict()
+def build_widget_index(api_instance):
+    """
+    Widget definitions for the whole account, in a few large pages.
+    """
+    try:
+        return list_widgets(api_instance)
+    except ValueError as e:
+        # A page that is not valid JSON
+        print(f"Widget listing failed, falling back to per-dashboard listing: {e}")
+        return None
 
-    # Extract from tuple response
-    if isinstance(widget, tuple) and len(widget) >= 1:
-        widget = widget[0]
+def build_inventory(api_instance):
+    """
+    Load the account's device and device-group IDs/names once; instances
+    are loaded per device the first time a widget references it.
+    """
+    # Raw JSON: the SDK models fail validation on listings restricted with `fields`
+    def list_instances(device_id):
+        instances = iter_json(partial(fetch_json, get_device_instance_list, api_instance, device_id), fields="id")
+        return (instance["id"] for instance in instances)
+
+    return Inventory(
+        iter_json(partial(fetch_json, get_device_list, api_instance), fields="id,displayName"),
+        iter_json(partial(fetch_json, get_device_group_list, api_instance), fields="id,fullPath"),
+        list_instances=list_instances,
+    )
+
+def fetch_widgets(api_instance, dashboard_id):
+    """
+    Get the full dashboard config and return its widget IDs, plus the widget
+    definitions already known from a bulk listing ({} when per-widget calls
+    are needed).
+    """
+    dashboard_detail_http = api_call(api_instance.get_dashboard_by_id_with_http_info, dashboard_id)
+    dashboard_detail = dashboard_detail_http[0]
+    widgets_config = dashboard_detail.to_dict().get("widgets_config",{})
+    widgets_ids = list(widgets_config.keys())
+
+    if widget_listing in ("account", "dashboard") and widget_index is not None:
+        return widgets_ids, widget_index
+    if widget_listing in ("account", "dashboard") and widgets_ids:
+        try:
+            return widgets_ids, list_widgets(api_instance, filter=f"dashboardId:{dashboard_id}")
+        except ValueError:
+            pass  # Not valid JSON; check widgets one by one
+    return widgets_ids, {}
 
-    if not isinstance(widget, dict):
-        return True, f"Invalid widget structure: {type(widget)}"
+def build_widget_stamps():
+    """
+    Widget IDs and last-modified times per dashboard, from the account-wide
+    widget listing, so widget edits change the dashboard's fingerprint.
+    None when the listing failed.
+    """
+    if widget_index is None:
+        return None
+    stamps = {}
+    for widget in widget_index.values():
+        stamps.setdefault(widget.dashboard_id, []).append((str(widget.id), widget.last_updated_on))
+    return {dashboard_id: sorted(widgets) for dashboard_id, widgets in stamps.items()}
 
-    # --- CURRENT VALUE CHECK ---
-    current = widget.get("current_value")
+def dashboard_fingerprint(dashboard):
+    """
+    Hash of everything in the listing metadata that affects a dashboard's
+    scan result: its widget layout config, tokens and widget definitions.
+    """
+    return fingerprint({
+        "widgets_config": dashboard.widgets_config,
+        "widget_tokens": dashboard.widget_tokens,
+        # Never matches a fingerprint taken with the widget stamps
+        "widgets": widget_stamps.get(dashboard.id, []) if widget_stamps is not None else None,
+    })
+
+def reuse_previous(dashboard):
+    """
+    Last run's report entry for a dashboard that does not need rescanning,
+    refreshed with the current name, path and tokens; None otherwise.
+    Without the widget stamps, widget edits cannot be seen, so every
+    dashboard counts as changed.
+    """
+    if scan_state is None or widget_stamps is None:
+        return None
+    previous = scan_state.fresh_entry(dashboard.id, dashboard_fingerprint(dashboard))
+    if previous is None:
+        return None
+    return journal_entry(dict(previous,
+                              dashboard_name=dashboard.name,
+                              dashboard_full_path=dashboard.full_name,
+                              widget_tokens=[dashboard.widget_tokens]))
 
-    if current is None:
-        return True, "Gauge current_value is None"
+def record_scan(dashboard, entry):
+    # A sampled dashboard's entry is partial, so it is not kept for reuse
+    if scan_state is not None and sampler is None:
+        scan_state.record(dashboard.id, dashboard_fingerprint(dashboard), journal_entry(entry))
 
-    if isinstance(current, (int, float)):
-        if current == 0:
-            return True, "Gauge current_value is 0"
-    else:
-        return True, f"Gauge current_value is not numeric: {current}"
+def check_references(widget_detail, widget_tokens):
+    """
+    Inventory check of a widget's resource references. Returns a message
+    for a missing resource, or None (also when the check itself fails, so
+    the widget-data check still runs).
+    """
+    try:
+        return inventory.check_widget(widget_detail.to_dict(), widget_tokens)
+    except Exception as e:
+        print(f"\nReference check failed for widget {widget_detail.id}: {e}")
+        return None
 
-    # --- HISTORY VALUES CHECK ---
-    history = widget.get("history_values")
+def is_transient(status):
+    """
+    Failed calls are not cached: the next widget with the same query retries.
+    """
+    return str(status[1]).startswith(("Widget detail unhandled", "Widget data is not valid JSON"))
 
-    if not isinstance(history, list):
-        return True, "Gauge history_values missing or not a list"
+def cached_data_check(api_instance, w_id, widget_detail, widget_type_field, widget_tokens):
+    """
+    is_widget_broken(), answered from the result cache when a widget with
+    the same data query was already checked.
+    """
+    check = partial(is_widget_broken, api_instance=api_instance, w_id=w_id, widget_type_field=widget_type_field)
+    if result_cache is None:
+        return check()
+    key = query_key(widget_type_field, widget_detail.to_dict(), widget_tokens)
+    return result_cache.get_or_compute(key, check, cacheable=lambda status: not is_transient(status))
 
-    numeric_history = [
-        v for v in history if isinstance(v, (int, float))
-    ]
+def scan_widget(api_instance, w_id, dashboard_name, widget_detail=None, widget_tokens=None):
+    """
+    scan_widget_entry() inside a trace span named after the widget type.
+    """
+    with tracer.span("widget", "widget", widget_id=w_id) as span:
+        widget_entry = scan_widget_entry(api_instance, w_id, dashboard_name, widget_detail, widget_tokens)
+        span.name = widget_entry["widget_type"]
+        span.args.update(widget_name=widget_entry["widget_name"], broken=widget_entry["broken_status"],
+                         error=widget_entry["widget_error"])
+    return widget_entry
+
+def scan_widget_entry(api_instance, w_id, dashboard_name, widget_detail=None, widget_tokens=None):
+    """
+    Check one widget's data and return its report entry. The widget's
+    definition is fetched only when it is not already known from a listing.
+    With an inventory loaded, the widget's resource references are checked
+    locally first and the data endpoint is called only if they all exist.
+    """
+    # Handle "Unhandled error: could not convert string to float: 'No Data'"
+    try:
+        if widget_detail is None:
+            widget_detail_http = api_call(api_instance.get_widget_by_id_with_http_info, w_id)
+            widget_detail = widget_detail_http[0]
 
-    if not numeric_history:
-        return True, "Gauge history_values has no numeric entries"
+    except ValueError as e:
+        # The SDK is trying to convert "No Data" into float
+        if "No Data" in str(e):
+            widget_status = ("Skipped", "No Data")
+        else:
+            widget_status = (True, f"Widget detail error: {e}")
+        widget_detail = None
 
-    if all(v == 0 for v in numeric_history):
-        return True, "Gauge history_values are all 0"
+    except Exception as e:
+        widget_status = (True, f"Widget detail unhandled: {e}")
+        widget_detail = None
+
+    if widget_detail is None:
+        return {
+            "widget_name": "UNKNOWN",
+            "broken_status": widget_status[0],
+            "widget_type": "UNKNOWN",
+            "widget_error": widget_status[1],
+        }
+
+    widget_name = widget_detail.name
+    widget_type_field = widget_type_name(widget_detail)
+    print(f" | Proceed: {dashboard_name} / {widget_name}")
+
+    #Check if widget is HTML/Alrt type
+    if widget_type_field in SKIPPED_WIDGET_TYPES or hasattr(widget_detail, "content"):
+        widget_status = (False, "SKIPPED")
+    elif inventory is not None and (missing := check_references(widget_detail, widget_tokens)):
+        widget_status = (True, missing)
+    else:
+        widget_status = cached_data_check(api_instance, w_id, widget_detail, widget_type_field, widget_tokens)
 
-    # If both checks passed → OK
-    return False, "OK"
+    message = widget_status[1] # second element is the error string
+    return {
+        "widget_name": widget_name,
+        "broken_status": widget_status[0],
+        "widget_type": widget_type_field,
+        "widget_error": message,
+    }
 
-def check_sla_widget(widget: dict) -> tuple[bool, str]:
+def journal_entry(entry):
     """
-    Validate SLA widget structures for DeviceSLA and WebsiteSLA widgets.
-    Returns:
-        (True, "OK") if valid
-        (False, "<reason>") if invalid
+    Dashboard entry in JSON-safe form for the checkpoint journal: widget
+    tokens are kept as the strings the CSV report prints for them.
     """
+    return dict(entry, widget_tokens=[str(t) for t in flatten_tokens(entry.get("widget_tokens"))])
 
-    # -------------------------
-    # WEBSITE SLA (websiteSLA)
-    # -------------------------
-    # Convert SDK object → dict
-    if hasattr(widget, "to_dict"):
-        widget = widget.to_dict()
-
-    # Tuple response: (dict, status, headers)
-    if isinstance(widget, tuple) and len(widget) > 0:
-        widget = widget[0]
-
-    if not isinstance(widget, dict):
-        return False, f"Invalid website SLA widget type: {type(widget)}"
+def restore_group(group_id, group_name):
+    """
+    Write a finished group's rows from the checkpoint journal.
+    """
+    for dashboard_id in checkpoint.group(group_id)["dashboard_ids"]:
+        entry = checkpoint.dashboard(dashboard_id)
+        if entry is not None:
+            report_writer.write_dashboard(group_id, group_name, dashboard_id, entry)
+
+def finish_group(group_id, group_name, dashboard_ids):
+    checkpoint.group_done(group_id, {
+        "group_name": group_name,
+        "dashboard_ids": list(dashboard_ids),
+    })
+
+def check_widgets(api_instance, group, dashboard, entry, widgets_ids, widget_details):
+    """
+    Check a dashboard's widgets in order (or take them from the checkpoint)
+    and write their rows. Returns the widget entries.
+    """
+    widget_entries = []
+    for w_id in widgets_ids:
+        widget_entry = checkpoint.widget(dashboard.id, w_id)
+        if widget_entry is None:
+            widget_entry = scan_widget(api_instance, w_id, dashboard.name, widget_details.get(w_id), dashboard.widget_tokens)
+            checkpoint.widget_done(dashboard.id, w_id, widget_entry)
+        entry["widgets"][w_id] = widget_entry
+        report_writer.write_widget(group.id, group.name, dashboard.id, entry, w_id, widget_entry)
+        widget_entries.append(widget_entry)
+    return widget_entries
+
+def finish_dashboard(group_id, dashboard, entry):
+    checkpoint.dashboard_done(group_id, dashboard.id, journal_entry(entry))
+    record_scan(dashboard, entry)
+
+def widget_type_name(widget_detail):
+    if widget_detail is None:
+        return "UNKNOWN"
+    if isinstance(widget_detail, ListedWidget):
+        return widget_detail.type_name
+    return type(widget_detail).__name__
+
+def scan_sampled(api_instance, group, dashboards):
+    """
+    Check a random share of each widget type on every dashboard of a group.
+    When a sampled widget is broken, the rest of that dashboard is checked,
+    and the group escalates: every dashboard after it is checked in full,
+    and the unchecked widgets of the ones before it are checked too.
+    Widget types, the sampling strata, come from the widget listing; a
+    dashboard whose listing gave no types stops the scan, since one UNKNOWN
+    stratum would make the sample meaningless.
+    """
+    escalated = False
+    unchecked = []  # (dashboard, entry, widget IDs, widget details) not yet checked in full
+    for dashboard, entry, widgets_ids, widget_details in dashboards:
+        widget_types = {w_id: widget_type_name(widget_details.get(w_id)) for w_id in widgets_ids}
+        if widget_types and all(widget_type == "UNKNOWN" for widget_type in widget_types.values()):
+            print(f"\nNo widget types listed for dashboard {dashboard.name}, so it cannot be sampled. "
+                  f"Run without --sample, or --resume {report_folder} once the widget listing works")
+            exit(1)
+        sample, rest = sampler.split(widget_types)
+        results = check_widgets(api_instance, group, dashboard, entry, sample, widget_details)
+        for w_id, widget_entry in zip(sample, results):
+            sampler.record(widget_types[w_id], widget_entry["broken_status"])
+
+        if not escalated and any(widget_entry["broken_status"] is True for widget_entry in results):
+            escalated = True
+            print(f"\nBroken widget on {dashboard.name}, checking group '{group.name}' in full")
+            for pending in unchecked:
+                check_widgets(api_instance, group, *pending)
+            unchecked.clear()
+
+        if escalated:
+            check_widgets(api_instance, group, dashboard, entry, rest, widget_details)
+        elif rest:
+            unchecked.append((dashboard, entry, rest, widget_details))
+
+    for dashboard, entry, _, _ in dashboards:
+        finish_dashboard(group.id, dashboard, entry)
+
+def scan_serial(api_instance, dashboard_groups):
+    """
+    Walk groups, dashboards and widgets one call at a time, writing each
+    widget's row as soon as it is checked.
+    Work already recorded in the checkpoint journal is reused, not rescanned.
+    """
+    # Loop through all groups and their dashboards
+    for group in dashboard_groups:
+        with tracer.span(group.name, "group", group_id=group.id):
+            scan_group(api_instance, group)
 
-    # Ensure this really is websiteSLA
-    if widget.get("type") == "websiteSLA":
+def scan_group(api_instance, group):
+    """
+    Scan one dashboard group's dashboards and widgets (see scan_serial()).
+    """
+    group_id = group.id
+    group_name = group.name
+    if checkpoint.group(group_id) is not None:
+        restore_group(group_id, group_name)
+        return
 
-        availability = widget.get("availability")
+    try:
+        dashboards = list_dashboards(api_instance, group_id)
+    except ApiException as e:
+        print(f"Error fetching dashboards for group '{group_name}': {e}")
+        return
+
+    # Loop through all dashboards in the group
+    group_complete = True
+    dashboard_ids = []
+    sampled_dashboards = []
+    listed = set()
+    for dashboard in dashboards:
+        if dashboard.id in listed:
+            continue
+        listed.add(dashboard.id)
+        done = checkpoint.dashboard(dashboard.id)
+        if done is not None:
+            report_writer.write_dashboard(group_id, group_name, dashboard.id, done)
+            dashboard_ids.append(dashboard.id)
+            continue
 
-        # Missing field → error
-        if availability is None:
-            return False, "availability missing"
+        previous = reuse_previous(dashboard)
+        if previous is not None:
+            report_writer.write_dashboard(group_id, group_name, dashboard.id, previous)
+            checkpoint.dashboard_done(group_id, dashboard.id, previous)
+            dashboard_ids.append(dashboard.id)
+            continue
 
-        # Not numeric → error
-        if not isinstance(availability, (int, float)):
+        with tracer.span(dashboard.name, "dashboard", dashboard_id=dashboard.id):
             try:
-                availability = float(availability)
-            except Exception:
-                return False, f"availability not numeric: {availability}"
-
-        # Passed all checks → OK
-        return True, "OK"
+                widgets_ids, widget_details = fetch_widgets(api_instance, dashboard.id)
+            except ApiException as e:
+                print(f"❌ Failed to fetch or save dashboard {dashboard.name}: {e}")
+                group_complete = False
+                continue
 
-    # -------------------------
-    # DEVICE SLA (deviceSLA)
-    # -------------------------
-    if widget.get("type") == "deviceSLA":
-        results = widget.get("result_list", [])
-        if not results:
-            return False, "result_list missing or empty"
+            entry = new_dashboard_entry(dashboard)
+            dashboard_ids.append(dashboard.id)
+            if sampler is not None:
+                sampled_dashboards.append((dashboard, entry, widgets_ids, widget_details))
+                continue
 
-        value = results[0].get("value")
+            check_widgets(api_instance, group, dashboard, entry, widgets_ids, widget_details)
+            finish_dashboard(group_id, dashboard, entry)
 
-        # Return error for LM errors
-        if value == "Group not found":
-            return False, "Group not found"
+    if sampled_dashboards:
+        scan_sampled(api_instance, group, sampled_dashboards)
 
-        # None value
-        if value is None:
-            return False, "value is None"
+    if group_complete:
+        finish_group(group_id, group_name, dashboard_ids)
 
-        # Not numeric
-        try:
-            value = float(value)
-        except Exception:
-            return False, f"value not numeric: {value}"
+async def scan_async(api_instance, dashboard_groups, concurrency,
+                     list_workers=1, config_workers=2, check_workers=None, queue_size=QUEUE_SIZE):
+    """
+    Same walk as scan_serial(), split into three pipelined stages:
 
-        return True, "OK"
+        groups -> [list] -> dashboards -> [config] -> widgets -> [check]
 
-    # -------------------------
-    # Unsupported widget type
-    # -------------------------
-    return False, f"Unsupported widget type: {widget.get('type')}"
+    Each stage has its own worker count and hands work to the next through a
+    bounded queue, so the next dashboard's config is loaded while the current
+    one's widgets are checked, and memory stays flat on huge accounts.
+    At most `concurrency` API calls are in flight across all stages.
 
-def is_widget_broken(api_instance, w_id, widget_type_field):
-    """
-    Returns (broken_status: bool, message: str)
-    Robust detection of broken widgets by type.
+    The SDK is synchronous, so each call runs in a worker thread. A
+    dashboard's entry is kept only until its last widget is checked, when
+    it is journaled to the checkpoint and its rows are handed to an
+    OrderedReport, which writes them in listing order: the report matches
+    the serial scan row for row. A group is journaled with its last
+    dashboard.
     """
-    
-    # Get widget data with HTTP info
-    # Handle "Unhandled error: could not convert string to float: 'No Data'"
+    check_workers = check_workers or concurrency
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=list_workers + config_workers + check_workers)
+    semaphore = asyncio.Semaphore(concurrency)
+    group_queue = asyncio.Queue()
+    dashboard_queue = asyncio.Queue(maxsize=queue_size)
+    widget_queue = asyncio.Queue(maxsize=queue_size)
+
+    report = OrderedReport(report_writer, len(dashboard_groups))
+
+    # Work still in flight, for journaling dashboards and groups when they finish
+    dashboards_left = {}
+    dashboard_ids = {}
+    widgets_left = {}
+    widget_order = {}
+    report_slots = {}
+    incomplete_groups = set()
+    incomplete_dashboards = set()
+
+    async def run(func, *args):
+        async with semaphore:
+            return await loop.run_in_executor(executor, func, *args)
+
+    def dashboard_settled(group):
+        dashboards_left[group.id] -= 1
+        if dashboards_left[group.id] == 0:
+            tracer.end(group.name, "group", f"group-{group.id}")
+            group_dashboard_ids = dashboard_ids.pop(group.id)
+            if group.id not in incomplete_groups:
+                finish_group(group.id, group.name, group_dashboard_ids)
+
+    def widget_settled(group, dashboard, entry):
+        widgets_left[dashboard.id] -= 1
+        if widgets_left[dashboard.id] == 0:
+            del widgets_left[dashboard.id]
+            tracer.end(dashboard.name, "dashboard", f"dashboard-{dashboard.id}")
+            # Widgets finish out of order; rows and journal follow the dashboard's layout
+            widgets = entry["widgets"]
+            entry["widgets"] = {w_id: widgets[w_id] for w_id in widget_order.pop(dashboard.id) if w_id in widgets}
+            if dashboard.id in incomplete_dashboards:
+                # Left out of the journal, so a resumed scan checks it again
+                incomplete_dashboards.discard(dashboard.id)
+            else:
+                checkpoint.dashboard_done(group.id, dashboard.id, journal_entry(entry))
+                record_scan(dashboard, entry)
+            report.done(report_slots.pop(dashboard.id), group.id, group.name, dashboard.id, entry)
+            dashboard_settled(group)
+
+    async def list_stage():
+        while True:
+            position, group = await group_queue.get()
+            try:
+                if checkpoint.group(group.id) is not None:
+                    for dashboard_id in checkpoint.group(group.id)["dashboard_ids"]:
+                        report.done(report.add(position), group.id, group.name, dashboard_id,
+                                    checkpoint.dashboard(dashboard_id))
+                    continue
+                tracer.begin(group.name, "group", f"group-{group.id}", group_id=group.id)
+                dashboards = await run(list_dashboards, api_instance, group.id)
+                dashboards_left[group.id] = 1  # held open until every dashboard is queued
+                # Listing order; the group is journaled only if every one of them finishes
+                dashboard_ids[group.id] = []
+                listed = set()
+                for dashboard in dashboards:
+                    if dashboard.id in listed:
+                        continue
+                    listed.add(dashboard.id)
+                    dashboard_ids[group.id].append(dashboard.id)
+                    slot = report.add(position)
+                    done = checkpoint.dashboard(dashboard.id)
+                    if done is None:
+                        done = reuse_previous(dashboard)
+                        if done is not None:
+                            checkpoint.dashboard_done(group.id, dashboard.id, done)
+                    if done is not None:
+                        report.done(slot, group.id, group.name, dashboard.id, done)
+                        continue
+                    dashboards_left[group.id] += 1
+                    report_slots[dashboard.id] = slot
+                    await dashboard_queue.put((group, dashboard))
+                dashboard_settled(group)
+            except Exception as e:
+                print(f"Error fetching dashboards for group '{group.name}': {e}")
+                tracer.end(group.name, "group", f"group-{group.id}")
+                incomplete_groups.add(group.id)
+            finally:
+                report.close_group(position)
+                group_queue.task_done()
+
+    async def config_stage():
+        while True:
+            group, dashboard = await dashboard_queue.get()
+            tracer.begin(dashboard.name, "dashboard", f"dashboard-{dashboard.id}", dashboard_id=dashboard.id)
+            try:
+                widgets_ids, widget_details = await run(fetch_widgets, api_instance, dashboard.id)
+                entry = new_dashboard_entry(dashboard)
+                widgets_left[dashboard.id] = 1  # held open until every widget is queued
+                widget_order[dashboard.id] = widgets_ids
+                for w_id in widgets_ids:
+                    widget_entry = checkpoint.widget(dashboard.id, w_id)
+                    if widget_entry is not None:
+                        entry["widgets"][w_id] = widget_entry
+                        continue
+                    widgets_left[dashboard.id] += 1
+                    await widget_queue.put((group, entry, w_id, dashboard, widget_details.get(w_id)))
+                widget_settled(group, dashboard, entry)
+            except Exception as e:
+                print(f"❌ Failed to fetch or save dashboard {dashboard.name}: {e}")
+                tracer.end(dashboard.name, "dashboard", f"dashboard-{dashboard.id}")
+                incomplete_groups.add(group.id)
+                report.done(report_slots.pop(dashboard.id))
+                dashboard_settled(group)
+            finally:
+                dashboard_queue.task_done()
+
+    async def check_stage():
+        while True:
+            group, entry, w_id, dashboard, widget_detail = await widget_queue.get()
+            try:
+                widget_entry = await run(scan_widget, api_instance, w_id, dashboard.name, widget_detail, dashboard.widget_tokens)
+                entry["widgets"][w_id] = widget_entry
+                checkpoint.widget_done(dashboard.id, w_id, widget_entry)
+            except Exception as e:
+                # Only this widget is lost; a dead worker would leave the queue joins waiting
+                print(f"❌ Failed to check widget {w_id} on dashboard {dashboard.name}: {e}")
+                incomplete_dashboards.add(dashboard.id)
+                incomplete_groups.add(group.id)
+            finally:
+                widget_settled(group, dashboard, entry)
+                widget_queue.task_done()
+
+    for position, group in enumerate(dashboard_groups):
+        group_queue.put_nowait((position, group))
+
+    workers = (
+        [asyncio.create_task(list_stage()) for _ in range(list_workers)]
+        + [asyncio.create_task(config_stage()) for _ in range(config_workers)]
+        + [asyncio.create_task(check_stage()) for _ in range(check_workers)]
+    )
+    async def drain():
+        await group_queue.join()
+        await dashboard_queue.join()
+        await widget_queue.join()
+
+    # The stages log their own errors; anything that still ends a worker is
+    # raised here rather than left to hang the joins
+    drained = asyncio.ensure_future(drain())
     try:
-        data_http = api_instance.get_widget_data_by_id_with_http_info(w_id)
-        widget_obj = data_http[0]  # actual widget object
-        headers = data_http[2]
-
-    except ValueError as e:
-            # The SDK is trying to convert "No Data" into float
-        if "No Data" in str(e):
-            return "Skipped", "No Data"
-        return True, f"Widget detail error: {e}"
-
-    except Exception as e:
-        return True, f"Widget detail unhandled: {e}"
-
-    # Rate limiting
-    #throttle(headers)
-
-    # ------------------------------
-    # HTML / Alert widgets → skip
-    # ------------------------------
-    if "HtmlWidget" in widget_type_field or "AlertWidget" in widget_type_field:
-        return False, "SKIPPED"
-
-    # ------------------------------
-    # BigNumber / SingleValue → numeric check only
-    # ------------------------------
-    if widget_type_field in ["BigNumberWidget", "SingleValueWidget"]:
-        return check_bignumber_widget(widget_obj)
-
-    # ------------------------------
-    # PieChartWidget → list check
-    # ------------------------------
-    if widget_type_field in ["PieChartWidget"]:
-        return check_piechart_widget(widget_obj)
-    
-    # ------------------------------
-    # GaugeWidget → values and historic values check
-    # ------------------------------
-    if widget_type_field in ["GaugeWidget"]:
-        return check_gauge_widget(widget_obj)
-    
-    # ------------------------------
-    # SLAWidget → check value
-    # ------------------------------
-    if "SLAWidget" in widget_type_field:
-        return check_sla_widget(widget_obj)
-
-    # ------------------------------
-    # Graph widgets
-    # ------------------------------
-    if widget_type_field in ["CustomGraphWidget", "GraphPlotWidget"]:
-        return check_graphplot_widget(widget_obj)
-    # ------------------------------
-    # Dynamic Table Widget (rows)
-    # ------------------------------
-    if hasattr(widget_obj, "rows"):
-        if not widget_obj.rows:
-            return True, "rows[] empty — referenced resource missing"
-        return False, "OK"
-
-    # ------------------------------
-    # Generic table (items)
-    # ------------------------------
-    if hasattr(widget_obj, "items"):
-        if not widget_obj.items:
-            return True, "items[] empty — referenced resource missing"
-        return False, "OK"
-
-    # ------------------------------
-    # Catch-all for unknown / unsupported
-    # ------------------------------
-    return True, f"Unexpected widget type: {type(widget_obj)}"
-    '''
-    except ApiException as e:
-        if "404" in str(e):
-            return True, "404: Referenced resource does not exist"
-        return True, f"API error: {e}"
-
-    except Exception as e:
-        return True, f"Unhandled error: {e}"
-    '''
+        done, _ = await asyncio.wait([drained, *workers], return_when=asyncio.FIRST_COMPLETED)
+        for worker in done:
+            if worker is not drained:
+                worker.result()
+                raise RuntimeError("A scan worker stopped unexpectedly")
+    finally:
+        drained.cancel()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        executor.shutdown(wait=False)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scan LogicMonitor dashboards for broken widgets.")
+    parser.add_argument("--credentials", default="credentials.json",
+                        help="LogicMonitor API credentials file (default: credentials.json)")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="API requests in flight at once; 1 keeps the serial scan (default: 1)")
+    parser.add_argument("--report-format", choices=REPORT_FORMATS, default="csv",
+                        help="csv: dashboards.csv; jsonl: dashboards.jsonl, one JSON object per widget. "
+                             "Rows are written as each widget is checked (default: csv)")
+    parser.add_argument("--resume", metavar="REPORT_FOLDER",
+                        help="Resume an interrupted scan from the checkpoint journal in REPORT_FOLDER, "
+                             "skipping groups, dashboards and widgets that already finished")
+    parser.add_argument("--listing", choices=["account", "group"], default="account",
+                        help="account: list all dashboards once and group them locally; "
+                             "group: one listing call per dashboard group, as earlier versions did (default: account)")
+    parser.add_argument("--widget-listing", choices=["account", "dashboard", "none"], default="dashboard",
+                        help="account: list every widget once; dashboard: one widget listing per dashboard; "
+                             "none: one get_widget_by_id call per widget (default: dashboard)")
+    parser.add_argument("--validate-refs", action="store_true",
+                        help="Load device/group/instance inventory once and flag widgets whose referenced "
+                             "resources no longer exist without calling the widget-data endpoint")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse last run's results for dashboards whose config is unchanged, that had "
+                             "no broken widget and were scanned within --state-ttl hours")
+    parser.add_argument("--state-file", default=STATE_FILE,
+                        help=f"Incremental scan: state store kept between runs (default: {STATE_FILE})")
+    parser.add_argument("--state-ttl", type=float, default=DEFAULT_TTL_HOURS,
+                        help=f"Incremental scan: rescan dashboards whose last scan is older than this many "
+                             f"hours (default: {DEFAULT_TTL_HOURS})")
+    parser.add_argument("--probe", action="store_true",
+                        help="Check time-series widgets (graphs, big numbers, pie charts, gauges) on a short "
+                             "recent time window first, widening only while no data comes back")
+    parser.add_argument("--probe-windows", default=PROBE_WINDOWS,
+                        help=f"Probe windows in minutes, smallest first; the widget's own time range is "
+                             f"always the last step (default: {PROBE_WINDOWS})")
+    parser.add_argument("--cache", action="store_true",
+                        help="Check each distinct widget data query once; widgets with the same query "
+                             "(after token substitution) reuse the result")
+    parser.add_argument("--cache-ttl", type=int, default=DEFAULT_TTL_SECONDS,
+                        help=f"Result cache: seconds a result stays valid (default: {DEFAULT_TTL_SECONDS})")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_ENTRIES,
+                        help=f"Result cache: max entries, least recently used evicted first "
+                             f"(default: {DEFAULT_MAX_ENTRIES})")
+    parser.add_argument("--sample", type=float, metavar="RATE",
+                        help="Quick pulse: check only this share (0-1) of each widget type per dashboard, "
+                             "escalating to the whole dashboard and group when a broken widget is found; "
+                             "writes an estimated breakage rate to sample_estimate.csv")
+    parser.add_argument("--sample-min", type=int, default=DEFAULT_MIN_PER_TYPE,
+                        help=f"Sampling: minimum widgets checked per type per dashboard (default: {DEFAULT_MIN_PER_TYPE})")
+    parser.add_argument("--sample-seed", type=int, default=None,
+                        help="Sampling: random seed, for a repeatable sample")
+    parser.add_argument("--shard", metavar="SPEC",
+                        help="Scan only some dashboard groups: K/N for groups whose ID hashes to K mod N, "
+                             "or ids:1-100,250 for explicit group IDs; merge the shards' reports with "
+                             "merge_reports.py")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="Record per-endpoint API metrics (requests, errors, latency histogram, bytes, "
+                             "429 retries, rate-limit waits) and write them to FILE at the end of the run: "
+                             "Prometheus text, or JSON if FILE ends in .json. Send SIGUSR1 to write it now")
+    parser.add_argument("--metrics-interval", type=float, default=None,
+                        help="Metrics: also rewrite the metrics file every this many seconds")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Write group, dashboard, widget, API-call and rate-limit-wait spans to FILE in "
+                             "Chrome trace-event JSON, for chrome://tracing or ui.perfetto.dev")
+    parser.add_argument("--list-workers", type=int, default=1,
+                        help="Pipelined scan: workers listing dashboards per group (default: 1)")
+    parser.add_argument("--config-workers", type=int, default=2,
+                        help="Pipelined scan: workers fetching dashboard configs (default: 2)")
+    parser.add_argument("--check-workers", type=int, default=None,
+                        help="Pipelined scan: workers checking widgets (default: --concurrency)")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE,
+                        help=f"Pipelined scan: max items waiting between stages (default: {QUEUE_SIZE})")
+    return parser.parse_args()
 
 def main():
+    global limiter, dashboard_index, widget_listing, widget_index, inventory, checkpoint, report_folder
+    global scan_state, widget_stamps, report_writer, probe_windows, result_cache, sampler, metrics, tracer
+    args = parse_args()
+    shard = ShardSpec(args.shard) if args.shard else None
+    if args.probe:
+        probe_windows = sorted(int(minutes) for minutes in args.probe_windows.split(","))
+    if args.cache:
+        result_cache = ResultCache(max_entries=args.cache_size, ttl_seconds=args.cache_ttl)
+    if args.sample is not None:
+        if args.widget_listing == "none":
+            print("--sample stratifies by widget type from the widget listing; it cannot run with --widget-listing none")
+            exit(1)
+        sampler = Sampler(rate=args.sample, min_per_type=args.sample_min, seed=args.sample_seed)
+        if args.concurrency > 1:
+            print("Sampling escalates as results come in, so --sample runs the serial scan")
+            args.concurrency = 1
 
     # Authentication
-    api_instance = api_auth("credentials.json")
-    os.makedirs(report_folder, exist_ok=True)
-
-    # Get all dashboard groups
+    account, access_id, _ = load_config(args.credentials)
+    limiter = shared_limiter(account, access_id, limit=REQUEST_LIMIT, window=WINDOW_SECONDS)
+    exporter = None
+    if args.metrics:
+        metrics = Metrics("dashboard_scanner")
+        exporter = start_export(metrics, args.metrics, interval=args.metrics_interval)
+    if args.trace:
+        tracer = Tracer(args.trace, "dashboard_scanner")
+    # Stopped on every way out, exit(1) and Ctrl-C included, so the metrics
+    # file gets its final write and the trace is closed
     try:
-        dashboard_groups_http = api_instance.get_dashboard_group_list_with_http_info(size=1000)
-        dashboard_groups = dashboard_groups_http[0].items
-        headerinfo1 = dashboard_groups_http[2]
-        throttle(headerinfo=headerinfo1)
-    except ApiException as e:
-        print(f"Error fetching dashboard groups: {e}")
-        exit(1)
-
-    # Loop through all groups and their dashboards
-    for group in dashboard_groups:
-        group_id = group.id
-        group_name = group.name
-        report["groups"].setdefault(group_id, {"group_name":group_name,"dashboards":{}})
-
+        api_instance = sdk_api(args.credentials, pool_size=max(POOL_SIZE, args.concurrency), metrics=metrics)
+        if args.resume:
+            report_folder = args.resume
+        os.makedirs(report_folder, exist_ok=True)
+        checkpoint = Checkpoint(os.path.join(report_folder, CHECKPOINT_FILE))
+        # On resume the report is rewritten: finished work is replayed from the journal
+        report_writer = ReportWriter(report_folder, args.report_format)
+        if args.incremental:
+            scan_state = ScanState(args.state_file, ttl_hours=args.state_ttl)
+
+        # Get all dashboard groups
         try:
-            dashboards_http = api_instance.get_dashboard_list_with_http_info(filter=f"groupId:{group_id}", size=1000)
-            dashboards = dashboards_http[0].items
-            headerinfo2 = dashboards_http[2]
-            throttle(headerinfo=headerinfo2)
+            dashboard_groups = list_dashboard_groups(api_instance)
         except ApiException as e:
-            print(f"Error fetching dashboards for group '{group_name}': {e}")
-            continue
-        
-        # Loop through all dashboards in the group
-        for dashboard in dashboards:
-            dashboard_id = dashboard.id
-            dashboard_name = dashboard.name
-            dashboard_full_path = dashboard.full_name
-            
-            # Get full dashboard config
+            print(f"Error fetching dashboard groups: {e}")
+            exit(1)
+
+        # Positions in the full listing order the merged report of a sharded scan
+        listed_groups = list(enumerate(dashboard_groups))
+        if shard is not None:
+            listed_groups = [(position, group) for position, group in listed_groups if shard.contains(group.id)]
+            print(f"Shard {shard.spec}: {len(listed_groups)} of {len(dashboard_groups)} dashboard groups")
+        dashboard_groups = [group for _, group in listed_groups]
+        manifest = write_manifest(report_folder, shard, listed_groups, report_writer.path, args.report_format)
+
+        if args.listing == "account":
             try:
-                dashboard_detail_http = api_instance.get_dashboard_by_id_with_http_info(dashboard_id)
-                dashboard_detail = dashboard_detail_http[0]
-                headerinfo3 = dashboard_detail_http[2]
-                throttle(headerinfo=headerinfo3)
-                widgets_config = dashboard_detail.to_dict().get("widgets_config",{})
-                widgets_ids = list(widgets_config.keys())
-                report["groups"][group_id]["dashboards"].setdefault(
-                    dashboard_id,
-                    {
-                        "dashboard_name": dashboard_name,
-                        "dashboard_full_path": dashboard_full_path,
-                        "widget_tokens": [dashboard.widget_tokens],
-                        "widgets": {}
-                    }
-                )
-
-                # Loop through all widgets in the dashboard
-                for w_id in widgets_ids:
-                    
-                    # Handle "Unhandled error: could not convert string to float: 'No Data'"
-                    try:
-                        widget_detail_http = api_instance.get_widget_by_id_with_http_info(w_id)
-                        widget_detail = widget_detail_http[0]
-                    
-                    except ValueError as e:
-                         # The SDK is trying to convert "No Data" into float
-                        if "No Data" in str(e):
-                            return "Skipped", "No Data"
-                        return True, f"Widget detail error: {e}"
-
-                    except Exception as e:
-                        return True, f"Widget detail unhandled: {e}"
-                
-                    headerinfo4 = widget_detail_http[2]
-                    widget_name = widget_detail.name
-                    widget_type_field = type(widget_detail).__name__
-                    throttle(headerinfo=headerinfo4)
-                    print(f" | Proceed: {dashboard_name} / {widget_name}")
-
-                    #DEBUG code
-                    '''
-                    if w_id == "1857":
-                        print(f"Widget ID {w_id} full http response:\n {widget_detail_http}")
-                    if w_id == "19":
-                        print(f"Widget ID {w_id} full http response:\n {widget_detail_http}")
-                    '''
-                    #END DEBUG code
-
-                    #Check if widget is HTML/Alrt type
-                    if "HtmlWidget" in widget_type_field or "AlertWidget" in widget_type_field or hasattr(widget_detail, "content"):
-                        widget_status = (False, "SKIPPED")
-                    else:
-                        widget_status = is_widget_broken(api_instance=api_instance, w_id=w_id, widget_type_field=widget_type_field)
-
-                    #DEBUG code manual pause
-                    #input(f"Checking widget: {widget_detail.name} from {dashboard_name}")         
-
-                    message = widget_status[1] # second element is the error string
-                    report["groups"][group_id]["dashboards"][dashboard_id]["widgets"][w_id] = {
-                        "widget_name": widget_detail.name,
-                        "broken_status": widget_status[0],
-                        "widget_type": widget_type_field,
-                        "widget_error": message,
-                    }
-                
-                    # DEBUG code manual pause
-                    #input("Widget details above ^^^ press enter to continue")
-
-                #DEBUG TESTING - only first dashboard from each group
-                
-                #break
-                
-                #END TESTING
+                dashboard_index = build_dashboard_index(api_instance)
+            except ApiException as e:
+                print(f"Error listing dashboards: {e}")
+                exit(1)
 
+        if args.validate_refs:
+            try:
+                inventory = build_inventory(api_instance)
+            except (ApiException, ValueError) as e:
+                print(f"Error loading device inventory, scanning without reference checks: {e}")
+                inventory = None
+
+        widget_listing = args.widget_listing
+        # Incremental scans fingerprint widget definitions from the account-wide listing
+        if widget_listing == "account" or scan_state is not None:
+            try:
+                widget_index = build_widget_index(api_instance)
             except ApiException as e:
-                print(f"❌ Failed to fetch or save dashboard {dashboard_name}: {e}")
-            headerinfo2 = headerinfo4
-            headerinfo3 = headerinfo4
-        throttle_tail(headerinfo=headerinfo3, obj="dashboard")
-    throttle_tail(headerinfo=headerinfo2, obj="group")
-            
-        
-    # =============================
-    # CSV 1: dashboards.csv
-    # =============================
-    csv_path = f"{report_folder}/dashboards.csv"
-    
-    #Write header only once
-    write_header = not os.path.exists(csv_path) or os.stat(csv_path).st_size == 0
-
-    with open(csv_path, "a", newline="") as f:
-        writer = csv.writer(f)
-        if write_header:
-            writer.writerow(["full_path","group_name", "group_id", "dashboard_name", "dashboard_id", "dashboard_tokens", "tokens_strings", "widget_name", "widget_id", "widget_type", "broken_widget", "widget_error"])
-
-        for group_id, group_data in report.get("groups", {}).items():
-            group_name = group_data.get("group_name", "UNKNOWN")
-            
-            for dash_id, dash_info in group_data.get("dashboards", {}).items():
-                tokens = dash_info.get("widget_tokens") or []
-    
-                # Flatten list in case it containes inner lists
-                
-                flat_tokens = []
-                for t in tokens:
-                    if isinstance(t, list):
-                            flat_tokens.extend(t)
-                    else:
-                            flat_tokens.append(t)
-
-                # Join flatted list to a string
-                token_str = ", ".join(str(x) for x in flat_tokens) if flat_tokens else "NONE"
-                token_status = "YES" if flat_tokens else "NO"
-                
-                for widget_id, widget_data in dash_info.get("widgets", {}).items():
-                    widget_name = widget_data.get("widget_name", "UNKNOWN")
-                    widget_status = widget_data.get("broken_status", "UNKNOWN")
-                    widget_error = widget_data.get("widget_error", 'UNKNOWN')
-                    
-                    writer.writerow([
-                        dash_info.get("dashboard_full_path", "UNKNOWN"),
-                        group_name,
-                        group_id,
-                        dash_info.get("dashboard_name", "UNKNOWN"),
-                        dash_id,
-                        token_status,
-                        token_str,
-                        widget_name,
-                        widget_id,
-                        widget_data.get("widget_type", "UNKNOWN"),
-                        widget_status,
-                        widget_error
-                    ])
+                print(f"Error listing widgets: {e}")
+                exit(1)
+            widget_stamps = build_widget_stamps()
+            if scan_state is not None and widget_stamps is None:
+                print("Widget definitions could not be listed, so every dashboard is rescanned")
+
+        print(f"Writing {report_writer.path} as widgets are checked")
+        if args.concurrency > 1:
+            asyncio.run(scan_async(api_instance, dashboard_groups, args.concurrency,
+                                   list_workers=args.list_workers,
+                                   config_workers=args.config_workers,
+                                   check_workers=args.check_workers,
+                                   queue_size=args.queue_size))
+        else:
+            scan_serial(api_instance, dashboard_groups)
+        checkpoint.close()
+        report_writer.close()
+        write_manifest(report_folder, shard, listed_groups, report_writer.path, args.report_format,
+                       complete=True, rows=report_writer.rows, started=manifest["started"])
+        if scan_state is not None:
+            scan_state.save()
+            print(f"\nIncremental scan: {scan_state.reused} dashboards reused, {scan_state.rescanned} rescanned")
+        if result_cache is not None:
+            print(f"\nResult cache: {result_cache.hits} hits, {result_cache.misses} misses")
+        if sampler is not None:
+            sampler.write_csv(f"{report_folder}/sample_estimate.csv")
+            _, widgets, sampled, broken, rate, lower, upper = sampler.estimate()[-1]
+            print(f"\nSampled {sampled} of {widgets} widgets, {broken} broken: "
+                  f"estimated breakage {rate:.1%} (95% CI {lower:.1%} - {upper:.1%})")
+    finally:
+        if args.trace:
+            tracer.close()
+            print(f"\nTrace written to {args.trace}")
+        if exporter is not None:
+            exporter.stop()
+            print(f"\nAPI metrics written to {args.metrics}")
 
 if __name__ == "__main__":
     main()
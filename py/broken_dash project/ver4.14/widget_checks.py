@@ -0,0 +1,481 @@
+"""
+Module: widget_checks.py
+Description:
+    Health checks for widget data, run directly on the decoded JSON of the
+    widget-data endpoint (REST v3, camelCase keys) instead of on SDK models.
+
+    Skipping SDK model building avoids a to_dict() round trip per widget
+    and the SDK's float conversion failures on "No Data" values. The checks
+    still accept SDK models (converted with to_dict(), snake_case keys) so
+    callers holding a model can use them unchanged.
+
+    evaluate_widget_data() picks the check for a widget type and returns
+    (broken_status, message).
+"""
+
+import json
+import re
+
+NO_DATA = "No Data"
+
+GRAPH_WIDGET_TYPES = ("CustomGraphWidget", "GraphPlotWidget")
+# Widgets whose data is a time series, so a short time window proves they have data
+TIME_SERIES_WIDGET_TYPES = GRAPH_WIDGET_TYPES + ("BigNumberWidget", "SingleValueWidget", "PieChartWidget", "GaugeWidget")
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Widget-data keys (SDK snake_case and raw JSON camelCase)
+CURRENT_VALUE_KEYS = ("current_value", "currentValue")
+HISTORY_VALUES_KEYS = ("history_values", "historyValues")
+RESULT_LIST_KEYS = ("result_list", "resultList")
+
+
+def first_value(node, keys, default=None):
+    for key in keys:
+        if node.get(key) is not None:
+            return node[key]
+    return default
+
+
+def as_dict(widget):
+    """
+    Decoded widget data as a dict: SDK models are converted, a
+    (data, status, headers) tuple is unwrapped.
+    """
+    if hasattr(widget, "to_dict"):
+        widget = widget.to_dict()
+    if isinstance(widget, tuple) and len(widget) >= 1:
+        widget = as_dict(widget[0])
+    return widget
+
+
+def has_no_data(node):
+    """
+    True if the payload holds a literal "No Data" value, which LM returns in
+    place of a number when a datapoint has no data.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node == NO_DATA:
+            return True
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return False
+
+
+def extract_error_message(error_tuple):
+    broken, message = error_tuple
+    if message is None:
+        return None
+    #try to extract LM JSON error
+    match = re.search(r'HTTP response body:\s*(\{.*\})', message, re.DOTALL)
+    if match:
+        try:
+            error_json = json.loads(match.group(1))
+            return error_json.get("errorMessage") or message
+        except json.JSONDecodeError:
+            return message
+
+    return message
+
+
+def check_graphplot_widget(widget):
+    """
+    Handles GraphPlot widget data: the decoded JSON dict, or a GraphPlot
+    SDK model.
+    """
+    widget = as_dict(widget)
+
+    # Now ensure it's a dict
+    if not isinstance(widget, dict):
+        return True, f"Invalid structure: expected dict, got {type(widget)}"
+
+    # GraphPlot stores data inside 'lines' → each line contains 'data'
+    lines = widget.get("lines")
+    if not lines or not isinstance(lines, list):
+        return True, "Graph widget has no 'lines' or list is empty"
+
+    # Check if any line has meaningful data points
+    for line in lines:
+        data_points = line.get("data")
+        if isinstance(data_points, list) and len(data_points) > 0:
+            return False, "OK"
+
+    return True, "Graph has no datapoints in any line"
+
+
+def iter_numeric_from_big_number(raw_data):
+    """
+    Lazily yield the numeric values in LM BigNumber widget raw data, so a
+    caller that only needs the first one stops walking there.
+    """
+    stack = [raw_data]
+    while stack:
+        item = stack.pop()
+        if item is None:
+            continue
+        if isinstance(item, (int, float)):
+            yield item
+        elif isinstance(item, str):
+            try:
+                yield float(item)
+            except ValueError:
+                pass
+        elif isinstance(item, list):
+            stack.extend(reversed(item))
+        elif isinstance(item, dict):
+            stack.extend(reversed(list(item.values())))
+
+
+def extract_numeric_from_big_number(raw_data):
+    """
+    Recursively extract numeric values from LM BigNumber widget raw data.
+    Returns a list of numeric values (can be empty).
+    """
+    return list(iter_numeric_from_big_number(raw_data))
+
+
+class GraphDataScanner:
+    """
+    Incremental check_graphplot_widget() over the raw JSON bytes of a
+    GraphPlot response.
+
+    feed() takes chunks as they arrive and returns True as soon as a line
+    with datapoints is found, so the rest of the body need not be read or
+    parsed. Only strings and brackets are tokenized (numbers are skipped at
+    regex speed) and only the open-container path is kept, so memory does
+    not grow with the payload.
+    """
+
+    # A string (possibly cut off at the end of the chunk), or a bracket
+    TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*(?:(")|\\?\Z)|[\[\]{}]')
+    NON_SPACE = re.compile(rb"\S")
+
+    def __init__(self):
+        self.found = False  # a line with at least one datapoint
+        self.has_lines = False  # "lines" is a non-empty list
+        self.no_data = False  # a "No Data" string was seen
+        self._buf = b""
+        self._stack = []  # open containers: (bracket, key)
+        self._key = None  # last object key, for the next container
+        self._string = None  # last string, a key if ':' follows
+        self._waiting = None  # what the next non-space character decides
+
+    def feed(self, chunk):
+        buf = self._buf + chunk
+        self._buf = b""
+        pos = 0
+        while True:
+            if self._waiting:
+                m = self.NON_SPACE.search(buf, pos)
+                if m is None:
+                    break
+                self._decide(buf[m.start():m.start() + 1])
+                if self.found:
+                    return True
+
+            m = self.TOKEN.search(buf, pos)
+            if m is None:
+                break
+            token = m.group()
+            pos = m.end()
+
+            if token[:1] == b'"':
+                if m.group(1) is None:
+                    self._buf = buf[m.start():]  # string continues in the next chunk
+                    break
+                if token == b'"No Data"':
+                    self.no_data = True
+                self._string = token[1:-1]
+                self._waiting = "key"
+            elif token in (b"{", b"["):
+                in_object = self._stack and self._stack[-1][0] == b"{"
+                self._stack.append((token, self._key if in_object else None))
+                self._key = None
+                if token == b"[":
+                    self._check_path()
+            else:
+                if self._stack:
+                    self._stack.pop()
+        return self.found
+
+    def _check_path(self):
+        # root{ -> lines[ -> line{ -> data[
+        keys = [key for _, key in self._stack]
+        if keys == [None, b"lines"]:
+            self._waiting = "lines"
+        elif len(keys) == 4 and keys[:2] == [None, b"lines"] and keys[3] == b"data":
+            self._waiting = "data"
+
+    def _decide(self, char):
+        waiting, self._waiting = self._waiting, None
+        if waiting == "key":
+            if char == b":":
+                self._key = self._string
+        elif waiting == "lines":
+            self.has_lines = char != b"]"
+        elif waiting == "data":
+            self.found = char != b"]"
+
+    def result(self):
+        if self.found:
+            return False, "OK"
+        if not self.has_lines:
+            return True, "Graph widget has no 'lines' or list is empty"
+        return True, "Graph has no datapoints in any line"
+
+
+def check_graphplot_stream(chunks):
+    """
+    check_graphplot_widget() on an iterable of raw JSON byte chunks,
+    stopping at the first line with datapoints. Returns the check result
+    and whether a "No Data" value was seen in the part that was read.
+    """
+    scanner = GraphDataScanner()
+    for chunk in chunks:
+        if scanner.feed(chunk):
+            break
+    return scanner.result(), scanner.no_data
+
+
+def check_bignumber_widget(data):
+    """
+    Handles BigNumber widget data: the decoded JSON dict, or a BigNumber
+    SDK model.
+    """
+    d = as_dict(data)
+    if not isinstance(d, dict):
+        return True, f"Invalid widget structure: {type(d)}"
+
+    # First check top-level 'value'
+    if "value" in d and d["value"] is not None:
+        try:
+            float(d["value"])
+            return False, "OK"
+        except (ValueError, TypeError):
+            pass
+
+    raw_data = d.get("data")
+
+    # One numeric value is enough
+    for _ in iter_numeric_from_big_number(raw_data):
+        return False, "OK"
+    return True, "No numeric values found (may contain 'No Data')"
+
+
+def check_piechart_widget(widget):
+    """
+    Handles PieChart widget data: the decoded JSON dict, or a PieChart
+    SDK model.
+    """
+    widget = as_dict(widget)
+
+    # Must now be a dict
+    if not isinstance(widget, dict):
+        return True, f"Invalid widget structure: {type(widget)}"
+
+    data_list = widget.get("data")
+
+    # No data[] list at all
+    if not isinstance(data_list, list) or len(data_list) == 0:
+        return True, "PieChart has no data[] values"
+
+    values = []
+
+    for item in data_list:
+        if not isinstance(item, dict):
+            continue
+        val = item.get("value")
+        if isinstance(val, (int, float)):
+            values.append(val)
+
+    # No numeric values in the widget
+    if not values:
+        return True, "PieChart has no numeric values"
+
+    # All values are 0 → error
+    if all(v == 0 for v in values):
+        return True, "PieChart values are all zero"
+
+    # Otherwise OK
+    return False, "OK"
+
+
+def check_gauge_widget(widget):
+    """
+    Validates a Gauge widget:
+      - current_value must be non-zero and not None
+      - history_values must contain at least one numeric non-zero value
+    """
+    widget = as_dict(widget)
+
+    if not isinstance(widget, dict):
+        return True, f"Invalid widget structure: {type(widget)}"
+
+    # --- CURRENT VALUE CHECK ---
+    current = first_value(widget, CURRENT_VALUE_KEYS)
+
+    if current is None:
+        return True, "Gauge current_value is None"
+
+    if isinstance(current, (int, float)):
+        if current == 0:
+            return True, "Gauge current_value is 0"
+    else:
+        return True, f"Gauge current_value is not numeric: {current}"
+
+    # --- HISTORY VALUES CHECK ---
+    history = first_value(widget, HISTORY_VALUES_KEYS)
+
+    if not isinstance(history, list):
+        return True, "Gauge history_values missing or not a list"
+
+    numeric_history = [
+        v for v in history if isinstance(v, (int, float))
+    ]
+
+    if not numeric_history:
+        return True, "Gauge history_values has no numeric entries"
+
+    if all(v == 0 for v in numeric_history):
+        return True, "Gauge history_values are all 0"
+
+    # If both checks passed → OK
+    return False, "OK"
+
+
+def check_sla_widget(widget: dict) -> tuple[bool, str]:
+    """
+    Validate SLA widget structures for DeviceSLA and WebsiteSLA widgets.
+    Returns:
+        (False, "OK") if valid
+        (True, "<reason>") if invalid
+    """
+
+    # -------------------------
+    # WEBSITE SLA (websiteSLA)
+    # -------------------------
+    # SDK object or (dict, status, headers) tuple → dict
+    widget = as_dict(widget)
+
+    if not isinstance(widget, dict):
+        return True, f"Invalid website SLA widget type: {type(widget)}"
+
+    # Ensure this really is websiteSLA
+    if widget.get("type") == "websiteSLA":
+
+        availability = widget.get("availability")
+
+        # Missing field → error
+        if availability is None:
+            return True, "availability missing"
+
+        # Not numeric → error
+        if not isinstance(availability, (int, float)):
+            try:
+                availability = float(availability)
+            except Exception:
+                return True, f"availability not numeric: {availability}"
+
+        # Passed all checks → OK
+        return False, "OK"
+
+    # -------------------------
+    # DEVICE SLA (deviceSLA)
+    # -------------------------
+    if widget.get("type") == "deviceSLA":
+        results = first_value(widget, RESULT_LIST_KEYS, [])
+        if not results:
+            return True, "result_list missing or empty"
+
+        value = results[0].get("value")
+
+        # Return error for LM errors
+        if value == "Group not found":
+            return True, "Group not found"
+
+        # None value
+        if value is None:
+            return True, "value is None"
+
+        # Not numeric
+        try:
+            value = float(value)
+        except Exception:
+            return True, f"value not numeric: {value}"
+
+        return False, "OK"
+
+    # -------------------------
+    # Unsupported widget type
+    # -------------------------
+    return True, f"Unsupported widget type: {widget.get('type')}"
+
+
+def evaluate_widget_data(widget_type_field, widget_obj):
+    """
+    Returns (broken_status: bool, message: str) for a widget's data,
+    dispatching on the widget definition's type (SDK class name).
+    """
+    # ------------------------------
+    # HTML / Alert widgets → skip
+    # ------------------------------
+    if "HtmlWidget" in widget_type_field or "AlertWidget" in widget_type_field:
+        return False, "SKIPPED"
+
+    # ------------------------------
+    # BigNumber / SingleValue → numeric check only
+    # ------------------------------
+    if widget_type_field in ["BigNumberWidget", "SingleValueWidget"]:
+        return check_bignumber_widget(widget_obj)
+
+    # ------------------------------
+    # PieChartWidget → list check
+    # ------------------------------
+    if widget_type_field in ["PieChartWidget"]:
+        return check_piechart_widget(widget_obj)
+
+    # ------------------------------
+    # GaugeWidget → values and historic values check
+    # ------------------------------
+    if widget_type_field in ["GaugeWidget"]:
+        return check_gauge_widget(widget_obj)
+
+    # ------------------------------
+    # SLAWidget → check value
+    # ------------------------------
+    if "SLAWidget" in widget_type_field:
+        return check_sla_widget(widget_obj)
+
+    # ------------------------------
+    # Graph widgets
+    # ------------------------------
+    if widget_type_field in GRAPH_WIDGET_TYPES:
+        return check_graphplot_widget(widget_obj)
+
+    widget = as_dict(widget_obj)
+    if not isinstance(widget, dict):
+        return True, f"Unexpected widget type: {type(widget_obj)}"
+
+    # ------------------------------
+    # Dynamic Table Widget (rows)
+    # ------------------------------
+    if "rows" in widget:
+        if not widget["rows"]:
+            return True, "rows[] empty — referenced resource missing"
+        return False, "OK"
+
+    # ------------------------------
+    # Generic table (items)
+    # ------------------------------
+    if "items" in widget:
+        if not widget["items"]:
+            return True, "items[] empty — referenced resource missing"
+        return False, "OK"
+
+    # ------------------------------
+    # Catch-all for unknown / unsupported
+    # ------------------------------
+    return True, f"Unexpected widget type: {widget.get('type', type(widget_obj))}"
@@ -0,0 +1,242 @@
+"""
+Module: rate_limit.py
+Description:
+    Token-bucket rate limiter driven by LogicMonitor's x-rate-limit-* headers.
+
+    Calls are spread evenly across the server window (limit/window tokens per
+    second) instead of bursting until the quota is nearly gone and then
+    sleeping for a fixed part of the window. Each caller reserves its slot
+    under a lock and only sleeps until that slot comes up, so the limiter
+    can be shared by threads and asyncio tasks alike.
+
+Example usage:
+
+    from rate_limit import RateLimiter
+
+    limiter = RateLimiter()
+
+    limiter.acquire()                  # or: await limiter.acquire_async()
+    data, status, headers = api_instance.get_dashboard_by_id_with_http_info(dashboard_id)
+    limiter.update(headers)
+    print(limiter.status(), end="")
+
+    # Several tools on one API key: share the budget through a state file
+    limiter = shared_limiter(account, access_id)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_LIMIT = 500
+DEFAULT_WINDOW = 60
+DEFAULT_BURST = 10
+DEFAULT_RESERVE = 2
+DEFAULT_STATE_DIR = os.path.join(tempfile.gettempdir(), "lm_rate_limit")
+
+
+def parse_rate_headers(headers):
+    """
+    Read (limit, window, remaining) from response headers.
+    Missing or malformed values come back as None.
+    """
+    values = []
+    for name in ("x-rate-limit-limit", "x-rate-limit-window", "x-rate-limit-remaining"):
+        raw = headers.get(name) if headers is not None else None
+        try:
+            values.append(int(raw))
+        except (TypeError, ValueError):
+            values.append(None)
+    return tuple(values)
+
+
+class RateLimiter:
+    """
+    Token bucket refilled at limit/window tokens per second.
+
+    - `burst` caps how many calls may go out back to back.
+    - `reserve` calls are left unused per window so other tools on the same
+      key are not starved by the last few requests.
+    """
+
+    def __init__(self, limit=DEFAULT_LIMIT, window=DEFAULT_WINDOW,
+                 burst=DEFAULT_BURST, reserve=DEFAULT_RESERVE):
+        self._lock = threading.Lock()
+        self.burst = burst
+        self.reserve = reserve
+        self.remaining = None
+        self.sleep_seconds = 0.0
+        self._set_budget(limit, window)
+        self._tokens = float(self._capacity())
+        self._stamp = self._clock()
+
+    def _clock(self):
+        return time.monotonic()
+
+    @contextmanager
+    def _state(self):
+        with self._lock:
+            yield
+
+    def _set_budget(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.rate = max(limit - self.reserve, 1) / float(window)
+
+    def _capacity(self):
+        return max(1, min(self.burst, self.limit - self.reserve))
+
+    def _refill(self, now):
+        self._tokens = min(self._capacity(), self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def reserve_slot(self):
+        """
+        Take one token and return how many seconds the caller must wait
+        before sending. The token is taken even when the bucket is empty,
+        so concurrent callers queue up at evenly spaced slots.
+        """
+        with self._state():
+            self._refill(self._clock())
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.sleep_seconds += delay
+            return delay
+
+    def acquire(self):
+        delay = self.reserve_slot()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self):
+        delay = self.reserve_slot()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def update(self, headers):
+        """
+        Sync the bucket with the server's view after a response.
+        """
+        limit, window, remaining = parse_rate_headers(headers)
+        with self._state():
+            if limit and window and (limit, window) != (self.limit, self.window):
+                self._set_budget(limit, window)
+            if remaining is not None:
+                self.remaining = remaining
+                self._refill(self._clock())
+                # Server budget is lower than ours: never send more than it allows
+                self._tokens = min(self._tokens, float(remaining - self.reserve))
+
+    def penalize(self, seconds):
+        """
+        Push every pending slot back by `seconds` (e.g. after an HTTP 429).
+        """
+        with self._state():
+            self._refill(self._clock())
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+    def status(self):
+        remaining = "?" if self.remaining is None else self.remaining
+        return f"\rAPI Rate limit Remaining: {remaining}/{self.limit}\033[K"
+
+
+@contextmanager
+def _file_lock(path):
+    """
+    Exclusive advisory lock on `path`, held across processes.
+    """
+    with open(path, "a+") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    RateLimiter whose bucket lives in a lock-protected state file, so every
+    process using the same portal and access ID draws from one budget.
+
+    Each reservation loads the bucket, takes a token and writes it back
+    while holding an exclusive file lock; callers then sleep outside the
+    lock exactly like the in-process limiter.
+    """
+
+    def __init__(self, key, state_dir=DEFAULT_STATE_DIR, **kwargs):
+        os.makedirs(state_dir, exist_ok=True)
+        self.state_path = os.path.join(state_dir, f"{key}.json")
+        self.lock_path = os.path.join(state_dir, f"{key}.lock")
+        super().__init__(**kwargs)
+
+    def _clock(self):
+        # Wall clock: monotonic time is not comparable between processes
+        return time.time()
+
+    def _load(self):
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if (state.get("limit"), state.get("window")) != (self.limit, self.window):
+            self._set_budget(state["limit"], state["window"])
+        self._tokens = state["tokens"]
+        self._stamp = state["stamp"]
+        self.remaining = state.get("remaining")
+
+    def _save(self):
+        state = {
+            "limit": self.limit,
+            "window": self.window,
+            "tokens": self._tokens,
+            "stamp": self._stamp,
+            "remaining": self.remaining,
+        }
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    @contextmanager
+    def _state(self):
+        with self._lock, _file_lock(self.lock_path):
+            self._load()
+            yield
+            self._save()
+
+
+def budget_key(account, access_id):
+    """
+    Stable file-name key for one portal + access ID pair.
+    """
+    return hashlib.sha256(f"{account}:{access_id}".encode("utf-8")).hexdigest()[:16]
+
+
+def shared_limiter(account, access_id, state_dir=DEFAULT_STATE_DIR, **kwargs):
+    """
+    Limiter that shares its budget with every other process using the
+    same portal and access ID on this host.
+    """
+    return SharedRateLimiter(budget_key(account, access_id), state_dir=state_dir, **kwargs)
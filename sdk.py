@@ -1,14 +1,14 @@
-from lm import LM
+from lm_client import LMClient
 
 # Initialize LM client with your credentials
-lm = LM(access_id='your-access-id',
-        access_key='your-access-key',
-        account='your-account')  # just the subdomain, e.g., "acme" for acme.logicmonitor.com
+lm = LMClient(account='your-account',  # just the subdomain, e.g., "acme" for acme.logicmonitor.com
+              access_id='your-access-id',
+              access_key='your-access-key')
 
 # Example: Get all devices
-response = lm.get('device/devices')
-if response.status == 200:
-    devices = response.data.get('items', [])
+response = lm.get('/device/devices')
+if response.status_code == 200:
+    devices = response.json().get('items', [])
     print("Devices:", devices)
 else:
-    print("Error:", response.errmsg)
+    print("Error:", response.json().get('errorMessage', response.text))
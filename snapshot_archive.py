@@ -0,0 +1,175 @@
+"""
+Module: snapshot_archive.py
+Description:
+    Single-file dashboard backups: one compressed archive per snapshot
+    instead of one JSON file per dashboard.
+
+    The archive is a ZIP file (stdlib zipfile, so `unzip` and any archive
+    tool can open it too). Each dashboard is its own deflated member,
+    <Group>__<Dashboard>_<id>.json, exactly as the per-file backup writes
+    it, and the last member, index.json, maps every dashboard to its
+    group, name, content hash (snapshot_store.normalize) and the offset of
+    its member in the archive:
+
+        archive = SnapshotArchive("dashboard_backups")
+        archive.add(dashboard_id, group_name, dashboard_name, detail)
+        archive.close()                     # writes index.json, renames into place
+
+    Members are compressed one by one, so listing a snapshot reads only
+    the ZIP directory and the index, and extracting a dashboard
+    decompresses only its member:
+
+        python snapshot_archive.py dashboard_backups/dashboards_2025-05-23_14-45-01.zip list
+        python snapshot_archive.py dashboard_backups/dashboards_2025-05-23_14-45-01.zip show 42
+        python snapshot_archive.py dashboard_backups/dashboards_2025-05-23_14-45-01.zip extract restored/ [42 ...]
+"""
+
+import argparse
+import json
+import os
+import threading
+import zipfile
+from datetime import datetime
+
+from snapshot_store import normalize, content_hash, MANIFEST_FORMAT
+
+INDEX_MEMBER = "index.json"
+ARCHIVE_PREFIX = "dashboards_"
+COMPRESS_LEVEL = 6
+
+
+def member_name(dashboard_id, group_name, dashboard_name):
+    return f"{group_name}__{dashboard_name}_{dashboard_id}.json"
+
+
+class SnapshotArchive:
+    """
+    Writes one snapshot archive. add() may be called from any thread;
+    members are appended in call order.
+    """
+
+    def __init__(self, folder, name=None):
+        self.name = name or datetime.now().strftime(MANIFEST_FORMAT)
+        self.path = os.path.join(folder, f"{ARCHIVE_PREFIX}{self.name}.zip")
+        # Written under a temporary name; an interrupted run leaves no archive that looks complete
+        self._tmp_path = f"{self.path}.tmp"
+        self._zip = zipfile.ZipFile(self._tmp_path, "w", compression=zipfile.ZIP_DEFLATED,
+                                    compresslevel=COMPRESS_LEVEL, allowZip64=True)
+        self.entries = []
+        self.failed = []
+        self._lock = threading.Lock()
+
+    def add(self, dashboard_id, group_name, dashboard_name, detail):
+        """
+        Append one dashboard config; returns its hash.
+        """
+        digest = content_hash(normalize(detail))
+        text = json.dumps(detail, indent=2).encode("utf-8")
+        member = member_name(dashboard_id, group_name, dashboard_name)
+        with self._lock:
+            self._zip.writestr(member, text)
+            # The offset of the member's local header, where a reader seeks to
+            offset = self._zip.infolist()[-1].header_offset
+            self.entries.append({"id": dashboard_id, "group": group_name, "name": dashboard_name,
+                                 "hash": digest, "member": member, "offset": offset,
+                                 "size": len(text)})
+        return digest
+
+    def fail(self, dashboard_id, dashboard_name, error):
+        with self._lock:
+            self.failed.append({"id": dashboard_id, "name": dashboard_name, "error": str(error)})
+
+    def close(self):
+        """
+        Write the index and move the archive into place; returns its path.
+        """
+        with self._lock:
+            index = {
+                "name": self.name,
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "dashboards": sorted(self.entries, key=lambda entry: entry["id"]),
+                "failed": self.failed,
+            }
+            self._zip.writestr(INDEX_MEMBER, json.dumps(index, indent=1))
+            self._zip.close()
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+    def summary(self):
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return f"{len(self.entries)} dashboards in one archive ({size} bytes), {len(self.failed)} failed"
+
+
+def read_index(path):
+    """
+    The archive's index; only the ZIP directory and index.json are read.
+    """
+    with zipfile.ZipFile(path) as archive:
+        return json.loads(archive.read(INDEX_MEMBER))
+
+
+def find_entry(index, dashboard_id):
+    for entry in index["dashboards"]:
+        if str(entry["id"]) == str(dashboard_id):
+            return entry
+    return None
+
+
+def extract(path, dashboard_ids=None, index=None):
+    """
+    Yield (entry, config) for the given dashboard IDs (all when None),
+    decompressing only their members.
+    """
+    index = index or read_index(path)
+    if dashboard_ids is None:
+        entries = index["dashboards"]
+    else:
+        entries = [find_entry(index, dashboard_id) for dashboard_id in dashboard_ids]
+        missing = [str(i) for i, entry in zip(dashboard_ids, entries) if entry is None]
+        if missing:
+            raise KeyError(f"Not in {os.path.basename(path)}: {', '.join(missing)}")
+    with zipfile.ZipFile(path) as archive:
+        for entry in entries:
+            yield entry, json.loads(archive.read(entry["member"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List and extract dashboards from a snapshot archive.")
+    parser.add_argument("archive", help="Archive written by dashboard_backup.py --format archive")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="List the dashboards in the archive")
+    show = sub.add_parser("show", help="Print one dashboard's config")
+    show.add_argument("dashboard_id")
+    unpack = sub.add_parser("extract", help="Write dashboards as <Group>__<Dashboard>_<id>.json files")
+    unpack.add_argument("folder")
+    unpack.add_argument("dashboard_ids", nargs="*", help="Dashboard IDs (default: all)")
+    args = parser.parse_args()
+
+    try:
+        index = read_index(args.archive)
+    except (OSError, KeyError, zipfile.BadZipFile) as e:
+        print(f"Cannot read the index of {args.archive}: {e}")
+        exit(1)
+
+    try:
+        if args.command == "list":
+            for entry in index["dashboards"]:
+                print(f"{entry['id']}\t{entry['group']}\t{entry['name']}\t{entry['hash'][:12]}")
+        elif args.command == "show":
+            for _, detail in extract(args.archive, [args.dashboard_id], index):
+                print(json.dumps(detail, indent=2))
+        elif args.command == "extract":
+            os.makedirs(args.folder, exist_ok=True)
+            count = 0
+            for entry, detail in extract(args.archive, args.dashboard_ids or None, index):
+                with open(os.path.join(args.folder, entry["member"]), "w", encoding="utf-8") as f:
+                    json.dump(detail, f, indent=2)
+                count += 1
+            print(f"Extracted {count} dashboards from {index['name']} to {args.folder}")
+    except KeyError as e:
+        print(e.args[0])
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
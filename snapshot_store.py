@@ -0,0 +1,274 @@
+"""
+Module: snapshot_store.py
+Description:
+    Content-addressed, deduplicated store for dashboard backups.
+
+    Each dashboard config is normalized (sorted keys, compact separators)
+    and stored once as a gzip-compressed blob named by the SHA-256 of that
+    JSON. A backup run writes a small manifest listing every dashboard's
+    ID, group, name and blob hash, so a nightly run only adds the blobs of
+    dashboards that changed:
+
+        store = SnapshotStore("dashboard_backups")
+        snapshot = store.snapshot()                      # compares with the last manifest
+        snapshot.add(dashboard_id, group_name, dashboard_name, detail)
+        snapshot.close()                                 # writes the manifest
+
+    An unchanged dashboard costs one hash comparison with the previous
+    manifest and no write; a changed one that matches a blob already
+    stored (a reverted edit, a cloned dashboard) costs one stat.
+
+    Layout:
+
+        <root>/blobs/ab/abcdef....json.gz
+        <root>/manifests/YYYY-MM-DD_HH-MM-SS.json
+
+    Read a snapshot back:
+
+        python snapshot_store.py dashboard_backups list
+        python snapshot_store.py dashboard_backups show 42 [--manifest 2025-05-23_14-45-01]
+        python snapshot_store.py dashboard_backups restore restored/ [--manifest ...]
+
+    Blobs no manifest refers to are not removed; delete old manifests and
+    run `gc` to drop them.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+BLOBS_DIR = "blobs"
+MANIFESTS_DIR = "manifests"
+MANIFEST_FORMAT = "%Y-%m-%d_%H-%M-%S"
+# zlib's default trade-off; dashboard JSON compresses well at any level
+COMPRESS_LEVEL = 6
+
+
+def normalize(detail):
+    """
+    Canonical JSON bytes of a dashboard config, the input to its hash.
+    """
+    return json.dumps(detail, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class SnapshotStore:
+    """
+    Blobs and manifests under one root folder.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.blobs = os.path.join(root, BLOBS_DIR)
+        self.manifests = os.path.join(root, MANIFESTS_DIR)
+        os.makedirs(self.blobs, exist_ok=True)
+        os.makedirs(self.manifests, exist_ok=True)
+
+    def blob_path(self, digest):
+        return os.path.join(self.blobs, digest[:2], f"{digest}.json.gz")
+
+    def has(self, digest):
+        return os.path.exists(self.blob_path(digest))
+
+    def put(self, data, digest=None):
+        """
+        Store normalized JSON bytes unless a blob with their hash exists.
+        Returns (digest, written).
+        """
+        digest = digest or content_hash(data)
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            return digest, False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique temporary name: two threads may store the same new blob
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(gzip.compress(data, COMPRESS_LEVEL))
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return digest, True
+
+    def get(self, digest):
+        """
+        The dashboard config stored under `digest`.
+        """
+        with open(self.blob_path(digest), "rb") as f:
+            return json.loads(gzip.decompress(f.read()))
+
+    def manifest_names(self):
+        """
+        Manifest names (their timestamps), oldest first.
+        """
+        return sorted(name[:-5] for name in os.listdir(self.manifests) if name.endswith(".json"))
+
+    def load_manifest(self, name=None):
+        """
+        A manifest by name, or the latest one; None if there is none.
+        """
+        if name is None:
+            names = self.manifest_names()
+            if not names:
+                return None
+            name = names[-1]
+        with open(os.path.join(self.manifests, f"{name}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_manifest(self, manifest):
+        path = os.path.join(self.manifests, f"{manifest['name']}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp_path, path)
+        return path
+
+    def snapshot(self, name=None):
+        return Snapshot(self, name)
+
+    def gc(self):
+        """
+        Delete blobs that no manifest refers to. Returns how many went.
+        """
+        live = set()
+        for name in self.manifest_names():
+            live.update(entry["hash"] for entry in self.load_manifest(name)["dashboards"])
+        removed = 0
+        for prefix in os.listdir(self.blobs):
+            folder = os.path.join(self.blobs, prefix)
+            for blob in os.listdir(folder):
+                if blob.endswith(".json.gz") and blob[:-8] not in live:
+                    os.remove(os.path.join(folder, blob))
+                    removed += 1
+        return removed
+
+
+class Snapshot:
+    """
+    One backup run: blobs are added as dashboards arrive and the manifest
+    is written by close(). Safe to share between threads.
+    """
+
+    def __init__(self, store, name=None):
+        self.store = store
+        self.name = name or datetime.now().strftime(MANIFEST_FORMAT)
+        previous = store.load_manifest()
+        # Dashboard ID -> hash in the last run
+        self.previous = {entry["id"]: entry["hash"] for entry in previous["dashboards"]} if previous else {}
+        self.entries = []
+        self.failed = []
+        self.unchanged = 0
+        self.deduplicated = 0
+        self.written = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+
+    def add(self, dashboard_id, group_name, dashboard_name, detail):
+        """
+        Add one dashboard config; returns its hash.
+        """
+        data = normalize(detail)
+        digest = content_hash(data)
+        if self.previous.get(dashboard_id) == digest:
+            status, size = "unchanged", None
+        else:
+            digest, written = self.store.put(data, digest)
+            status = "written" if written else "deduplicated"
+            size = os.path.getsize(self.store.blob_path(digest)) if written else None
+        with self._lock:
+            self.entries.append({"id": dashboard_id, "group": group_name, "name": dashboard_name,
+                                 "hash": digest, "size": len(data)})
+            if status == "unchanged":
+                self.unchanged += 1
+            elif status == "deduplicated":
+                self.deduplicated += 1
+            else:
+                self.written += 1
+                self.bytes_written += size
+        return digest
+
+    def fail(self, dashboard_id, dashboard_name, error):
+        with self._lock:
+            self.failed.append({"id": dashboard_id, "name": dashboard_name, "error": str(error)})
+
+    def close(self):
+        """
+        Write the manifest; returns its path.
+        """
+        with self._lock:
+            manifest = {
+                "name": self.name,
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "dashboards": sorted(self.entries, key=lambda entry: entry["id"]),
+                "failed": self.failed,
+            }
+        return self.store.write_manifest(manifest)
+
+    def summary(self):
+        return (f"{len(self.entries)} dashboards: {self.written} new blobs ({self.bytes_written} bytes), "
+                f"{self.unchanged} unchanged, {self.deduplicated} deduplicated, {len(self.failed)} failed")
+
+
+def find_entry(manifest, dashboard_id):
+    for entry in manifest["dashboards"]:
+        if str(entry["id"]) == str(dashboard_id):
+            return entry
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List and restore dashboards from a snapshot store.")
+    parser.add_argument("root", help="Store folder (the backup's output folder)")
+    parser.add_argument("--manifest", help="Manifest name (default: the latest)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("manifests", help="List the stored manifests")
+    sub.add_parser("list", help="List the dashboards in a manifest")
+    show = sub.add_parser("show", help="Print one dashboard's config")
+    show.add_argument("dashboard_id")
+    restore = sub.add_parser("restore", help="Write a manifest's dashboards as <Group>__<Dashboard>_<id>.json files")
+    restore.add_argument("folder")
+    sub.add_parser("gc", help="Delete blobs no manifest refers to")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.root)
+    if args.command == "manifests":
+        for name in store.manifest_names():
+            print(name)
+        return
+    if args.command == "gc":
+        print(f"Removed {store.gc()} unreferenced blobs")
+        return
+
+    manifest = store.load_manifest(args.manifest)
+    if manifest is None:
+        print(f"No manifests in {args.root}")
+        exit(1)
+
+    if args.command == "list":
+        for entry in manifest["dashboards"]:
+            print(f"{entry['id']}\t{entry['group']}\t{entry['name']}\t{entry['hash'][:12]}")
+    elif args.command == "show":
+        entry = find_entry(manifest, args.dashboard_id)
+        if entry is None:
+            print(f"Dashboard {args.dashboard_id} is not in manifest {manifest['name']}")
+            exit(1)
+        print(json.dumps(store.get(entry["hash"]), indent=2))
+    elif args.command == "restore":
+        os.makedirs(args.folder, exist_ok=True)
+        for entry in manifest["dashboards"]:
+            file_path = os.path.join(args.folder, f"{entry['group']}__{entry['name']}_{entry['id']}.json")
+            with open(file_path, "w", encoding="utf-8") as f:
+                json.dump(store.get(entry["hash"]), f, indent=2)
+        print(f"Restored {len(manifest['dashboards'])} dashboards from {manifest['name']} to {args.folder}")
+
+
+if __name__ == "__main__":
+    main()
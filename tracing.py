@@ -0,0 +1,131 @@
+"""
+Module: tracing.py
+Description:
+    Phase-level spans in Chrome trace-event JSON, for loading one run into
+    chrome://tracing or https://ui.perfetto.dev and seeing which groups,
+    dashboards or widget types dominate it and where it waits for the
+    rate limiter.
+
+        tracer = Tracer("scan_trace.json", "dashboard_scanner")
+        with tracer.span("dashboard", "dashboard", dashboard_id=42) as span:
+            ...
+            span.args["widgets"] = 12   # shown in the viewer's detail pane
+            span.name = "Overview"      # renamed once known
+        tracer.close()
+
+    Spans on one thread nest by time; spans that start on one thread or
+    task and end on another (a dashboard in the pipelined scan) are async
+    begin/end pairs. Events are streamed to the file as spans end, so an
+    interrupted run still leaves a readable trace (the viewers accept a
+    JSON array without its closing bracket).
+
+    With `path=None` nothing is recorded, so callers can use it
+    unconditionally.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Span:
+    """
+    A span being timed; its name and args are read when it ends.
+    """
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+
+class Tracer:
+    """
+    Thread-safe writer of Chrome trace events.
+    """
+
+    def __init__(self, path=None, process_name=None):
+        self.path = path
+        self.pid = os.getpid()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._threads = set()
+        self._file = None
+        self._separator = ""
+        if path:
+            self._file = open(path, "w", encoding="utf-8")
+            self._file.write("[")
+            if process_name:
+                self._emit({"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": process_name}})
+
+    def now(self):
+        """
+        Microseconds since the tracer was created (trace timestamps).
+        """
+        return (time.perf_counter() - self._start) * 1e6
+
+    def _emit(self, event):
+        line = json.dumps(event, default=str)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(self._separator + "\n" + line)
+                self._separator = ","
+
+    def _thread(self):
+        thread = threading.current_thread()
+        tid = thread.ident
+        if tid not in self._threads:
+            self._threads.add(tid)
+            self._emit({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid,
+                        "args": {"name": thread.name}})
+        return tid
+
+    def complete(self, name, cat, start, duration, **args):
+        """
+        A span measured by the caller: `start` from now(), `duration` in µs.
+        """
+        if self._file is None:
+            return
+        self._emit({"name": name, "cat": cat, "ph": "X", "ts": round(start, 1), "dur": round(duration, 1),
+                    "pid": self.pid, "tid": self._thread(), "args": args})
+
+    @contextmanager
+    def span(self, name, cat, **args):
+        """
+        Time the enclosed block on the current thread. Yields the Span,
+        whose name and args may be changed before the block ends.
+        """
+        span = Span(name, args)
+        if self._file is None:
+            yield span
+            return
+        start = self.now()
+        try:
+            yield span
+        finally:
+            self.complete(span.name, cat, start, self.now() - start, **span.args)
+
+    def begin(self, name, cat, span_id, **args):
+        """
+        Start an async span, ended by end() with the same name, cat and id
+        from any thread or task.
+        """
+        if self._file is None:
+            return
+        self._emit({"name": name, "cat": cat, "ph": "b", "id": str(span_id), "ts": round(self.now(), 1),
+                    "pid": self.pid, "tid": self._thread(), "args": args})
+
+    def end(self, name, cat, span_id, **args):
+        if self._file is None:
+            return
+        self._emit({"name": name, "cat": cat, "ph": "e", "id": str(span_id), "ts": round(self.now(), 1),
+                    "pid": self.pid, "tid": self._thread(), "args": args})
+
+    def close(self):
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write("\n]\n")
+            self._file.close()
+            self._file = None